@@ -1,16 +1,94 @@
 # -*- coding: utf-8 -*-
 
+import os
+import pickle
 import re
-import nltk
-from textblob import TextBlob
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import sent_tokenize
 import json
 
+from analysis_cache import AnalysisCache
+from answer_features import AnswerFeatures
+from batch_analysis import run_batch
+from instrumentation import ANALYSIS_STAGE_LATENCY
+from relevance_index import get_relevance_index
+from sentence_splitter import split_sentences
+from sentiment_lexicon import LexiconScorer
+
+# NLTK and TextBlob are imported on first use so importing this module stays cheap
+LEXICON_CACHE_PATH = os.environ.get('VADER_LEXICON_CACHE', 'data/cache/vader_lexicon.pickle')
+
+
+def _lexicon_stamp():
+    """Identify the installed VADER lexicon so a stale cache is never used"""
+    import nltk
+    pointer = nltk.data.find('sentiment/vader_lexicon.zip')
+    path = pointer.zipfile.filename if hasattr(pointer, 'zipfile') else pointer.path
+    stat = os.stat(path)
+    return (nltk.__version__, path, stat.st_size, stat.st_mtime)
+
+
+def load_sentiment_analyzer(cache_path=LEXICON_CACHE_PATH):
+    """Compile the VADER lexicon into a LexiconScorer, reusing a pickled copy of the parsed lexicon when valid"""
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    
+    try:
+        stamp = _lexicon_stamp()
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('stamp') == stamp:
+            return LexiconScorer(cached['lexicon'])
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Ignoring VADER lexicon cache: {e}")
+    
+    sia = SentimentIntensityAnalyzer()
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'stamp': _lexicon_stamp(), 'lexicon': sia.lexicon}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Write then rename so concurrent workers never read a partial file
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Could not write VADER lexicon cache: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return LexiconScorer(sia.lexicon)
+
+
+_shared_sia = None
+
+
+def shared_sentiment_analyzer():
+    """The process's compiled VADER scorer; workers forked after a preload inherit it"""
+    global _shared_sia
+    if _shared_sia is None:
+        _shared_sia = load_sentiment_analyzer()
+    return _shared_sia
+
+
 class AIAnalyzer:
+    # Response-time thresholds (seconds) analyze_behavioral scores by
+    RESPONSE_TIME_BUCKETS = (300, 600)
+    
     def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
+        self._sia = None
+        self._primed_sentiment = {}
         self.load_evaluation_criteria()
+        self.cache = AnalysisCache.for_analyzer(AIAnalyzer)
+    
+    @property
+    def sia(self):
+        """Compiled VADER scorer, loaded on first use"""
+        if self._sia is None:
+            self._sia = shared_sentiment_analyzer()
+        return self._sia
+    
+    def warm_up(self):
+        """Run one throwaway analysis so TextBlob and VADER are loaded before real traffic"""
+        self._analyze_response({'keywords': []}, 'Warming up the analyzer. It loads every model once.', None, 0)
     
     def load_evaluation_criteria(self):
         """Load evaluation criteria from file"""
@@ -50,8 +128,21 @@ class AIAnalyzer:
             }
         }
     
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='features')
+    def extract_features(self, answer, keywords=()):
+        """Tokenize, split, score sentiment and match phrases once per answer"""
+        return AnswerFeatures(
+            answer,
+            keywords,
+            split_sentences=split_sentences,
+            sentiment=self._sentiment_scores
+        )
+    
     def analyze_response(self, question, user_answer, domain, response_time):
-        """Comprehensive analysis of user response"""
+        """Comprehensive analysis of user response, served from the cache when seen before"""
+        return self.cache.fetch(self._analyze_response, question, user_answer, domain, response_time)
+    
+    def _analyze_response(self, question, user_answer, domain, response_time):
         analysis = {
             'scores': {},
             'detailed_feedback': {},
@@ -61,21 +152,24 @@ class AIAnalyzer:
             'complexity_metrics': {}
         }
         
+        # Sentence splitting, TextBlob and VADER run once here; every scorer reads the result
+        features = self.extract_features(user_answer, question.get('keywords', []))
+        
         # Technical analysis
-        analysis['scores']['technical'] = self.analyze_technical(question, user_answer, domain)
-        analysis['detailed_feedback']['technical'] = self.get_technical_feedback(question, user_answer)
+        analysis['scores']['technical'] = self.analyze_technical(question, user_answer, domain, features)
+        analysis['detailed_feedback']['technical'] = self.get_technical_feedback(question, user_answer, features)
         
         # Communication analysis
-        analysis['scores']['communication'] = self.analyze_communication(user_answer)
-        analysis['detailed_feedback']['communication'] = self.get_communication_feedback(user_answer)
+        analysis['scores']['communication'] = self.analyze_communication(user_answer, features)
+        analysis['detailed_feedback']['communication'] = self.get_communication_feedback(user_answer, features)
         
         # Behavioral analysis
-        analysis['scores']['behavioral'] = self.analyze_behavioral(user_answer, response_time)
-        analysis['detailed_feedback']['behavioral'] = self.get_behavioral_feedback(user_answer)
+        analysis['scores']['behavioral'] = self.analyze_behavioral(user_answer, response_time, features)
+        analysis['detailed_feedback']['behavioral'] = self.get_behavioral_feedback(user_answer, features)
         
         # Advanced analytics
-        analysis['sentiment_analysis'] = self.analyze_sentiment(user_answer)
-        analysis['complexity_metrics'] = self.analyze_complexity(user_answer)
+        analysis['sentiment_analysis'] = self.analyze_sentiment(user_answer, features)
+        analysis['complexity_metrics'] = self.analyze_complexity(user_answer, features)
         
         # Generate suggestions and strengths
         analysis['improvement_suggestions'] = self.generate_suggestions(analysis)
@@ -83,35 +177,45 @@ class AIAnalyzer:
         
         return analysis
     
-    def analyze_technical(self, question, answer, domain):
+    def analyze_batch(self, items, workers=0, chunk_size=64):
+        """Score many answers at once; see batch_analysis.run_batch"""
+        return run_batch(self, items, workers, chunk_size)
+    
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='technical')
+    def analyze_technical(self, question, answer, domain, features=None):
         """Analyze technical aspects of the response"""
         score = 0
-        expected_keywords = question.get('keywords', [])
-        answer_lower = answer.lower()
+        if features is None:
+            features = self.extract_features(answer, question.get('keywords', []))
+        matches = features.matches
         
-        # Keyword coverage
-        found_keywords = [kw for kw in expected_keywords if kw.lower() in answer_lower]
-        keyword_score = min(10, len(found_keywords) * 2)  # Max 10 points
+        # Keyword coverage, or how close the answer is to the topic when it paraphrases
+        found_keywords = matches.found_in('keywords')
+        relevance_score = 10 * get_relevance_index().credit(question, answer)
+        keyword_score = min(10, max(len(found_keywords) * 2, relevance_score))  # Max 10 points
         
         # Conceptual accuracy (basic checks)
         conceptual_score = 6  # Base score
-        if len(answer.split()) > 50:  # Substantive answer
+        if features.word_count > 50:  # Substantive answer
             conceptual_score += 2
-        if any(indicator in answer_lower for indicator in ['for example', 'for instance', 'such as']):
+        if matches.any('example'):
             conceptual_score += 1
-        if 'i don\'t know' not in answer_lower and 'not sure' not in answer_lower:
+        if not matches.any('uncertain'):
             conceptual_score += 1
         
         # Combine scores
         technical_score = (keyword_score * 0.4 + conceptual_score * 0.6)
         return min(10, technical_score)
     
-    def analyze_communication(self, answer):
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='communication')
+    def analyze_communication(self, answer, features=None):
         """Analyze communication skills"""
         score = 0
+        if features is None:
+            features = self.extract_features(answer)
         
         # Length analysis
-        word_count = len(answer.split())
+        word_count = features.word_count
         if 50 <= word_count <= 200:
             score += 3
         elif word_count > 200:
@@ -120,60 +224,62 @@ class AIAnalyzer:
             score += 1
         
         # Structure analysis
-        sentences = sent_tokenize(answer)
-        if len(sentences) >= 3:
+        sentence_count = features.sentence_count
+        if sentence_count >= 3:
             score += 3  # Good structure
-        elif len(sentences) >= 2:
+        elif sentence_count >= 2:
             score += 2
         else:
             score += 1
         
         # Professional tone
-        blob = TextBlob(answer)
-        polarity = blob.sentiment.polarity
+        polarity = features.sentiment['polarity']
         if -0.1 <= polarity <= 0.5:  # Neutral to positive
             score += 2
         else:
             score += 1
         
         # Conciseness
-        avg_sentence_length = word_count / len(sentences) if sentences else 0
+        avg_sentence_length = word_count / sentence_count if sentence_count else 0
         if 10 <= avg_sentence_length <= 25:
             score += 2
         
         return min(10, score)
     
-    def analyze_behavioral(self, answer, response_time):
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='behavioral')
+    def analyze_behavioral(self, answer, response_time, features=None):
         """Analyze behavioral aspects"""
         score = 0
+        if features is None:
+            features = self.extract_features(answer)
+        matches = features.matches
         
         # Confidence indicators
-        confidence_indicators = ['i am confident', 'i believe', 'my experience', 'i successfully']
-        if any(indicator in answer.lower() for indicator in confidence_indicators):
+        if matches.any('confidence'):
             score += 3
         
         # Story structure (STAR method indicators)
-        star_indicators = ['situation', 'task', 'action', 'result', 'challenge', 'solution']
-        star_count = sum(1 for indicator in star_indicators if indicator in answer.lower())
+        star_count = matches.count('star')
         score += min(3, star_count)
         
         # Response time consideration
-        if response_time < 300:  # Under 5 minutes
+        if response_time < self.RESPONSE_TIME_BUCKETS[0]:  # Under 5 minutes
             score += 2
-        elif response_time < 600:  # Under 10 minutes
+        elif response_time < self.RESPONSE_TIME_BUCKETS[1]:  # Under 10 minutes
             score += 1
         
         # Professionalism (avoid negative phrases)
-        negative_phrases = ["i can't", "i don't know", "not sure", "maybe", "perhaps"]
-        if not any(phrase in answer.lower() for phrase in negative_phrases):
+        if not matches.any('negative'):
             score += 2
         
         return min(10, score)
     
-    def analyze_sentiment(self, text):
-        """Perform sentiment analysis"""
+    def _sentiment_scores(self, text):
+        from textblob import TextBlob
         blob = TextBlob(text)
-        sia_scores = self.sia.polarity_scores(text)
+        sia_scores = self._primed_sentiment.get(text)
+        if sia_scores is None:
+            sia_scores = self.sia.polarity_scores(text)
         
         return {
             'polarity': blob.sentiment.polarity,
@@ -184,61 +290,79 @@ class AIAnalyzer:
             'neutral': sia_scores['neu']
         }
     
-    def analyze_complexity(self, text):
+    def prime_sentiment(self, texts):
+        """Score a batch of answers with VADER up front; an empty batch clears it"""
+        texts = [text for text in texts if text]
+        self._primed_sentiment = dict(zip(texts, self.sia.score_batch(texts))) if texts else {}
+    
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='sentiment')
+    def analyze_sentiment(self, text, features=None):
+        """Perform sentiment analysis"""
+        if features is None:
+            return self._sentiment_scores(text)
+        return dict(features.sentiment)
+    
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='AIAnalyzer', stage='complexity')
+    def analyze_complexity(self, text, features=None):
         """Analyze text complexity"""
-        sentences = sent_tokenize(text)
-        words = text.split()
+        if features is None:
+            features = self.extract_features(text)
         
-        if not sentences:
+        if not features.sentence_count:
             return {'sentence_count': 0, 'avg_sentence_length': 0, 'lexical_diversity': 0}
         
-        avg_sentence_length = len(words) / len(sentences)
-        lexical_diversity = len(set(words)) / len(words) if words else 0
+        avg_sentence_length = features.word_count / features.sentence_count
+        lexical_diversity = features.unique_word_count / features.word_count if features.word_count else 0
         
         return {
-            'sentence_count': len(sentences),
+            'sentence_count': features.sentence_count,
             'avg_sentence_length': round(avg_sentence_length, 2),
             'lexical_diversity': round(lexical_diversity, 2),
-            'word_count': len(words)
+            'word_count': features.word_count
         }
     
-    def get_technical_feedback(self, question, answer):
+    def get_technical_feedback(self, question, answer, features=None):
         feedback = []
-        expected_keywords = question.get('keywords', [])
-        found_keywords = [kw for kw in expected_keywords if kw.lower() in answer.lower()]
+        if features is None:
+            features = self.extract_features(answer, question.get('keywords', []))
+        found_keywords = features.matches.found_in('keywords')
         
         if found_keywords:
             feedback.append(f"Good use of technical terms: {', '.join(found_keywords)}")
         else:
             feedback.append("Include more domain-specific technical terms in your answer.")
         
-        if len(answer.split()) < 50:
+        if features.word_count < 50:
             feedback.append("Consider providing more detailed technical explanations.")
         
         return feedback
     
-    def get_communication_feedback(self, answer):
+    def get_communication_feedback(self, answer, features=None):
         feedback = []
-        word_count = len(answer.split())
+        if features is None:
+            features = self.extract_features(answer)
+        word_count = features.word_count
         
         if word_count < 50:
             feedback.append("Your answer is quite brief. Aim for 50-200 words for comprehensive responses.")
         elif word_count > 300:
             feedback.append("Your answer is very detailed. Consider being more concise while maintaining key points.")
         
-        sentences = sent_tokenize(answer)
-        if len(sentences) < 3:
+        if features.sentence_count < 3:
             feedback.append("Structure your answer with clear introduction, body, and conclusion.")
         
         return feedback
     
-    def get_behavioral_feedback(self, answer):
+    def get_behavioral_feedback(self, answer, features=None):
         feedback = []
+        if features is None:
+            features = self.extract_features(answer)
+        matches = features.matches
         
-        if 'situation' not in answer.lower() and 'challenge' not in answer.lower():
+        if not matches.has('situation') and not matches.has('challenge'):
             feedback.append("For behavioral questions, use the STAR method: Situation, Task, Action, Result.")
         
-        if 'i am confident' not in answer.lower():
+        if not matches.has('i am confident'):
             feedback.append("Express more confidence in your abilities and experiences.")
         
         return feedback
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+import answer_features
+import phrase_matcher
+import relevance_index
+import sentence_splitter
+import sentiment_lexicon
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_SIZE', 2048))  # 0 disables caching
+DEFAULT_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', 3600))
+
+# Files every analyzer's scores depend on besides its own module
+SCORING_SOURCES = (
+    answer_features.__file__, phrase_matcher.__file__, relevance_index.__file__, sentence_splitter.__file__,
+    sentiment_lexicon.__file__, 'data/evaluation_criteria.json', relevance_index.QUESTIONS_PATH
+)
+
+
+def normalize_answer(text):
+    """Drop differences no scorer sees: surrounding whitespace and CRLF line ends"""
+    return text.replace('\r\n', '\n').strip()
+
+
+class AnalysisCache:
+    """Bounded LRU/TTL cache of analysis results keyed by answer content.
+
+    Keys hash the normalized answer, the question's text and keywords, the
+    domain and the response-time bucket the analyzer scores by, so two inputs
+    share an entry only when they must get the same result. The scoring
+    source files are fingerprinted into every key and polled for changes;
+    when one changes on disk the cache empties itself.
+    """
+
+    def __init__(self, sources=SCORING_SOURCES, time_buckets=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 ttl=DEFAULT_TTL, check_interval=2.0):
+        self.files = tuple(sources)
+        self.time_buckets = tuple(time_buckets) if time_buckets is not None else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_check = time.time()
+        self._stamps = self._file_stamps()
+        self.version = self._fingerprint()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @classmethod
+    def for_analyzer(cls, analyzer_class, **kwargs):
+        """Cache versioned by the analyzer's own module plus the shared scoring files"""
+        sources = (inspect.getsourcefile(analyzer_class),) + SCORING_SOURCES
+        return cls(sources, getattr(analyzer_class, 'RESPONSE_TIME_BUCKETS', None), **kwargs)
+
+    def _file_stamps(self):
+        stamps = []
+        for path in self.files:
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _fingerprint(self):
+        digest = hashlib.sha256()
+        for path in self.files:
+            digest.update(path.encode('utf-8'))
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b'missing')
+        return digest.hexdigest()
+
+    def _maybe_invalidate(self):
+        now = time.time()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            stamps = self._file_stamps()
+            if stamps == self._stamps:
+                return
+            self._stamps = stamps
+            version = self._fingerprint()
+            if version != self.version:
+                self.version = version
+                self._entries.clear()
+                self.counters['invalidations'] += 1
+                print("Scoring inputs changed; analysis cache cleared")
+
+    def key(self, question, answer, domain, response_time):
+        if self.time_buckets is None:
+            bucket = response_time
+        else:
+            bucket = bisect_right(self.time_buckets, response_time)
+        payload = json.dumps(
+            [self.version, normalize_answer(answer), question.get('question', ''), list(question.get('keywords', [])),
+             domain, bucket],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Copy of the cached result, or None"""
+        if self.max_entries <= 0:
+            return None
+        self._maybe_invalidate()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                self.counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+        # Callers add speech metrics etc. to results, so never hand out the stored dict
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, result):
+        if self.max_entries <= 0:
+            return
+        entry = (time.time() + self.ttl, copy.deepcopy(result))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def fetch(self, compute, question, answer, domain, response_time):
+        """Return the cached result or run compute() on the normalized answer and cache it"""
+        answer = normalize_answer(answer)
+        key = self.key(question, answer, domain, response_time)
+        result = self.get(key)
+        if result is None:
+            result = compute(question, answer, domain, response_time)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        lookups = counters['hits'] + counters['misses']
+        counters.update({
+            'size': size,
+            'max_entries': self.max_entries,
+            'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0,
+            'version': self.version[:12]
+        })
+        return counters
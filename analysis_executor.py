@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis_cache import AnalysisCache
+from instrumentation import registry
+
+# Analyzer owned by each warm pool process
+_worker_analyzer = None
+
+
+def _load_analyzer_class(analyzer_path):
+    module_name, class_name = analyzer_path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _init_worker(analyzer_path, metrics_dir):
+    """Build the analyzer once per process and load its models before any job"""
+    global _worker_analyzer
+    registry.use_directory(metrics_dir)
+    _worker_analyzer = _load_analyzer_class(analyzer_path)()
+    warm_up = getattr(_worker_analyzer, 'warm_up', None)
+    if warm_up:
+        warm_up()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_job(question, user_answer, domain, response_time):
+    return _worker_analyzer.analyze_response(
+        question=question,
+        user_answer=user_answer,
+        domain=domain,
+        response_time=response_time
+    )
+
+
+class AnalysisExecutor:
+    """Persistent pool of warm analyzer processes with bounded queue depth.
+
+    ``analyze`` returns None instead of blocking when the pool is
+    saturated, the job overruns its timeout, or the pool has failed, so
+    the caller can fall back to a cheaper in-process analyzer. Results
+    are also cached here, so a repeated answer skips the round trip to
+    whichever worker scored it first.
+    """
+
+    def __init__(self, analyzer_path='ai_analyzer:AIAnalyzer', workers=2,
+                 max_pending=8, timeout=10.0, retry_after=60.0, metrics_dir=''):
+        self.analyzer_path = analyzer_path
+        self.metrics_dir = metrics_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._disabled_until = 0.0
+        self.stats = {'completed': 0, 'rejected': 0, 'timeouts': 0, 'failures': 0}
+        # Importing the class is cheap: models only load inside the workers
+        self.cache = AnalysisCache.for_analyzer(_load_analyzer_class(analyzer_path))
+        atexit.register(self.shutdown)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.analyzer_path, self.metrics_dir)
+                )
+            return self._pool
+
+    def warm_up(self, timeout=120):
+        """Start every worker and wait until each has loaded its models"""
+        try:
+            pool = self._get_pool()
+            futures = [pool.submit(_ping) for _ in range(self.workers)]
+            for future in futures:
+                future.result(timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"Analysis pool warm-up failed: {e}")
+            self._discard_pool()
+            return False
+
+    def _discard_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._disabled_until = time.time() + self.retry_after
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def available(self):
+        return time.time() >= self._disabled_until
+
+    def analyze(self, question, user_answer, domain, response_time):
+        key = self.cache.key(question, user_answer, domain, response_time)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.available():
+            return None
+
+        # Backpressure: never queue more than max_pending jobs
+        if not self._slots.acquire(blocking=False):
+            self.stats['rejected'] += 1
+            return None
+
+        try:
+            future = self._get_pool().submit(_run_job, question, user_answer, domain, response_time)
+        except Exception as e:
+            self._slots.release()
+            self.stats['failures'] += 1
+            print(f"Analysis pool unavailable: {e}")
+            self._discard_pool()
+            return None
+        # The slot stays taken until the job really finishes, even after a timeout
+        future.add_done_callback(lambda f: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+            self.stats['completed'] += 1
+            self.cache.put(key, result)
+            return result
+        except TimeoutError:
+            self.stats['timeouts'] += 1
+            print(f"Analysis job exceeded {self.timeout}s; using fallback analyzer")
+        except BrokenProcessPool as e:
+            self.stats['failures'] += 1
+            print(f"Analysis pool broke: {e}")
+            self._discard_pool()
+        except Exception as e:
+            self.stats['failures'] += 1
+            print(f"Analysis job failed: {e}")
+        return None
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+
+
+class AnalysisJobs:
+    """Runs answer analyses in the background and keeps their results by job ID.
+
+    Jobs live in this process's memory, so polling has to reach the same
+    app worker that accepted the answer (the default single gunicorn
+    worker does). Finished jobs are dropped after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_workers=4, ttl=900, max_jobs=1000):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        job_id = secrets.token_urlsafe(16)
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._purge()
+            self._jobs[job_id] = {'future': future, 'created': time.time()}
+        return job_id
+
+    def _purge(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['future'].done() and now - job['created'] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+        # Hard cap: drop the oldest finished jobs first
+        if len(self._jobs) > self.max_jobs:
+            finished = sorted((job['created'], job_id) for job_id, job in self._jobs.items()
+                              if job['future'].done())
+            for _, job_id in finished[:len(self._jobs) - self.max_jobs]:
+                del self._jobs[job_id]
+
+    def _snapshot(self, future):
+        if not future.done():
+            return {'status': 'pending'}
+        error = future.exception()
+        if error is not None:
+            return {'status': 'error', 'error': str(error)}
+        return {'status': 'done', 'result': future.result()}
+
+    def get(self, job_id):
+        """Return {'status': 'pending'|'done'|'error', ...} or None for an unknown job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return self._snapshot(job['future'])
+
+    def wait(self, job_id, timeout=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        wait_futures([job['future']], timeout=timeout)
+        return self._snapshot(job['future'])
+
+    def resolve(self, job_id, result):
+        """Record a result computed outside the pool, e.g. for a lost job analyzed again"""
+        future = Future()
+        future.set_result(result)
+        with self._lock:
+            self._jobs[job_id] = {'future': future, 'created': time.time()}
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
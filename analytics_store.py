@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from score_histograms import ScoreHistograms
+
+SCHEMA_VERSION = 4
+SCORE_COLUMNS = ('technical', 'communication', 'behavioral')
+NUMERIC_COLUMNS = SCORE_COLUMNS + ('word_count', 'response_time', 'answered_at')
+CATEGORY_COLUMNS = ('interview_id', 'domain', 'difficulty', 'interview_type', 'question_id')
+METRICS = ('overall',) + SCORE_COLUMNS + ('word_count', 'response_time')
+DIFFICULTY_BANDS = ('beginner', 'intermediate', 'advanced')
+SECONDS_PER_DAY = 86400
+
+
+class AnalyticsStore:
+    """Per-answer scores from every interview, held column by column.
+
+    Rows come from the interview log's 'answer' records, one per
+    interview id and entry index, and each
+    'interview' record adds its final scores, once per interview id, to
+    the histograms that completed interviews are ranked against. A refresher thread, started
+    on first use, reads only what was appended to each segment since its
+    last pass and periodically snapshots the columns (floats, plus integer
+    codes for the categorical ones) and histograms to an .npz file, so a
+    restart picks up where it left off instead of re-reading the whole log.
+    Queries never touch the disk: they filter what is already in memory
+    with NumPy masks and aggregate with bincount over integer group keys;
+    pandas, imported on first use, only shapes and ranks the much smaller
+    result tables.
+    """
+
+    def __init__(self, log, path, refresh_interval=2.0, save_interval=30.0,
+                 weights=(0.4, 0.3, 0.3)):
+        self.log = log
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.save_interval = save_interval
+        self.weights = weights
+        self._reset()
+        self._last_save = time.monotonic()
+        self._unsaved = False
+        self._clear()
+        self._load()
+        if hasattr(os, 'register_at_fork'):
+            # A forked child gets no copy of the parent's refresher
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+
+    def start(self):
+        """Start the refresher thread if this process has none"""
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name='analytics-refresh', daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Could not refresh analytics store: {e}")
+            time.sleep(self.refresh_interval)
+
+    def _clear(self):
+        self.columns = {name: np.empty(0, dtype=np.float64) for name in NUMERIC_COLUMNS}
+        self.codes = {name: np.empty(0, dtype=np.int32) for name in CATEGORY_COLUMNS}
+        # Position of each answer in its interview's conversation; -1 if the record predates it
+        self.entry_index = np.empty(0, dtype=np.int32)
+        self.answered = set()
+        self.categories = {name: [] for name in CATEGORY_COLUMNS}
+        self._lookup = {name: {} for name in CATEGORY_COLUMNS}
+        self.cursor = {}
+        self.histograms = ScoreHistograms()
+        self.counted = set()
+
+    def __len__(self):
+        return len(self.columns['technical'])
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as snapshot:
+                manifest = json.loads(str(snapshot['manifest']))
+                if manifest.get('schema') != SCHEMA_VERSION:
+                    return
+                columns = {name: snapshot[name] for name in NUMERIC_COLUMNS}
+                codes = {name: snapshot[f"{name}_codes"] for name in CATEGORY_COLUMNS}
+                entry_index = snapshot['entry_index']
+                histograms = ScoreHistograms()
+                if not histograms.load_arrays(manifest['histograms'], snapshot['histogram_counts']):
+                    return
+        except Exception as e:
+            print(f"Rebuilding analytics store, snapshot unreadable: {e}")
+            return
+        self.histograms = histograms
+        self.columns = columns
+        self.codes = codes
+        self.categories = manifest['categories']
+        self._lookup = {name: {value: code for code, value in enumerate(values)}
+                        for name, values in self.categories.items()}
+        self.cursor = manifest['cursor']
+        self.counted = set(manifest['interviews'])
+        self.entry_index = entry_index
+        interview_ids = self.categories['interview_id']
+        self.answered = {(interview_ids[code], index)
+                         for code, index in zip(codes['interview_id'].tolist(), entry_index.tolist()) if index >= 0}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            keys, histogram_counts = self.histograms.to_arrays()
+            manifest = json.dumps({'schema': SCHEMA_VERSION, 'categories': self.categories, 'cursor': self.cursor,
+                                   'histograms': keys, 'interviews': sorted(self.counted)})
+            arrays = dict(self.columns, histogram_counts=histogram_counts.copy(), entry_index=self.entry_index)
+            arrays.update({f"{name}_codes": codes for name, codes in self.codes.items()})
+            self._unsaved = False
+            self._last_save = time.monotonic()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, manifest=np.array(manifest), **arrays)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Could not save analytics store: {e}")
+
+    def refresh(self):
+        """Fold in answers logged since the last refresh; returns how many were added.
+
+        The refresher thread calls this; the segments are read and parsed
+        without the lock, which is only taken to append what was found.
+        """
+        with self._refresh_lock:
+            rows = []
+            interviews = []
+            cursor = {}
+            for path in self.log.segments():
+                name = os.path.basename(path)
+                # Only a refresh moves the cursor, and refreshes run one at a time
+                offset = self.cursor.get(name, 0)
+                try:
+                    if os.path.getsize(path) <= offset:
+                        continue
+                    with open(path, 'rb') as f:
+                        f.seek(offset)
+                        data = f.read()
+                except OSError as e:
+                    print(f"Could not read interview log segment {path}: {e}")
+                    continue
+                # Only whole lines; the writer may be halfway through the next one
+                end = data.rfind(b'\n') + 1
+                for line in data[:end].splitlines():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('kind') == 'interview':
+                        interviews.append(record)
+                        continue
+                    row = self._row(record)
+                    if row is not None:
+                        rows.append(row)
+                cursor[name] = offset + end
+            with self._lock:
+                answers = self._append(rows) if rows else 0
+                added = sum(self._add_interview(record) for record in interviews)
+                self.cursor = dict(self.cursor, **cursor)
+                if answers or added:
+                    self._unsaved = True
+                save = self._unsaved and time.monotonic() - self._last_save >= self.save_interval
+            if save:
+                self.save()
+        return answers
+
+    def _add_interview(self, record):
+        interview_id = record.get('interview_id')
+        if interview_id in self.counted:
+            # Logged twice; a candidate is ranked against once
+            return 0
+        results = record.get('results') or {}
+        if not (results.get('metrics') or {}).get('technical_scores'):
+            # Nothing was answered, so there is nothing to rank against
+            return 0
+        try:
+            self.histograms.add(results['domain'], results['difficulty'], results['scores'])
+        except (KeyError, TypeError, ValueError):
+            return 0
+        if interview_id:
+            self.counted.add(interview_id)
+        return 1
+
+    def percentiles(self, domain, difficulty, scores, min_population=1):
+        """Rank final scores against every completed interview the refresher has read with the same domain and difficulty"""
+        self.start()
+        with self._lock:
+            return self.histograms.percentiles(domain, difficulty, scores, min_population)
+
+    def _row(self, record):
+        if record.get('kind') != 'answer':
+            return None
+        scores = (record.get('analysis') or {}).get('scores')
+        if not scores:
+            return None
+        try:
+            answered_at = datetime.fromisoformat(record.get('answered_at') or record['logged_at']).timestamp()
+            numbers = [float(scores[name]) for name in SCORE_COLUMNS]
+            numbers += [float(record.get('word_count') or 0), float(record.get('response_time') or 0), answered_at]
+            entry_index = int(record.get('entry_index', -1))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return numbers, [str(record.get(name) or '') for name in CATEGORY_COLUMNS], entry_index
+
+    def _code(self, name, value):
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[name])
+            self.categories[name].append(value)
+        return code
+
+    def _append(self, rows):
+        """Add answers not seen before; returns how many were added"""
+        fresh = []
+        for row in rows:
+            if row[2] >= 0:
+                # A record logged twice has the same interview and entry index
+                key = (row[1][0], row[2])
+                if key in self.answered:
+                    continue
+                self.answered.add(key)
+            fresh.append(row)
+        if not fresh:
+            return 0
+        rows = fresh
+        self.entry_index = np.concatenate([self.entry_index, np.array([row[2] for row in rows], dtype=np.int32)])
+        numbers = np.array([row[0] for row in rows], dtype=np.float64)
+        for i, name in enumerate(NUMERIC_COLUMNS):
+            self.columns[name] = np.concatenate([self.columns[name], numbers[:, i]])
+        for i, name in enumerate(CATEGORY_COLUMNS):
+            codes = np.fromiter((self._code(name, row[1][i]) for row in rows), dtype=np.int32, count=len(rows))
+            self.codes[name] = np.concatenate([self.codes[name], codes])
+        return len(rows)
+
+    def select(self, fields, domain=None, difficulty=None, since=None):
+        """The named columns of the matching answers; 'overall' and 'week' (its Monday, in days) are derived"""
+        self.start()
+        wanted = set(fields)
+        if 'overall' in wanted:
+            wanted.update(SCORE_COLUMNS)
+        if 'week' in wanted:
+            wanted.add('answered_at')
+        with self._lock:
+            # Appends swap in new arrays, so these stay consistent with each other
+            columns = {name: self.columns[name] for name in NUMERIC_COLUMNS}
+            columns.update(self.codes)
+            categories = {name: list(self.categories[name]) for name in CATEGORY_COLUMNS
+                          if name in wanted or name in ('domain', 'difficulty')}
+
+        mask = None
+        for name, value in (('domain', domain), ('difficulty', difficulty)):
+            if not value:
+                continue
+            matches = columns[name] == (categories[name].index(value) if value in categories[name] else -1)
+            mask = matches if mask is None else mask & matches
+        if since is not None:
+            recent = columns['answered_at'] >= since.timestamp()
+            mask = recent if mask is None else mask & recent
+        # Only the columns the query reads are filtered
+        rows = None if mask is None else np.flatnonzero(mask)
+        columns = {name: columns[name] if rows is None else columns[name][rows]
+                   for name in wanted if name in columns}
+
+        if 'overall' in wanted:
+            columns['overall'] = (columns['technical'] * self.weights[0] + columns['communication'] * self.weights[1]
+                                  + columns['behavioral'] * self.weights[2])
+        if 'week' in wanted:
+            # Days since the epoch (a Thursday), back to that week's Monday
+            days = np.floor(columns['answered_at'] / SECONDS_PER_DAY).astype(np.int64)
+            columns['week'] = days - (days + 3) % 7
+        return columns, categories
+
+    def frame(self, **filters):
+        """Matching answers as a pandas DataFrame, for ad-hoc analysis"""
+        import pandas as pd
+
+        columns, categories = self.select(NUMERIC_COLUMNS + CATEGORY_COLUMNS + ('overall', 'week'), **filters)
+        data = {name: columns[name] for name in NUMERIC_COLUMNS + ('overall',)}
+        for name in CATEGORY_COLUMNS:
+            data[name] = pd.Categorical.from_codes(columns[name], categories=categories[name])
+        data['week'] = columns['week'].astype('datetime64[D]')
+        return pd.DataFrame(data)
+
+    def summary(self, **filters):
+        """Answers, interviews and mean of every metric per domain"""
+        import pandas as pd
+
+        columns, categories = self.select(METRICS + ('domain', 'interview_id'), **filters)
+        domains = len(categories['domain'])
+        table = _aggregate(columns['domain'], domains, {metric: columns[metric] for metric in METRICS})
+        # An interview has one domain; count each interview that has a matching answer once
+        interview_domain = np.zeros(len(categories['interview_id']), dtype=np.int64)
+        interview_domain[columns['interview_id']] = columns['domain']
+        seen = np.zeros(len(categories['interview_id']), dtype=bool)
+        seen[columns['interview_id']] = True
+        table['interviews'] = np.bincount(interview_domain[seen], minlength=domains)
+        table['domain'] = categories['domain']
+        table = pd.DataFrame(table)
+        return {
+            'answers': len(columns['technical']),
+            'interviews': int(seen.sum()),
+            'domains': _records(table[table['answers'] > 0])
+        }
+
+    def weekly(self, metric='technical', **filters):
+        """Mean of a metric per domain per week"""
+        import pandas as pd
+
+        columns, categories = self.select((metric, 'domain', 'week'), **filters)
+        if not len(columns['week']):
+            return []
+        first = columns['week'].min()
+        weeks = int((columns['week'].max() - first) // 7) + 1
+        key = columns['domain'].astype(np.int64) * weeks + (columns['week'] - first) // 7
+        table = pd.DataFrame(_aggregate(key, len(categories['domain']) * weeks, {metric: columns[metric]}))
+        table['domain'] = np.repeat(categories['domain'], weeks)
+        table['week'] = np.tile(first + 7 * np.arange(weeks), len(categories['domain'])).astype('datetime64[D]')
+        table = table[table['answers'] > 0]
+        table['week'] = table['week'].dt.strftime('%Y-%m-%d')
+        return _records(table[['domain', 'week', metric, 'answers']])
+
+    def question_calibration(self, min_answers=5, **filters):
+        """How each question actually scores, with the difficulty band its scores put it in within its domain.
+
+        Questions with at least min_answers answers are ranked by mean
+        overall score within their domain; the top third scores like a
+        beginner question, the bottom third like an advanced one.
+        """
+        import pandas as pd
+
+        fields = ('overall', 'technical', 'word_count', 'response_time')
+        columns, categories = self.select(fields + ('domain', 'question_id'), **filters)
+        questions = len(categories['question_id'])
+        table = _aggregate(columns['question_id'], questions, {metric: columns[metric] for metric in fields},
+                           spread='overall')
+        question_domain = np.zeros(questions, dtype=np.int64)
+        question_domain[columns['question_id']] = columns['domain']
+        table['question_id'] = categories['question_id']
+        table['domain'] = np.array(categories['domain'] or [''], dtype=object)[question_domain]
+        table = pd.DataFrame(table)
+        table = table[table['answers'] >= max(min_answers, 1)].copy()
+        if table.empty:
+            return []
+        rank = table.groupby('domain')['overall'].rank(ascending=False, pct=True).to_numpy()
+        band = np.minimum((rank * len(DIFFICULTY_BANDS) - 1e-9).astype(int), len(DIFFICULTY_BANDS) - 1)
+        table['observed_difficulty'] = [DIFFICULTY_BANDS[i] for i in band]
+        return _records(table.sort_values(['domain', 'overall'], ascending=[True, False]))
+
+
+def _aggregate(key, groups, values, spread=None):
+    """Count and mean of each value per integer group key, plus the standard deviation of one"""
+    counts = np.bincount(key, minlength=groups)
+    safe = np.maximum(counts, 1)
+    table = {'answers': counts}
+    for name, column in values.items():
+        table[name] = np.bincount(key, weights=column, minlength=groups) / safe
+    if spread is not None:
+        squares = np.bincount(key, weights=values[spread] ** 2, minlength=groups) / safe
+        variance = np.maximum(squares - table[spread] ** 2, 0) * counts / np.maximum(counts - 1, 1)
+        table[f"{spread}_std"] = np.where(counts > 1, np.sqrt(variance), np.nan)
+    return table
+
+
+def _records(frame):
+    """JSON-ready rows; floats rounded, NaN (a lone answer's std) as None"""
+    rows = []
+    for row in frame.to_dict('records'):
+        for key, value in row.items():
+            if isinstance(value, (float, np.floating)):
+                row[key] = None if np.isnan(value) else round(float(value), 3)
+            elif isinstance(value, np.integer):
+                row[key] = int(value)
+            elif not isinstance(value, (int, str)):
+                row[key] = str(value)
+        rows.append(row)
+    return rows
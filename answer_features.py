@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from types import MappingProxyType
+
+from phrase_matcher import match_answer
+from sentence_splitter import split_sentences as split_sentences_default
+
+
+class AnswerFeatures:
+    """Everything the scorers need from one answer, computed exactly once.
+
+    Tokens, sentences, counts, sentiment and phrase matches are built at
+    construction and the object is read-only afterwards, so one instance
+    can be handed to every scoring and feedback method.
+    """
+
+    __slots__ = (
+        'text', 'lower', 'tokens', 'word_count', 'unique_word_count',
+        'sentences', 'sentence_count', 'sentiment', 'matches'
+    )
+
+    def __init__(self, text, keywords=(), split_sentences=split_sentences_default, sentiment=None):
+        tokens = tuple(text.split())
+        sentences = tuple(split_sentences(text))
+        lower = text.lower()
+        scores = sentiment(text) if sentiment else {}
+
+        set_ = object.__setattr__
+        set_(self, 'text', text)
+        set_(self, 'lower', lower)
+        set_(self, 'tokens', tokens)
+        set_(self, 'word_count', len(tokens))
+        set_(self, 'unique_word_count', len(set(tokens)))
+        set_(self, 'sentences', sentences)
+        set_(self, 'sentence_count', len(sentences))
+        set_(self, 'sentiment', MappingProxyType(dict(scores)))
+        set_(self, 'matches', match_answer(text, keywords, answer_lower=lower))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AnswerFeatures is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('AnswerFeatures is immutable')
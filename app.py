@@ -1,13 +1,42 @@
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, request, jsonify, session, send_file, redirect
+import time
+BOOT_STARTED = time.perf_counter()  # Cold-start timings are reported at /health
+
+from flask import Flask, Response, g, render_template, request, jsonify, session, send_file, redirect
 import json
 import random
-import re
 import os
 from datetime import datetime, timedelta
 import io
 import math
+import secrets
+import threading
+
+import numpy as np
+
+from analysis_cache import AnalysisCache
+from analytics_store import METRICS as ANALYTICS_METRICS, AnalyticsStore
+from answer_features import AnswerFeatures
+from audio_uploads import AudioUploadStore, UploadError
+from analysis_executor import AnalysisExecutor
+from analysis_jobs import AnalysisJobs
+from batch_analysis import run_batch
+from draft_scoring import DraftScorer
+from interview_log import InterviewLog
+from instrumentation import (
+    ANALYSIS_LATENCY, ANALYSIS_STAGE_LATENCY, CONTENT_TYPE, FINAL_RESULTS_LATENCY,
+    REQUEST_LATENCY, REQUESTS, default_metrics_dir, registry as metrics_registry
+)
+from preload import preload_shared_data, process_memory
+from question_bank import QuestionBank
+from relevance_index import get_relevance_index, use_question_bank
+from report_pdf import ReportCache
+from sentence_splitter import split_sentences
+from sentiment_lexicon import LexiconScorer, vader_tokens
+from running_stats import new_metrics, stat_avg, stat_range, summarize, update_stat
+from session_store import ServerSideSessionInterface, create_session_backend
+from speech_metrics import SpeechProcessor, decode_audio_payload
 
 # Configuration class
 class Config:
@@ -19,10 +48,55 @@ class Config:
     TECHNICAL_WEIGHT = 0.4
     COMMUNICATION_WEIGHT = 0.3
     BEHAVIORAL_WEIGHT = 0.3
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'tiered')  # memory, sqlite or tiered
+    SESSION_DB_PATH = os.environ.get('SESSION_DB_PATH', 'data/sessions.sqlite3')
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 1000))
+    MAX_BATCH_SIZE = 5000
+    MAX_BATCH_WORKERS = int(os.environ.get('MAX_BATCH_WORKERS', 2))
+    ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 2))  # 0 disables the NLTK worker pool
+    ANALYSIS_MAX_PENDING = int(os.environ.get('ANALYSIS_MAX_PENDING', 8))
+    ANALYSIS_TIMEOUT = float(os.environ.get('ANALYSIS_TIMEOUT', 10))
+    ANALYSIS_STREAM_TIMEOUT = 60
+    WARM_UP_ON_BOOT = os.environ.get('WARM_UP_ON_BOOT', '1') == '1'
+    # Set by gunicorn.conf.py when the master preloads the app for its workers
+    PRELOAD_SHARED_DATA = os.environ.get('PRELOAD_SHARED_DATA', '0') == '1'
+    AUDIO_SPOOL_DIR = os.environ.get('AUDIO_SPOOL_DIR', 'data/audio_spool')
+    AUDIO_MAX_BYTES = int(os.environ.get('AUDIO_MAX_BYTES', 64 * 1024 * 1024))
+    AUDIO_SPOOL_TTL = int(os.environ.get('AUDIO_SPOOL_TTL', 86400))
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', 'data/cache/reports')
+    REPORT_CACHE_FILES = int(os.environ.get('REPORT_CACHE_FILES', 500))
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))  # view threads per worker under asgi.py
+    METRICS_DIR = os.environ.get('METRICS_DIR', default_metrics_dir())  # '' keeps metrics per process
+    INTERVIEW_LOG_DIR = os.environ.get('INTERVIEW_LOG_DIR', 'data/interview_log')  # '' disables the log
+    INTERVIEW_LOG_SEGMENT_BYTES = int(os.environ.get('INTERVIEW_LOG_SEGMENT_BYTES', 16 * 1024 * 1024))
+    INTERVIEW_LOG_FLUSH_INTERVAL = float(os.environ.get('INTERVIEW_LOG_FLUSH_INTERVAL', 1.0))
+    ANALYTICS_STORE_PATH = os.environ.get('ANALYTICS_STORE_PATH', 'data/cache/analytics.npz')
+    PERCENTILE_MIN_INTERVIEWS = int(os.environ.get('PERCENTILE_MIN_INTERVIEWS', 10))  # Fewer and no ranks are shown
+    MAX_AUDIO_UPLOADS = 20  # Open uploads kept per session
+    DRAFT_SCORE_RATE = float(os.environ.get('DRAFT_SCORE_RATE', 2.0))  # /score_draft calls per second per session
+    DRAFT_SCORE_BURST = int(os.environ.get('DRAFT_SCORE_BURST', 4))
+    DRAFT_MAX_CHARS = 20000
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(Config)
+metrics_registry.use_directory(app.config['METRICS_DIR'])
+
+# Keep interview state on the server; the cookie only holds the session ID
+app.session_interface = ServerSideSessionInterface(create_session_backend(
+    app.config['SESSION_BACKEND'],
+    app.config['SESSION_DB_PATH'],
+    app.config['SESSION_CACHE_SIZE']
+))
+
+# Seconds since the app module started importing, for cold-start diagnostics
+startup_stats = {
+    'app_ready': None,
+    'shared_data_preload': None,
+    'first_request': None,
+    'analyzer_warmup': None,
+    'first_analysis_latency': None
+}
 
 # Make session permanent
 @app.before_request
@@ -30,8 +104,33 @@ def make_session_permanent():
     session.permanent = True
     app.permanent_session_lifetime = timedelta(hours=2)
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_first_request(response):
+    g.response_status = response.status_code
+    if startup_stats['first_request'] is None:
+        startup_stats['first_request'] = round(time.perf_counter() - BOOT_STARTED, 3)
+        print(f"First request served {startup_stats['first_request']}s after boot")
+    return response
+
+@app.teardown_request
+def record_request_metrics(error=None):
+    # Teardown runs after the session is saved, so its cost is included
+    started = g.get('request_started')
+    if started is None:
+        return
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = g.get('response_status', 500)
+    REQUEST_LATENCY.observe(time.perf_counter() - started, route=route, method=request.method)
+    REQUESTS.inc(route=route, method=request.method, status=status)
+
 # Simple sentiment analysis without NLTK
 class SimpleSentimentAnalyzer:
+    """Share of positive and negative words, with VADER's negation and booster rules"""
+    
     def __init__(self):
         self.positive_words = set([
             'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 
@@ -45,15 +144,32 @@ class SimpleSentimentAnalyzer:
             'challenging', 'struggle', 'negative', 'unhappy', 'disappointed',
             'frustrated', 'concerned', 'worried', 'anxious', 'stress', 'stressful'
         ])
+        lexicon = dict.fromkeys(self.positive_words, 1.0)
+        lexicon.update(dict.fromkeys(self.negative_words, -1.0))
+        self.scorer = LexiconScorer(lexicon)
     
     def polarity_scores(self, text):
-        words = text.lower().split()
-        total_words = len(words)
+        # "not good" counts as negative and "good," as positive
+        sentiments = self.scorer.token_sentiments(vader_tokens(text))
+        pos_count = sum(1 for s in sentiments if s > 0)
+        neg_count = sum(1 for s in sentiments if s < 0)
+        return self._scores(len(text.split()), pos_count, neg_count)
+    
+    def score_batch(self, texts):
+        """polarity_scores for many texts in one vectorized pass"""
+        texts = list(texts)
+        sentiments, text_of, _ = self.scorer.batch_sentiments(texts)
+        pos_counts = np.bincount(text_of[sentiments > 0], minlength=len(texts)).tolist()
+        neg_counts = np.bincount(text_of[sentiments < 0], minlength=len(texts)).tolist()
+        return [
+            self._scores(len(text.split()), pos_counts[k], neg_counts[k])
+            for k, text in enumerate(texts)
+        ]
+    
+    @staticmethod
+    def _scores(total_words, pos_count, neg_count):
         if total_words == 0:
             return {'compound': 0.0, 'pos': 0.0, 'neg': 0.0, 'neu': 1.0}
-        
-        pos_count = sum(1 for word in words if word in self.positive_words)
-        neg_count = sum(1 for word in words if word in self.negative_words)
         neu_count = total_words - pos_count - neg_count
         
         # Calculate scores
@@ -73,29 +189,60 @@ class SimpleSentimentAnalyzer:
 
 # AI Analyzer without external dependencies
 class SimpleAIAnalyzer:
+    # Response-time threshold (seconds) _calculate_behavioral_score scores by
+    RESPONSE_TIME_BUCKETS = (180,)
+    
     def __init__(self):
         self.sentiment_analyzer = SimpleSentimentAnalyzer()
+        self._primed_sentiment = {}
+        self.cache = AnalysisCache.for_analyzer(SimpleAIAnalyzer)
         self.technical_keywords = {
             'software engineering': ['algorithm', 'database', 'api', 'framework', 'debugging', 'testing'],
             'data science': ['machine learning', 'statistics', 'python', 'analysis', 'visualization'],
             'product management': ['strategy', 'roadmap', 'user stories', 'metrics', 'prioritization']
         }
     
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='SimpleAIAnalyzer', stage='features')
+    def extract_features(self, answer, keywords=()):
+        """Tokenize, split, score sentiment and match phrases once per answer"""
+        return AnswerFeatures(
+            answer,
+            keywords,
+            split_sentences=split_sentences,
+            sentiment=self._sentiment_scores
+        )
+    
+    def _sentiment_scores(self, text):
+        scores = self._primed_sentiment.get(text)
+        return scores if scores is not None else self.sentiment_analyzer.polarity_scores(text)
+    
+    def prime_sentiment(self, texts):
+        """Score a batch of answers' sentiment up front; an empty batch clears it"""
+        texts = [text for text in texts if text]
+        self._primed_sentiment = dict(zip(texts, self.sentiment_analyzer.score_batch(texts))) if texts else {}
+    
     def analyze_response(self, question, user_answer, domain, response_time):
+        # Retries and pasted template answers come straight from the cache
+        return self.cache.fetch(self._analyze_response, question, user_answer, domain, response_time)
+    
+    def _analyze_response(self, question, user_answer, domain, response_time):
+        # Parse the answer once; every scorer reads from the same features
+        features = self.extract_features(user_answer, question.get('keywords', []))
+        
         # Calculate technical score based on keyword matching
-        tech_score = self._calculate_technical_score(question, user_answer, domain)
+        tech_score = self._calculate_technical_score(question, user_answer, domain, features)
         
         # Calculate communication score based on response quality
-        comm_score = self._calculate_communication_score(user_answer)
+        comm_score = self._calculate_communication_score(user_answer, features)
         
         # Calculate behavioral score
-        behav_score = self._calculate_behavioral_score(user_answer, response_time)
+        behav_score = self._calculate_behavioral_score(user_answer, response_time, features)
         
         # Sentiment analysis
-        sentiment = self.sentiment_analyzer.polarity_scores(user_answer)
+        sentiment = dict(features.sentiment)
         
         # Complexity metrics
-        complexity = self._calculate_complexity_metrics(user_answer)
+        complexity = self._calculate_complexity_metrics(user_answer, features)
         
         return {
             'scores': {
@@ -104,29 +251,39 @@ class SimpleAIAnalyzer:
                 'behavioral': round(behav_score, 1)
             },
             'detailed_feedback': {
-                'technical': self._get_technical_feedback(question, user_answer, domain),
-                'communication': self._get_communication_feedback(user_answer),
-                'behavioral': self._get_behavioral_feedback(user_answer)
+                'technical': self._get_technical_feedback(question, user_answer, domain, features),
+                'communication': self._get_communication_feedback(user_answer, features),
+                'behavioral': self._get_behavioral_feedback(user_answer, features)
             },
             'improvement_suggestions': self._get_improvement_suggestions(tech_score, comm_score, behav_score),
-            'strengths': self._identify_strengths(tech_score, comm_score, behav_score, user_answer),
+            'strengths': self._identify_strengths(tech_score, comm_score, behav_score, user_answer, features),
             'sentiment_analysis': sentiment,
             'complexity_metrics': complexity
         }
     
-    def _calculate_technical_score(self, question, answer, domain):
+    def analyze_batch(self, items, workers=0, chunk_size=64):
+        """Score many answers at once; see batch_analysis.run_batch"""
+        return run_batch(self, items, workers, chunk_size)
+    
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='SimpleAIAnalyzer', stage='technical')
+    def _calculate_technical_score(self, question, answer, domain, features=None):
+        if features is None:
+            features = self.extract_features(answer, question.get('keywords', []))
+        return self._technical_score(features, get_relevance_index().credit(question, answer))
+    
+    def _technical_score(self, features, relevance_credit):
+        """Technical score from an answer's features; also scores drafts from /score_draft"""
         base_score = 6.0  # Base score
         
         # Check for expected keywords
-        expected_keywords = question.get('keywords', [])
-        answer_lower = answer.lower()
-        found_keywords = [kw for kw in expected_keywords if kw.lower() in answer_lower]
+        found_keywords = features.matches.found_in('keywords')
         
-        # Keyword bonus
-        keyword_bonus = min(2.0, len(found_keywords) * 0.5)
+        # Keyword bonus; answers that paraphrase the topic earn it through relevance
+        relevance_bonus = 2.0 * relevance_credit
+        keyword_bonus = min(2.0, max(len(found_keywords) * 0.5, relevance_bonus))
         
         # Length bonus
-        word_count = len(answer.split())
+        word_count = features.word_count
         length_bonus = 0
         if word_count > 100:
             length_bonus = 2.0
@@ -134,23 +291,28 @@ class SimpleAIAnalyzer:
             length_bonus = 1.0
         
         # Example bonus
-        example_bonus = 1.0 if any(word in answer_lower for word in ['for example', 'for instance', 'such as']) else 0
+        example_bonus = 1.0 if features.matches.any('example') else 0
         
         return min(10.0, base_score + keyword_bonus + length_bonus + example_bonus)
     
-    def _calculate_communication_score(self, answer):
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='SimpleAIAnalyzer', stage='communication')
+    def _calculate_communication_score(self, answer, features=None):
+        if features is None:
+            features = self.extract_features(answer)
+        return self._communication_score(features)
+    
+    def _communication_score(self, features):
         score = 5.0  # Base score
         
         # Sentence structure
-        sentences = re.split(r'[.!?]+', answer)
-        sentence_count = len([s for s in sentences if s.strip()])
+        sentence_count = features.sentence_count
         if sentence_count >= 3:
             score += 2.0
         elif sentence_count >= 2:
             score += 1.0
         
         # Word count appropriateness
-        word_count = len(answer.split())
+        word_count = features.word_count
         if 50 <= word_count <= 200:
             score += 2.0
         elif word_count > 200:
@@ -159,93 +321,97 @@ class SimpleAIAnalyzer:
             score += 0.5
         
         # Professional tone (check for professional words)
-        professional_words = ['however', 'therefore', 'additionally', 'furthermore', 'consequently']
-        professional_bonus = sum(1 for word in professional_words if word in answer.lower()) * 0.5
+        professional_bonus = features.matches.count('professional') * 0.5
         score += min(1.0, professional_bonus)
         
         return min(10.0, score)
     
-    def _calculate_behavioral_score(self, answer, response_time):
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='SimpleAIAnalyzer', stage='behavioral')
+    def _calculate_behavioral_score(self, answer, response_time, features=None):
         score = 5.0  # Base score
+        if features is None:
+            features = self.extract_features(answer)
         
         # Confidence indicators
-        confidence_phrases = ['i am confident', 'i believe', 'my experience', 'i successfully']
-        if any(phrase in answer.lower() for phrase in confidence_phrases):
+        if features.matches.any('confidence'):
             score += 2.0
         
         # STAR method indicators
-        star_indicators = ['situation', 'task', 'action', 'result', 'challenge', 'solution']
-        star_count = sum(1 for indicator in star_indicators if indicator in answer.lower())
+        star_count = features.matches.count('star')
         score += min(2.0, star_count * 0.5)
         
         # Response time consideration
-        if response_time < 180:  # Under 3 minutes
+        if response_time < self.RESPONSE_TIME_BUCKETS[0]:  # Under 3 minutes
             score += 1.0
         
         # Positive language
-        sentiment = self.sentiment_analyzer.polarity_scores(answer)
-        if sentiment['compound'] > 0.1:
+        if features.sentiment['compound'] > 0.1:
             score += 1.0
         
         return min(10.0, score)
     
-    def _calculate_complexity_metrics(self, text):
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        words = text.split()
+    @ANALYSIS_STAGE_LATENCY.time(analyzer='SimpleAIAnalyzer', stage='complexity')
+    def _calculate_complexity_metrics(self, text, features=None):
+        if features is None:
+            features = self.extract_features(text)
         
-        if not sentences:
+        if not features.sentence_count:
             return {'sentence_count': 0, 'avg_sentence_length': 0, 'lexical_diversity': 0, 'word_count': 0}
         
-        avg_sentence_length = len(words) / len(sentences)
-        lexical_diversity = len(set(words)) / len(words) if words else 0
+        avg_sentence_length = features.word_count / features.sentence_count
+        lexical_diversity = features.unique_word_count / features.word_count if features.word_count else 0
         
         return {
-            'sentence_count': len(sentences),
+            'sentence_count': features.sentence_count,
             'avg_sentence_length': round(avg_sentence_length, 2),
             'lexical_diversity': round(lexical_diversity, 2),
-            'word_count': len(words)
+            'word_count': features.word_count
         }
     
-    def _get_technical_feedback(self, question, answer, domain):
+    def _get_technical_feedback(self, question, answer, domain, features=None):
         feedback = []
-        expected_keywords = question.get('keywords', [])
-        found_keywords = [kw for kw in expected_keywords if kw.lower() in answer.lower()]
+        if features is None:
+            features = self.extract_features(answer, question.get('keywords', []))
+        found_keywords = features.matches.found_in('keywords')
         
         if found_keywords:
             feedback.append(f"Good use of technical terms: {', '.join(found_keywords[:3])}")
         else:
             feedback.append("Include more domain-specific technical terms in your answer.")
         
-        if len(answer.split()) < 50:
+        if features.word_count < 50:
             feedback.append("Consider providing more detailed technical explanations.")
-        elif len(answer.split()) > 300:
+        elif features.word_count > 300:
             feedback.append("Your answer is quite detailed. Ensure you're staying focused on the key points.")
         
         return feedback
     
-    def _get_communication_feedback(self, answer):
+    def _get_communication_feedback(self, answer, features=None):
         feedback = []
-        word_count = len(answer.split())
+        if features is None:
+            features = self.extract_features(answer)
+        word_count = features.word_count
         
         if word_count < 50:
             feedback.append("Your answer is quite brief. Aim for 50-200 words for comprehensive responses.")
         elif word_count > 300:
             feedback.append("Your answer is very detailed. Consider being more concise while maintaining key points.")
         
-        sentences = re.split(r'[.!?]+', answer)
-        if len([s for s in sentences if s.strip()]) < 3:
+        if features.sentence_count < 3:
             feedback.append("Structure your answer with clear introduction, body, and conclusion.")
         
         return feedback
     
-    def _get_behavioral_feedback(self, answer):
+    def _get_behavioral_feedback(self, answer, features=None):
         feedback = []
+        if features is None:
+            features = self.extract_features(answer)
+        matches = features.matches
         
-        if 'situation' not in answer.lower() and 'challenge' not in answer.lower():
+        if not matches.has('situation') and not matches.has('challenge'):
             feedback.append("For behavioral questions, use the STAR method: Situation, Task, Action, Result.")
         
-        if 'i am confident' not in answer.lower():
+        if not matches.has('i am confident'):
             feedback.append("Express more confidence in your abilities and experiences.")
         
         return feedback
@@ -264,8 +430,10 @@ class SimpleAIAnalyzer:
         
         return suggestions
     
-    def _identify_strengths(self, tech_score, comm_score, behav_score, answer):
+    def _identify_strengths(self, tech_score, comm_score, behav_score, answer, features=None):
         strengths = []
+        if features is None:
+            features = self.extract_features(answer)
         
         if tech_score >= 8:
             strengths.append("Strong technical knowledge and terminology usage.")
@@ -276,28 +444,50 @@ class SimpleAIAnalyzer:
         if behav_score >= 8:
             strengths.append("Effective use of behavioral examples and professional tone.")
         
-        sentiment = self.sentiment_analyzer.polarity_scores(answer)
-        if sentiment['compound'] > 0.3:
+        if features.sentiment['compound'] > 0.3:
             strengths.append("Positive and enthusiastic tone throughout responses.")
         
         return strengths
 
-# Simple speech processor
-class SimpleSpeechProcessor:
-    def analyze_speech(self, audio_data):
-        return {
-            'audio_metrics': {
-                'duration_seconds': random.uniform(30, 120),
-                'sample_rate': 16000,
-                'frames': 1000,
-                'speaking_rate': random.uniform(120, 180)
-            },
-            'transcribed_text': '[Speech analysis would appear here]'
-        }
-
 # Initialize components
 ai_analyzer = SimpleAIAnalyzer()
-speech_processor = SimpleSpeechProcessor()
+speech_processor = SpeechProcessor()
+audio_store = AudioUploadStore(
+    app.config['AUDIO_SPOOL_DIR'],
+    max_bytes=app.config['AUDIO_MAX_BYTES'],
+    ttl=app.config['AUDIO_SPOOL_TTL']
+)
+report_cache = ReportCache(app.config['REPORT_CACHE_DIR'], app.config['REPORT_CACHE_FILES'])
+# Durable copy of every analysis and completed interview; sessions expire
+interview_log = InterviewLog(
+    app.config['INTERVIEW_LOG_DIR'],
+    segment_bytes=app.config['INTERVIEW_LOG_SEGMENT_BYTES'],
+    flush_interval=app.config['INTERVIEW_LOG_FLUSH_INTERVAL']
+)
+# Every logged answer as columns, for cross-interview aggregates
+analytics_store = AnalyticsStore(
+    interview_log,
+    app.config['ANALYTICS_STORE_PATH'],
+    weights=(app.config['TECHNICAL_WEIGHT'], app.config['COMMUNICATION_WEIGHT'], app.config['BEHAVIORAL_WEIGHT'])
+)
+
+# NLTK/TextBlob analysis runs in warm worker processes; SimpleAIAnalyzer
+# takes over when the pool is saturated, slow or unavailable
+analysis_executor = None
+if app.config['ANALYSIS_WORKERS'] > 0:
+    analysis_executor = AnalysisExecutor(
+        'ai_analyzer:AIAnalyzer',
+        workers=app.config['ANALYSIS_WORKERS'],
+        max_pending=app.config['ANALYSIS_MAX_PENDING'],
+        timeout=app.config['ANALYSIS_TIMEOUT'],
+        metrics_dir=app.config['METRICS_DIR']
+    )
+
+# Background analyses for answers submitted in async mode
+analysis_jobs = AnalysisJobs()
+
+# Provisional scores for the answer being typed
+draft_scorer = DraftScorer(rate=app.config['DRAFT_SCORE_RATE'], burst=app.config['DRAFT_SCORE_BURST'])
 
 # Domain functions
 def get_domain_icon(domain):
@@ -337,17 +527,6 @@ app.jinja_env.globals.update(
 )
 
 # Data loading functions
-def load_questions():
-    try:
-        with open('data/questions.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Questions file not found. Using default questions.")
-        return get_default_questions()
-    except Exception as e:
-        print(f"Error loading questions: {e}")
-        return get_default_questions()
-
 def get_default_questions():
     return {
         "domains": {
@@ -404,57 +583,236 @@ def get_default_questions():
         }
     }
 
+# Questions are parsed once and indexed; edits to the file are picked up by mtime
+question_bank = QuestionBank('data/questions.json', fallback=get_default_questions)
+use_question_bank(question_bank)
+
 # Helper functions
-def select_questions(domain_data, difficulty, interview_type):
+def select_questions(domain, difficulty, interview_type):
     """Select questions based on criteria"""
-    all_questions = domain_data.get('questions', [])
-    
-    # Filter by difficulty
-    filtered_questions = [q for q in all_questions if q.get('difficulty') == difficulty]
-    
-    if not filtered_questions:
-        filtered_questions = all_questions
-    
-    # Filter by type if specified
-    if interview_type != 'mixed':
-        filtered_questions = [q for q in filtered_questions if q.get('type') == interview_type]
+    # Indexed by (domain, difficulty, type); falls back to the whole domain
+    # when no question has the requested difficulty
+    filtered_questions = question_bank.candidates(domain, difficulty, interview_type)
     
     # Select random subset (3-5 questions for demo)
     num_questions = min(random.randint(3, 5), len(filtered_questions))
     return random.sample(filtered_questions, num_questions)
 
+def run_analysis(question, user_answer, domain, response_time):
+    """Analyze in the worker pool, falling back to the in-process analyzer"""
+    started = time.perf_counter()
+    result = None
+    path = 'pool'
+    if analysis_executor is not None:
+        result = analysis_executor.analyze(question, user_answer, domain, response_time)
+    if result is None:
+        path = 'fallback'
+        result = ai_analyzer.analyze_response(
+            question=question,
+            user_answer=user_answer,
+            domain=domain,
+            response_time=response_time
+        )
+    ANALYSIS_LATENCY.observe(time.perf_counter() - started, path=path)
+    
+    if startup_stats['first_analysis_latency'] is None:
+        startup_stats['first_analysis_latency'] = round(time.perf_counter() - started, 3)
+        print(f"First analysis took {startup_stats['first_analysis_latency']}s")
+    return result
+
+def analyze_answer(question, user_answer, domain, response_time, audio_data=None, audio_metrics=None):
+    """Score one answer and merge in speech metrics when audio was sent or uploaded"""
+    analysis_result = run_analysis(question, user_answer, domain, response_time)
+    if audio_metrics is not None:
+        analysis_result['audio_metrics'] = audio_metrics
+    elif audio_data:
+        # The answer text is the transcript the speaking rate is measured against
+        analysis_result.update(speech_processor.analyze_speech(audio_data, user_answer))
+    return analysis_result
+
+def question_metadata(question):
+    return {
+        'type': question.get('type', 'technical'),
+        'difficulty': question.get('difficulty', 'intermediate'),
+        'expected_time': question.get('expected_time', 120)
+    }
+
+def session_question(index):
+    """The session only stores question IDs; resolve one through the question bank"""
+    return question_bank.get_question(session['question_ids'][index])
+
+def question_entry(question):
+    """Conversation entry for an asked question, stored by ID"""
+    return {'type': 'question', 'question_id': question['id'], 'timestamp': datetime.now().isoformat()}
+
+def expand_conversation(conversation):
+    """Conversation as the frontend expects it, with question IDs resolved to text"""
+    expanded = []
+    for entry in conversation:
+        if entry.get('type') == 'question' and 'question_id' in entry:
+            question = question_bank.get_question(entry['question_id']) or {}
+            entry = {
+                'type': 'question',
+                'content': question.get('question', ''),
+                'metadata': question_metadata(question),
+                'timestamp': entry['timestamp']
+            }
+        expanded.append(entry)
+    return expanded
+
 def calculate_estimated_duration(questions):
     """Calculate total estimated interview duration"""
     return sum(q.get('expected_time', 120) for q in questions)
 
 def update_performance_metrics(analysis, word_count, response_time):
     """Update performance tracking metrics"""
-    metrics = session.get('performance_metrics', {
+    # Running aggregates, updated in O(1) per answer
+    metrics = session.get('performance_metrics') or new_metrics()
+    update_stat(metrics['technical'], analysis['scores']['technical'])
+    update_stat(metrics['communication'], analysis['scores']['communication'])
+    update_stat(metrics['behavioral'], analysis['scores']['behavioral'])
+    update_stat(metrics['word_count'], word_count)
+    update_stat(metrics['response_time'], response_time)
+    session['performance_metrics'] = metrics
+
+def collect_metric_series(conversation):
+    """Per-answer series for the results page charts, built in one pass"""
+    series = {
         'technical_scores': [],
         'communication_scores': [],
         'behavioral_scores': [],
         'word_counts': [],
         'response_times': []
+    }
+    for entry in conversation:
+        if entry.get('type') != 'answer' or not entry.get('analysis'):
+            continue
+        scores = entry['analysis']['scores']
+        series['technical_scores'].append(scores['technical'])
+        series['communication_scores'].append(scores['communication'])
+        series['behavioral_scores'].append(scores['behavioral'])
+        series['word_counts'].append(entry['word_count'])
+        series['response_times'].append(entry['response_time'])
+    return series
+
+def log_once(kind, key, record):
+    """Append to the interview log unless a concurrent request in this session already logged the same record"""
+    if app.session_interface.claim(session, f"log:{session.get('interview_id')}:{key}"):
+        interview_log.append(kind, record)
+
+def record_analysis(entry_index, analysis_result):
+    """Attach an analysis to its conversation entry, update the metrics and log it"""
+    entry = session['conversation'][entry_index]
+    entry['analysis'] = analysis_result
+    update_performance_metrics(analysis_result, entry['word_count'], entry['response_time'])
+    # /results, /download_report and a poll can settle the same job at once
+    log_once('answer', f"answer:{entry_index}", {
+        'interview_id': session.get('interview_id'),
+        'entry_index': entry_index,
+        'domain': session.get('domain'),
+        'difficulty': session.get('difficulty'),
+        'interview_type': session.get('interview_type'),
+        'question_id': entry.get('question_id'),
+        'word_count': entry['word_count'],
+        'response_time': entry['response_time'],
+        'answered_at': entry['timestamp'],
+        'analysis': analysis_result
     })
-    metrics['technical_scores'].append(analysis['scores']['technical'])
-    metrics['communication_scores'].append(analysis['scores']['communication'])
-    metrics['behavioral_scores'].append(analysis['scores']['behavioral'])
-    metrics['word_counts'].append(word_count)
-    metrics['response_times'].append(response_time)
-    session['performance_metrics'] = metrics
 
+def settle_pending_analyses(wait=False):
+    """Fold finished background analyses into the session, in answer order"""
+    pending = session.get('pending_jobs')
+    if not pending:
+        return
+    settled = session.get('settled_jobs', {})
+    
+    while pending:
+        job = pending[0]
+        if wait:
+            state = analysis_jobs.wait(job['job_id'], timeout=app.config['ANALYSIS_TIMEOUT'])
+        else:
+            state = analysis_jobs.get(job['job_id'])
+        if state is not None and state['status'] == 'pending':
+            break
+        
+        if state is not None and state['status'] == 'done':
+            analysis_result = state['result']
+        else:
+            # Job failed or was lost (e.g. the worker restarted): analyze it here
+            analysis_result = reanalyze_job(job)
+        
+        record_analysis(job['entry_index'], analysis_result)
+        settled[job['job_id']] = job['entry_index']
+        analysis_jobs.discard(job['job_id'])
+        if job.get('audio_file'):
+            audio_store.discard(job['audio_file'])
+        pending.pop(0)
+    
+    session['pending_jobs'] = pending
+    session['settled_jobs'] = settled
+
+def keep_job_audio(job, audio_data, audio_metrics):
+    """Store a background job's audio inputs with it, so a lost job is re-analyzed with them"""
+    if audio_metrics is not None:
+        job['audio_metrics'] = audio_metrics
+    elif audio_data:
+        try:
+            # The recording can be megabytes, so it waits in the audio spool, not the session
+            job['audio_file'] = audio_store.keep(session.sid, decode_audio_payload(audio_data))
+        except ValueError as e:
+            job['audio_metrics'] = {'error': str(e)}
+        except OSError as e:
+            print(f"Could not keep audio for analysis job: {e}")
+
+def reanalyze_job(job):
+    """Analyze a failed or lost job's answer in this request, with the audio it was submitted with"""
+    entry = session['conversation'][job['entry_index']]
+    audio_data = None
+    if job.get('audio_file'):
+        try:
+            audio_data = audio_store.read(job['audio_file'])
+        except OSError as e:
+            print(f"Audio for analysis job {job['job_id']} is gone: {e}")
+    return analyze_answer(
+        session_question(job['question_index']),
+        entry['content'],
+        session.get('domain'),
+        entry['response_time'],
+        audio_data,
+        job.get('audio_metrics')
+    )
+
+def finalize_interview(wait=True):
+    """Compute final results once every answer has its analysis; wait=False leaves running analyses to a later call"""
+    if 'interview_results' in session:
+        return interview_results()
+    if session.get('current_question_index', 0) < len(session.get('question_ids', [])):
+        return None
+    # Every answer is in, so no /submit_answer can race this settle
+    settle_pending_analyses(wait=wait)
+    if session.get('pending_jobs'):
+        return None
+    results = calculate_final_results()
+    # The conversation is already in the session; don't store a second copy
+    session['interview_results'] = {key: value for key, value in results.items() if key != 'conversation'}
+    log_once('interview', 'interview', {'interview_id': session.get('interview_id'), 'results': results})
+    return results
+
+def interview_results():
+    """Stored final results with the conversation expanded back in"""
+    results = dict(session['interview_results'])
+    results['conversation'] = expand_conversation(session.get('conversation', []))
+    return results
+
+@FINAL_RESULTS_LATENCY.time()
 def calculate_final_results():
     """Calculate comprehensive final results"""
-    metrics = session.get('performance_metrics', {
-        'technical_scores': [],
-        'communication_scores': [],
-        'behavioral_scores': [],
-        'word_counts': [],
-        'response_times': []
-    })
+    metrics = session.get('performance_metrics') or new_metrics()
     conversation = session.get('conversation', [])
+    series = collect_metric_series(conversation)
+    aggregates = {name: summarize(stat) for name, stat in metrics.items()}
     
-    if not metrics['technical_scores']:
+    if not metrics['technical']['count']:
         return {
             'domain': session.get('domain', 'Unknown'),
             'difficulty': session.get('difficulty', 'intermediate'),
@@ -466,60 +824,78 @@ def calculate_final_results():
                 'communication': 0,
                 'behavioral': 0
             },
-            'metrics': metrics,
+            'metrics': series,
+            'aggregates': aggregates,
+            'percentiles': None,
             'insights': ['No data available for analysis'],
-            'conversation': conversation,
+            'conversation': expand_conversation(conversation),
             'recommendations': ['Complete an interview session to get recommendations']
         }
     
-    # Calculate averages
-    avg_technical = sum(metrics['technical_scores']) / len(metrics['technical_scores'])
-    avg_communication = sum(metrics['communication_scores']) / len(metrics['communication_scores'])
-    avg_behavioral = sum(metrics['behavioral_scores']) / len(metrics['behavioral_scores'])
+    # Averages come straight from the running aggregates
+    avg_technical = stat_avg(metrics['technical'])
+    avg_communication = stat_avg(metrics['communication'])
+    avg_behavioral = stat_avg(metrics['behavioral'])
     
     overall_score = (avg_technical * 0.4 + avg_communication * 0.3 + avg_behavioral * 0.3)
     
     # Performance insights
     insights = generate_insights(metrics, conversation)
+    scores = {
+        'overall': round(overall_score, 1),
+        'technical': round(avg_technical, 1),
+        'communication': round(avg_communication, 1),
+        'behavioral': round(avg_behavioral, 1)
+    }
     
     return {
         'domain': session.get('domain', 'Unknown'),
         'difficulty': session.get('difficulty', 'intermediate'),
         'interview_type': session.get('interview_type', 'mixed'),
         'completion_time': datetime.now().isoformat(),
-        'scores': {
-            'overall': round(overall_score, 1),
-            'technical': round(avg_technical, 1),
-            'communication': round(avg_communication, 1),
-            'behavioral': round(avg_behavioral, 1)
-        },
-        'metrics': metrics,
+        'scores': scores,
+        'metrics': series,
+        'aggregates': aggregates,
+        'percentiles': rank_scores(scores),
         'insights': insights,
-        'conversation': conversation,
+        'conversation': expand_conversation(conversation),
         'recommendations': generate_recommendations(metrics, insights)
     }
 
+def rank_scores(scores):
+    """Percentile of each final score among completed interviews with the same domain and difficulty"""
+    try:
+        return analytics_store.percentiles(
+            session.get('domain', 'Unknown'),
+            session.get('difficulty', 'intermediate'),
+            scores,
+            min_population=app.config['PERCENTILE_MIN_INTERVIEWS']
+        )
+    except Exception as e:
+        print(f"Error ranking scores: {e}")
+        return None
+
 def generate_insights(metrics, conversation):
     """Generate performance insights"""
     insights = []
     
     # Technical insight
-    tech_scores = metrics['technical_scores']
-    if len(tech_scores) > 1 and max(tech_scores) - min(tech_scores) > 3:
+    tech = metrics['technical']
+    if tech['count'] > 1 and stat_range(tech) > 3:
         insights.append("Your technical knowledge appears inconsistent across different topics.")
-    elif avg(tech_scores) > 8:
+    elif stat_avg(tech) > 8:
         insights.append("Strong technical foundation demonstrated throughout the interview.")
     
     # Communication insight
-    word_counts = metrics['word_counts']
-    if word_counts and max(word_counts) > 300:
+    word_counts = metrics['word_count']
+    if word_counts['count'] and word_counts['max'] > 300:
         insights.append("Some responses were too verbose. Work on being more concise.")
-    elif word_counts and avg(word_counts) < 50:
+    elif word_counts['count'] and stat_avg(word_counts) < 50:
         insights.append("Consider providing more detailed explanations in your responses.")
     
     # Behavioral insight
-    behavioral_scores = metrics['behavioral_scores']
-    if behavioral_scores and avg(behavioral_scores) < 6:
+    behavioral = metrics['behavioral']
+    if behavioral['count'] and stat_avg(behavioral) < 6:
         insights.append("Focus on structuring behavioral responses using the STAR method.")
     
     return insights
@@ -528,13 +904,13 @@ def generate_recommendations(metrics, insights):
     """Generate personalized recommendations"""
     recommendations = []
     
-    if metrics['technical_scores'] and avg(metrics['technical_scores']) < 7:
+    if metrics['technical']['count'] and stat_avg(metrics['technical']) < 7:
         recommendations.append("Practice explaining core concepts in your field using simple analogies.")
     
-    if metrics['communication_scores'] and avg(metrics['communication_scores']) < 7:
+    if metrics['communication']['count'] and stat_avg(metrics['communication']) < 7:
         recommendations.append("Work on structuring responses with clear introductions and conclusions.")
     
-    if metrics['response_times'] and avg(metrics['response_times']) > 150:
+    if metrics['response_time']['count'] and stat_avg(metrics['response_time']) > 150:
         recommendations.append("Practice thinking aloud to reduce response time while maintaining quality.")
     
     # Add insights as recommendations
@@ -542,29 +918,27 @@ def generate_recommendations(metrics, insights):
     
     return recommendations
 
-def avg(lst):
-    return sum(lst) / len(lst) if lst else 0
-
 # Routes
 @app.route('/')
 def index():
     session.clear()
-    questions_data = load_questions()
-    domains = list(questions_data['domains'].keys())
+    domains = question_bank.domains()
     return render_template('index.html', domains=domains)
 
 @app.route('/interview')
 def interview():
     """Interview page route"""
-    if 'questions' not in session:
+    if 'question_ids' not in session:
         return redirect('/')
     return render_template('interview.html')
 
 @app.route('/results')
 def results():
+    if 'question_ids' in session:
+        finalize_interview()
     if 'interview_results' not in session:
         return render_template('error.html', message="No interview results found.")
-    return render_template('results.html', results=session['interview_results'])
+    return render_template('results.html', results=interview_results())
 
 @app.route('/start_interview', methods=['POST'])
 def start_interview():
@@ -574,55 +948,37 @@ def start_interview():
         difficulty = data.get('difficulty', 'intermediate')
         interview_type = data.get('type', 'mixed')
         
-        questions_data = load_questions()
-        domain_data = questions_data['domains'].get(domain)
+        domain_data = question_bank.get_domain(domain)
         
         if not domain_data:
             return jsonify({'error': 'Domain not found'}), 400
         
         # Select questions based on type and difficulty
-        questions = select_questions(domain_data, difficulty, interview_type)
+        questions = select_questions(domain, difficulty, interview_type)
         
         if not questions:
             return jsonify({'error': 'No questions available for this configuration'}), 400
         
         # Initialize session
         session.clear()
+        session['interview_id'] = secrets.token_urlsafe(12)
         session['domain'] = domain
         session['difficulty'] = difficulty
         session['interview_type'] = interview_type
-        session['questions'] = questions
+        # IDs only; question text and metadata stay in the shared question bank
+        session['question_ids'] = [question['id'] for question in questions]
         session['current_question_index'] = 0
         session['start_time'] = datetime.now().isoformat()
         session['conversation'] = []
-        session['performance_metrics'] = {
-            'technical_scores': [],
-            'communication_scores': [],
-            'behavioral_scores': [],
-            'response_times': [],
-            'word_counts': []
-        }
+        session['performance_metrics'] = new_metrics()
         
         first_question = questions[0]
-        session['conversation'].append({
-            'type': 'question',
-            'content': first_question['question'],
-            'metadata': {
-                'type': first_question.get('type', 'technical'),
-                'difficulty': first_question.get('difficulty', 'intermediate'),
-                'expected_time': first_question.get('expected_time', 120)
-            },
-            'timestamp': datetime.now().isoformat()
-        })
+        session['conversation'].append(question_entry(first_question))
         
         return jsonify({
             'success': True,
             'question': first_question['question'],
-            'metadata': {
-                'type': first_question.get('type', 'technical'),
-                'difficulty': first_question.get('difficulty', 'intermediate'),
-                'expected_time': first_question.get('expected_time', 120)
-            },
+            'metadata': question_metadata(first_question),
             'total_questions': len(questions),
             'interview_duration': calculate_estimated_duration(questions)
         })
@@ -635,27 +991,23 @@ def start_interview():
 def get_current_question():
     """Get the current question from session"""
     try:
-        if 'questions' not in session:
+        if 'question_ids' not in session:
             return jsonify({'error': 'No active interview session'}), 400
         
         current_index = session.get('current_question_index', 0)
-        questions = session['questions']
+        total = len(session['question_ids'])
         
-        if current_index >= len(questions):
+        if current_index >= total:
             return jsonify({'interview_complete': True})
         
-        current_question = questions[current_index]
+        current_question = session_question(current_index)
         
         return jsonify({
             'question': current_question['question'],
-            'metadata': {
-                'type': current_question.get('type', 'technical'),
-                'difficulty': current_question.get('difficulty', 'intermediate'),
-                'expected_time': current_question.get('expected_time', 120)
-            },
+            'metadata': question_metadata(current_question),
             'current_progress': {
                 'current': current_index + 1,
-                'total': len(questions)
+                'total': total
             }
         })
         
@@ -666,83 +1018,97 @@ def get_current_question():
 @app.route('/submit_answer', methods=['POST'])
 def submit_answer():
     try:
-        if 'questions' not in session:
+        if 'question_ids' not in session:
             return jsonify({'error': 'No active interview session'}), 400
         
         data = request.get_json()
         user_answer = data.get('answer', '').strip()
         response_time = data.get('response_time', 0)
         audio_data = data.get('audio_data')  # Base64 encoded audio
+        audio_upload_id = data.get('audio_upload_id')  # From /save_audio
+        run_async = bool(data.get('async'))
         
         if not user_answer:
             return jsonify({'error': 'Empty response'}), 400
         
-        current_index = session['current_question_index']
-        current_question = session['questions'][current_index]
+        audio_metrics = None
+        if audio_upload_id:
+            upload = session.get('audio_uploads', {}).get(audio_upload_id)
+            if upload is None or not upload['finished']:
+                return jsonify({'error': 'Unknown or unfinished audio upload'}), 400
+            # Frame energies were computed as the chunks arrived; this only adds them up
+            audio_metrics = audio_store.metrics(upload, len(user_answer.split()))
+            release_upload(audio_upload_id)
         
-        # Analyze response using AI
-        analysis_result = ai_analyzer.analyze_response(
-            question=current_question,
-            user_answer=user_answer,
-            domain=session.get('domain'),
-            response_time=response_time
-        )
+        # Fold in any background analyses that finished since the last request
+        settle_pending_analyses()
         
-        # Process audio if provided
-        if audio_data:
-            speech_analysis = speech_processor.analyze_speech(audio_data)
-            analysis_result.update(speech_analysis)
+        current_index = session['current_question_index']
+        if current_index >= len(session['question_ids']):
+            return jsonify({'error': 'Interview already complete'}), 400
+        current_question = session_question(current_index)
+        word_count = len(user_answer.split())
         
-        # Update performance metrics
-        update_performance_metrics(analysis_result, len(user_answer.split()), response_time)
+        # The next question's draft starts from scratch
+        session.pop('answer_draft', None)
         
         # Add to conversation
         session['conversation'].append({
             'type': 'answer',
+            'question_id': current_question['id'],
             'content': user_answer,
-            'analysis': analysis_result,
+            'analysis': None,
             'response_time': response_time,
-            'word_count': len(user_answer.split()),
+            'word_count': word_count,
             'timestamp': datetime.now().isoformat()
         })
+        entry_index = len(session['conversation']) - 1
+        
+        response_data = {}
+        if run_async:
+            # Analysis finishes in the background; the client picks it up
+            # from /analysis/<job_id> while it shows the next question
+            job_id = analysis_jobs.submit(
+                analyze_answer, current_question, user_answer,
+                session.get('domain'), response_time, audio_data, audio_metrics
+            )
+            job = {
+                'job_id': job_id,
+                'question_index': current_index,
+                'entry_index': entry_index
+            }
+            keep_job_audio(job, audio_data, audio_metrics)
+            session.setdefault('pending_jobs', []).append(job)
+            response_data['job_id'] = job_id
+        else:
+            analysis_result = analyze_answer(
+                current_question, user_answer, session.get('domain'), response_time, audio_data, audio_metrics
+            )
+            record_analysis(entry_index, analysis_result)
+            response_data['analysis'] = analysis_result
         
         # Move to next question or complete interview
         session['current_question_index'] += 1
-        interview_complete = session['current_question_index'] >= len(session['questions'])
+        interview_complete = session['current_question_index'] >= len(session['question_ids'])
         
-        response_data = {
-            'analysis': analysis_result,
-            'interview_complete': interview_complete,
-            'current_progress': {
-                'current': session['current_question_index'],
-                'total': len(session['questions'])
-            }
+        response_data['interview_complete'] = interview_complete
+        response_data['current_progress'] = {
+            'current': session['current_question_index'],
+            'total': len(session['question_ids'])
         }
         
         if not interview_complete:
-            next_question = session['questions'][session['current_question_index']]
-            session['conversation'].append({
-                'type': 'question',
-                'content': next_question['question'],
-                'metadata': {
-                    'type': next_question.get('type', 'technical'),
-                    'difficulty': next_question.get('difficulty', 'intermediate'),
-                    'expected_time': next_question.get('expected_time', 120)
-                },
-                'timestamp': datetime.now().isoformat()
-            })
+            next_question = session_question(session['current_question_index'])
+            session['conversation'].append(question_entry(next_question))
             
             response_data['next_question'] = next_question['question']
-            response_data['metadata'] = {
-                'type': next_question.get('type', 'technical'),
-                'difficulty': next_question.get('difficulty', 'intermediate'),
-                'expected_time': next_question.get('expected_time', 120)
-            }
+            response_data['metadata'] = question_metadata(next_question)
         else:
-            # Calculate final results
-            final_results = calculate_final_results()
-            session['interview_results'] = final_results
-            response_data['final_results'] = final_results
+            # Final results wait until every background analysis has landed;
+            # the client fetches them from /analysis/<job_id> meanwhile
+            final_results = finalize_interview(wait=False)
+            if final_results:
+                response_data['final_results'] = final_results
         
         return jsonify(response_data)
         
@@ -750,25 +1116,348 @@ def submit_answer():
         print(f"Error submitting answer: {e}")
         return jsonify({'error': f'Analysis error: {str(e)}'}), 500
 
+@app.route('/score_draft', methods=['POST'])
+def score_draft():
+    """Provisional technical and communication scores for the answer being typed"""
+    try:
+        if 'question_ids' not in session:
+            return jsonify({'error': 'No active interview session'}), 400
+        
+        limiter, retry_after = draft_scorer.throttle(session.get('draft_limiter'))
+        session['draft_limiter'] = limiter
+        if retry_after:
+            response = jsonify({'error': 'Too many draft updates', 'retry_after': math.ceil(retry_after * 100) / 100})
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response, 429
+        
+        data = request.get_json(silent=True) or {}
+        draft = data.get('answer', '')
+        if not isinstance(draft, str):
+            return jsonify({'error': 'answer must be a string'}), 400
+        if len(draft) > app.config['DRAFT_MAX_CHARS']:
+            return jsonify({'error': 'Draft is too long'}), 413
+        
+        current_index = session.get('current_question_index', 0)
+        if current_index >= len(session['question_ids']):
+            return jsonify({'error': 'Interview already complete'}), 400
+        question = session_question(current_index)
+        
+        # Only the text typed since the last call is scanned
+        state, features, scanned = draft_scorer.update(session.get('answer_draft'), question, draft)
+        session['answer_draft'] = state
+        relevance_credit = get_relevance_index().credit_counts(question, features.word_counts)
+        
+        return jsonify({
+            'provisional': True,
+            'scores': {
+                'technical': round(ai_analyzer._technical_score(features, relevance_credit), 1),
+                'communication': round(ai_analyzer._communication_score(features), 1)
+            },
+            'word_count': features.word_count,
+            'sentence_count': features.sentence_count,
+            'keywords_found': features.matches.found_in('keywords'),
+            'scanned_chars': scanned
+        })
+        
+    except Exception as e:
+        print(f"Error scoring draft: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def find_pending_job(job_id):
+    for job in session.get('pending_jobs', []):
+        if job['job_id'] == job_id:
+            return job
+    return None
+
+def job_analysis(job_id):
+    """A job's analysis without touching the session: None if unknown, {'status': 'pending'} or the analysis"""
+    settled = session.get('settled_jobs', {})
+    if job_id in settled:
+        return session['conversation'][settled[job_id]]['analysis']
+    job = find_pending_job(job_id)
+    if job is None:
+        return None
+    state = analysis_jobs.get(job_id)
+    if state is not None and state['status'] == 'pending':
+        return state
+    if state is not None and state['status'] == 'done':
+        return state['result']
+    # Lost or failed: analyze it now and leave the result where the next settle finds it
+    analysis_result = reanalyze_job(job)
+    analysis_jobs.resolve(job_id, analysis_result)
+    return analysis_result
+
+@app.route('/analysis/<job_id>')
+def get_analysis(job_id):
+    """Poll for the result of an answer submitted with async mode"""
+    try:
+        if 'question_ids' not in session:
+            return jsonify({'error': 'No active interview session'}), 400
+        
+        # Reads the job without settling it: polls overlap the next
+        # /submit_answer, and that request folds finished jobs into the session
+        analysis = job_analysis(job_id)
+        if analysis is None:
+            return jsonify({'error': 'Unknown analysis job'}), 404
+        if analysis.get('status') == 'pending':
+            return jsonify({'status': 'pending'})
+        
+        interview_complete = session['current_question_index'] >= len(session['question_ids'])
+        response_data = {
+            'status': 'done',
+            'analysis': analysis,
+            'interview_complete': interview_complete
+        }
+        if interview_complete:
+            # Never waits on other jobs; until they finish the client polls again
+            final_results = finalize_interview(wait=False)
+            if final_results:
+                response_data['final_results'] = final_results
+        return jsonify(response_data)
+        
+    except Exception as e:
+        print(f"Error getting analysis: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analysis/<job_id>/stream')
+def stream_analysis(job_id):
+    """Server-Sent Events stream that delivers one analysis result"""
+    try:
+        if 'question_ids' not in session:
+            return jsonify({'error': 'No active interview session'}), 400
+        
+        settled = session.get('settled_jobs', {})
+        if job_id in settled:
+            # Already folded into the session; send it without waiting
+            payload = {'status': 'done', 'analysis': session['conversation'][settled[job_id]]['analysis']}
+            first_event = f"event: analysis\ndata: {json.dumps(payload)}\n\n"
+        elif find_pending_job(job_id) is None:
+            return jsonify({'error': 'Unknown analysis job'}), 404
+        else:
+            first_event = None
+    except Exception as e:
+        print(f"Error streaming analysis: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        if first_event is not None:
+            yield first_event
+            return
+        try:
+            deadline = datetime.now() + timedelta(seconds=app.config['ANALYSIS_STREAM_TIMEOUT'])
+            while datetime.now() < deadline:
+                job = analysis_jobs.wait(job_id, timeout=5)
+                if job is None:
+                    break
+                if job['status'] == 'pending':
+                    yield ': keep-alive\n\n'
+                    continue
+                if job['status'] == 'error':
+                    payload = {'status': 'error', 'error': job['error']}
+                else:
+                    payload = {'status': 'done', 'analysis': job['result']}
+                yield f"event: analysis\ndata: {json.dumps(payload)}\n\n"
+                return
+        except Exception as e:
+            print(f"Error streaming analysis: {e}")
+            yield f"event: analysis\ndata: {json.dumps({'status': 'error', 'error': str(e)})}\n\n"
+            return
+        # Lost or still running: the client falls back to polling
+        yield 'event: analysis\ndata: {"status": "pending"}\n\n'
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/analyze_batch', methods=['POST'])
+def analyze_batch():
+    """Score a batch of recorded answers, e.g. when recalibrating scoring"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('items')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Expected a non-empty list of items'}), 400
+        if len(items) > app.config['MAX_BATCH_SIZE']:
+            return jsonify({'error': f"Batch too large (max {app.config['MAX_BATCH_SIZE']} items)"}), 400
+        
+        try:
+            workers = int(data.get('workers', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'workers must be a number'}), 400
+        workers = max(0, min(workers, app.config['MAX_BATCH_WORKERS']))
+        return jsonify(ai_analyzer.analyze_batch(items, workers=workers))
+        
+    except Exception as e:
+        print(f"Error analyzing batch: {e}")
+        return jsonify({'error': f'Analysis error: {str(e)}'}), 500
+
+@app.route('/api/analytics')
+def analytics():
+    """Aggregates over every logged answer: ?view=summary, weekly (&metric=) or questions (&min_answers=)"""
+    view = request.args.get('view', 'summary')
+    metric = request.args.get('metric', 'technical')
+    filters = {
+        'domain': request.args.get('domain'),
+        'difficulty': request.args.get('difficulty')
+    }
+    try:
+        since = request.args.get('since')
+        filters['since'] = datetime.fromisoformat(since) if since else None
+        min_answers = int(request.args.get('min_answers', 5))
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO date and min_answers a number'}), 400
+    if view not in ('summary', 'weekly', 'questions'):
+        return jsonify({'error': 'view must be summary, weekly or questions'}), 400
+    if metric not in ANALYTICS_METRICS:
+        return jsonify({'error': f"metric must be one of {', '.join(ANALYTICS_METRICS)}"}), 400
+    
+    try:
+        started = time.perf_counter()
+        if view == 'summary':
+            data = analytics_store.summary(**filters)
+        elif view == 'weekly':
+            data = analytics_store.weekly(metric, **filters)
+        else:
+            data = analytics_store.question_calibration(min_answers, **filters)
+            for row in data:
+                question = question_bank.get_question(row['question_id']) or {}
+                row['question'] = question.get('question')
+                row['labeled_difficulty'] = question.get('difficulty')
+        return jsonify({
+            'view': view,
+            'filters': {key: str(value) for key, value in filters.items() if value},
+            'query_ms': round((time.perf_counter() - started) * 1000, 2),
+            'data': data
+        })
+    except ImportError as e:
+        print(f"Analytics unavailable: {e}")
+        return jsonify({'error': 'Analytics need pandas'}), 503
+    except Exception as e:
+        print(f"Error running analytics query: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def remember_upload(state):
+    uploads = session.setdefault('audio_uploads', {})
+    uploads[state['id']] = state
+    # Abandoned uploads are dropped oldest first; their spool files go with them
+    while len(uploads) > app.config['MAX_AUDIO_UPLOADS']:
+        oldest = min(uploads, key=lambda upload_id: uploads[upload_id]['created'])
+        audio_store.discard(uploads.pop(oldest))
+
+def release_upload(upload_id):
+    state = session.get('audio_uploads', {}).pop(upload_id, None)
+    if state is not None:
+        audio_store.discard(state)
+
 @app.route('/save_audio', methods=['POST'])
 def save_audio():
-    """Save audio recording"""
+    """Save a whole audio recording sent as base64 JSON"""
     try:
         data = request.get_json()
-        audio_data = data.get('audio_data')
-        return jsonify({'success': True, 'message': 'Audio saved'})
+        raw = decode_audio_payload(data.get('audio_data') or '')
+        if not raw:
+            return jsonify({'error': 'No audio data'}), 400
+        state = audio_store.store_whole(session.sid, raw)
+        remember_upload(state)
+        return jsonify({
+            'success': True,
+            'message': 'Audio saved',
+            'upload_id': state['id'],
+            'audio_metrics': audio_store.metrics(state)
+        })
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/save_audio/start', methods=['POST'])
+def start_audio_upload():
+    """Open a chunked upload; chunks then go to PUT /save_audio/<upload_id>/<seq>"""
+    try:
+        data = request.get_json(silent=True) or {}
+        state = audio_store.start(session.sid, data.get('format', 'pcm16'), data.get('sample_rate'))
+        remember_upload(state)
+        return jsonify({'upload_id': state['id'], 'max_bytes': audio_store.max_bytes})
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
+        print(f"Error starting audio upload: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/save_audio/<upload_id>/<int:seq>', methods=['PUT'])
+def upload_audio_chunk(upload_id, seq):
+    """Append one raw chunk; the body is streamed to disk, never held in memory"""
+    try:
+        state = session.get('audio_uploads', {}).get(upload_id)
+        if state is None:
+            return jsonify({'error': 'Unknown audio upload'}), 404
+        state = audio_store.append(state, seq, request.stream)
+        remember_upload(state)
+        return jsonify({
+            'upload_id': upload_id,
+            'next_seq': state['next_seq'],
+            'bytes': state['bytes'],
+            'audio_metrics': audio_store.metrics(state)
+        })
+    except UploadError as e:
+        return jsonify({'error': str(e), 'next_seq': state['next_seq']}), e.status
+    except Exception as e:
+        print(f"Error saving audio chunk: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/save_audio/<upload_id>/finish', methods=['POST'])
+def finish_audio_upload(upload_id):
+    """Close a chunked upload after checking its CRC-32 and chunk count"""
+    try:
+        state = session.get('audio_uploads', {}).get(upload_id)
+        if state is None:
+            return jsonify({'error': 'Unknown audio upload'}), 404
+        data = request.get_json(silent=True) or {}
+        state = audio_store.finish(state, data.get('crc32'), data.get('chunks'))
+        remember_upload(state)
+        return jsonify({
+            'success': True,
+            'upload_id': upload_id,
+            'audio_metrics': audio_store.metrics(state)
+        })
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        print(f"Error finishing audio upload: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/download_report')
 def download_report():
     """Generate and download PDF report"""
+    if 'question_ids' in session:
+        finalize_interview()
     if 'interview_results' not in session:
         return jsonify({'error': 'No results available'}), 400
     
+    results = interview_results()
+    try:
+        # Rendered once per completed interview, then served from disk
+        path, digest = report_cache.get(results)
+        return send_file(
+            path,
+            as_attachment=True,
+            download_name=f"interview_report_{results['completion_time'][:10]}_{digest[:8]}.pdf",
+            mimetype='application/pdf',
+            etag=digest,
+            conditional=True
+        )
+    except ImportError as e:
+        print(f"PDF report unavailable, sending text report: {e}")
+    except Exception as e:
+        print(f"Error generating PDF report: {e}")
+        return jsonify({'error': f'Report generation failed: {str(e)}'}), 500
+    
     try:
-        # Simple text report instead of PDF for now
-        results = session['interview_results']
+        # Plain-text report when reportlab or matplotlib isn't installed
         report_content = f"""
         AI Interview Performance Report
         ==============================
@@ -802,6 +1491,32 @@ def download_report():
         print(f"Error generating report: {e}")
         return jsonify({'error': f'Report generation failed: {str(e)}'}), 500
 
+@app.route('/health')
+def health():
+    """Liveness check with cold-start timings"""
+    return jsonify({
+        'status': 'ok',
+        'uptime_seconds': round(time.perf_counter() - BOOT_STARTED, 1),
+        'startup': startup_stats,
+        'analysis_pool': {
+            'enabled': analysis_executor is not None,
+            'available': analysis_executor.available() if analysis_executor else False,
+            'stats': analysis_executor.stats if analysis_executor else {}
+        },
+        'analysis_cache': {
+            'pool': analysis_executor.cache.stats() if analysis_executor else {},
+            'fallback': ai_analyzer.cache.stats()
+        },
+        'report_cache': report_cache.counters,
+        'interview_log': interview_log.stats(),
+        'memory': process_memory()
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint, summed over every app and analyzer process"""
+    return Response(metrics_registry.render(), content_type=CONTENT_TYPE)
+
 # Error handler
 @app.errorhandler(404)
 def not_found(error):
@@ -811,6 +1526,27 @@ def not_found(error):
 def internal_error(error):
     return render_template('error.html', message="Internal server error"), 500
 
+def warm_up_analyzers():
+    """Start the analyzer pool so the first candidate doesn't pay for loading models"""
+    started = time.perf_counter()
+    if analysis_executor.warm_up():
+        startup_stats['analyzer_warmup'] = round(time.perf_counter() - BOOT_STARTED, 3)
+        print(f"Analyzer pool warm in {time.perf_counter() - started:.2f}s")
+
+def start_background_tasks():
+    """Threads every serving process runs; a preloading master leaves them to each worker after the fork"""
+    analytics_store.start()
+    if analysis_executor is not None and app.config['WARM_UP_ON_BOOT']:
+        threading.Thread(target=warm_up_analyzers, name='analyzer-warmup', daemon=True).start()
+
+if app.config['PRELOAD_SHARED_DATA']:
+    startup_stats['shared_data_preload'] = preload_shared_data(
+        [question for questions in question_bank.index.by_domain.values() for question in questions]
+    )
+startup_stats['app_ready'] = round(time.perf_counter() - BOOT_STARTED, 3)
+if not app.config['PRELOAD_SHARED_DATA']:
+    start_background_tasks()
+
 # Only run if this file is executed directly
 if __name__ == '__main__':
     # Get port from environment variable or default to 5000
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+ASGI entry point: serves the Flask app from an event loop.
+
+    uvicorn asgi:app --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+
+Request bodies are received on the event loop and spooled (to disk past
+SPOOL_MEMORY bytes) before a view runs, so a candidate uploading audio over
+a slow connection costs a socket, not a thread. Views then run in a bounded
+thread pool, where session store reads and writes happen off the loop and
+answer analysis goes on to the analyzer processes as before. Files sent
+with send_file (the PDF report) are read in the pool block by block and
+written to the client from the loop; other streamed responses (the analysis
+event stream) produce each chunk in the pool and stop when the client
+disconnects.
+"""
+
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+
+SPOOL_MEMORY = 1024 * 1024
+FILE_BLOCK_SIZE = 64 * 1024
+
+
+class FileBody:
+    """wsgi.file_wrapper that hands the file back to the event loop instead of iterating it in a thread"""
+
+    def __init__(self, file, block_size=FILE_BLOCK_SIZE):
+        self.file = file
+        self.block_size = block_size
+
+    def __iter__(self):
+        while True:
+            data = self.file.read(self.block_size)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        if hasattr(self.file, 'close'):
+            self.file.close()
+
+
+class WSGIBridge:
+    """Runs a WSGI app under an ASGI server without holding a thread while the client is slow"""
+
+    def __init__(self, wsgi_app, threads=32, max_body=None):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_body = max_body
+        self._executor = None
+
+    @property
+    def executor(self):
+        # Created on first use, so preforking servers start the threads in each worker
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi-view')
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            await self._send_simple(send, 413, b'Request body too large')
+            return
+        if body is False:
+            # Client went away mid-upload
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            environ = self._environ(scope, body)
+            status, headers, iterable = await loop.run_in_executor(self.executor, self._call_app, environ)
+        except Exception as e:
+            body.close()
+            print(f"Error running request {scope['method']} {scope['path']}: {e}")
+            await self._send_simple(send, 500, b'Internal Server Error')
+            return
+
+        try:
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await self._send_body(loop, iterable, receive, send)
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.executor, iterable.close)
+            body.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        """Spool the request body as it arrives; None if it is too large, False if the client disconnected"""
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return False
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body is not None and size > self.max_body:
+                body.close()
+                return None
+            if chunk:
+                body.write(chunk)
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    def _environ(self, scope, body):
+        body.seek(0, 2)
+        body_size = body.tell()
+        body.seek(0)
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1] if server[1] is not None else 80),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(body_size),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+            'wsgi.file_wrapper': FileBody
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_LENGTH':
+                continue
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _call_app(self, environ):
+        """Run the view in a pool thread; returns the status, headers and the not yet consumed body"""
+        response = {}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return written.append
+
+        iterable = self.wsgi_app(environ, start_response)
+        if written:
+            iterable = _Prefixed(written, iterable)
+        return response['status'], response['headers'], iterable
+
+    async def _send_body(self, loop, iterable, receive, send):
+        if isinstance(iterable, (list, tuple)):
+            for chunk in iterable:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            if isinstance(iterable, FileBody):
+                read = lambda: iterable.file.read(iterable.block_size)  # noqa: E731
+            else:
+                iterator = iter(iterable)
+                read = lambda: next(iterator, b'')  # noqa: E731
+            while not disconnected.done():
+                chunk = await loop.run_in_executor(self.executor, read)
+                if not chunk:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+
+    async def _send_simple(self, send, status, text):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'text/plain'), (b'content-length', str(len(text)).encode('latin-1'))]
+        })
+        await send({'type': 'http.response.body', 'body': text})
+
+
+class _Prefixed:
+    """Body written through start_response's write() followed by the returned iterable"""
+
+    def __init__(self, written, iterable):
+        self.written = written
+        self.iterable = iterable
+
+    def __iter__(self):
+        yield from self.written
+        yield from self.iterable
+
+    def close(self):
+        if hasattr(self.iterable, 'close'):
+            self.iterable.close()
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+app = WSGIBridge(
+    flask_app,
+    threads=flask_app.config['ASGI_THREADS'],
+    # A base64-encoded recording posted to /save_audio is the largest legitimate body
+    max_body=flask_app.config['AUDIO_MAX_BYTES'] * 2
+)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import io
+import os
+import secrets
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from speech_metrics import (
+    DEFAULT_SAMPLE_RATE, SAMPLE_WIDTHS, frame_energies, frame_length_for, is_compressed, metrics_from_frames,
+    parse_wav_header, pcm_to_mono
+)
+
+HEADER_LIMIT = 64 * 1024  # A WAV header that hasn't shown up by now never will
+COPY_BUFFER = 64 * 1024
+FRAMES_PER_READ = 2048  # About a minute of audio decoded at a time, whatever the chunk size
+
+
+class UploadError(Exception):
+    """A chunk or finish request the store refuses; carries the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AudioUploadStore:
+    """Spools chunked audio uploads to disk and analyzes them as they arrive.
+
+    Upload state is a small dict the caller keeps in the session, so any
+    app worker can take the next chunk. Chunks are streamed to a spool
+    file under a per-session directory, and the energy of every complete
+    frame is appended to a sidecar file as soon as its bytes land. Memory
+    per upload stays constant, and speech metrics are available from the
+    first chunk on.
+    """
+
+    purge_interval = 600
+
+    def __init__(self, directory='data/audio_spool', max_bytes=64 * 1024 * 1024, ttl=86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._last_purge = 0.0
+
+    def _paths(self, state):
+        base = os.path.join(self.directory, state['owner'], state['id'])
+        return base + '.audio', base + '.frames'
+
+    def start(self, sid, audio_format='wav', sample_rate=None):
+        """New upload; 'pcm16' needs the sample rate, 'wav' reads it from the header"""
+        if audio_format == 'pcm16':
+            try:
+                sample_rate = int(sample_rate)
+            except (TypeError, ValueError):
+                sample_rate = 0
+            if not 1000 <= sample_rate <= 384000:
+                raise UploadError('pcm16 uploads need a sample_rate')
+            header = {'audio_format': 1, 'channels': 1, 'sample_rate': sample_rate, 'bits': 16,
+                      'data_offset': 0, 'data_size': None}
+        elif audio_format == 'wav':
+            header = None
+        else:
+            raise UploadError('format must be wav or pcm16')
+
+        self._maybe_purge()
+        state = {
+            'id': secrets.token_urlsafe(12),
+            'owner': hashlib.sha256(sid.encode('utf-8')).hexdigest()[:16],
+            'header': header,
+            'next_seq': 0,
+            'bytes': 0,
+            'crc32': 0,
+            'finished': False,
+            'created': time.time()
+        }
+        spool_path, frames_path = self._paths(state)
+        os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        open(spool_path, 'wb').close()
+        open(frames_path, 'wb').close()
+        return state
+
+    def append(self, state, seq, stream):
+        """Stream one chunk to the spool file and return the updated state"""
+        if state['finished']:
+            raise UploadError('Upload already finished', 409)
+        if seq < state['next_seq']:
+            # A retry of a chunk that already landed
+            return state
+        if seq != state['next_seq']:
+            raise UploadError(f"Expected chunk {state['next_seq']}", 409)
+
+        spool_path, _ = self._paths(state)
+        size = state['bytes']
+        crc = state['crc32']
+        with open(spool_path, 'r+b') as f:
+            # Drop anything a failed earlier request wrote past the last good chunk
+            f.seek(size)
+            f.truncate()
+            while True:
+                piece = stream.read(COPY_BUFFER)
+                if not piece:
+                    break
+                size += len(piece)
+                if size > self.max_bytes:
+                    f.truncate(state['bytes'])
+                    raise UploadError('Recording is too large', 413)
+                crc = zlib.crc32(piece, crc)
+                f.write(piece)
+
+        state = dict(state, next_seq=seq + 1, bytes=size, crc32=crc)
+        self._analyze_new_frames(state)
+        return state
+
+    def _read_header(self, state):
+        spool_path, _ = self._paths(state)
+        with open(spool_path, 'rb') as f:
+            prefix = f.read(min(state['bytes'], HEADER_LIMIT))
+        if is_compressed(prefix):
+            raise UploadError('Compressed audio is not supported; send WAV or 16-bit PCM', 415)
+        try:
+            header = parse_wav_header(prefix)
+        except (ValueError, struct.error) as e:
+            raise UploadError(str(e), 415)
+        if header is None:
+            if state['bytes'] >= HEADER_LIMIT:
+                raise UploadError('No WAV header found', 415)
+            return None
+        if (not header['channels'] or not header['sample_rate']
+                or header['bits'] not in SAMPLE_WIDTHS.get(header['audio_format'], ())):
+            raise UploadError('Unsupported WAV format', 415)
+        return header
+
+    def _data_end(self, state):
+        header = state['header']
+        if header['data_size'] is None:
+            return state['bytes']
+        return min(state['bytes'], header['data_offset'] + header['data_size'])
+
+    def _analyze_new_frames(self, state):
+        """Add the energy of every frame completed by the new bytes to the sidecar file"""
+        if state['header'] is None:
+            state['header'] = self._read_header(state)
+            if state['header'] is None:
+                return
+        header = state['header']
+        block = header['channels'] * header['bits'] // 8
+        frame_length = frame_length_for(header['sample_rate'])
+        frame_bytes = frame_length * block
+
+        spool_path, frames_path = self._paths(state)
+        with open(spool_path, 'rb') as spool, open(frames_path, 'r+b') as frames:
+            # Frames already analyzed are whatever the sidecar holds; a torn write is dropped
+            done = os.fstat(frames.fileno()).st_size // 8
+            frames.seek(done * 8)
+            frames.truncate()
+            remaining = (self._data_end(state) - header['data_offset']) // frame_bytes - done
+            spool.seek(header['data_offset'] + done * frame_bytes)
+            while remaining > 0:
+                count = min(remaining, FRAMES_PER_READ)
+                data = spool.read(count * frame_bytes)
+                samples = pcm_to_mono(data, header['audio_format'], header['channels'], header['bits'])
+                frames.write(frame_energies(samples, frame_length).tobytes())
+                remaining -= count
+
+    def metrics(self, state, word_count=0):
+        """Speech metrics for everything received so far"""
+        header = state['header']
+        if header is None:
+            return {'error': 'No audio received'}
+        _, frames_path = self._paths(state)
+        energies = np.fromfile(frames_path, dtype=np.float64)
+        block = header['channels'] * header['bits'] // 8
+        total_samples = (self._data_end(state) - header['data_offset']) // block
+        return metrics_from_frames(energies, header['sample_rate'], total_samples, word_count)
+
+    def finish(self, state, crc32, chunks=None):
+        """Verify the upload against the client's CRC-32 and chunk count, then close it"""
+        try:
+            expected = int(crc32) & 0xFFFFFFFF
+            chunks = None if chunks is None else int(chunks)
+        except (TypeError, ValueError):
+            raise UploadError('crc32 and chunks must be integers')
+        if chunks is not None and chunks != state['next_seq']:
+            raise UploadError(f"Received {state['next_seq']} of {chunks} chunks", 409)
+        if expected != state['crc32']:
+            raise UploadError('Checksum mismatch; the recording was corrupted in transit', 422)
+        if state['header'] is None:
+            raise UploadError('No audio received', 415)
+        return dict(state, finished=True)
+
+    def keep(self, sid, raw):
+        """Spool a recording as it is, without analyzing it; read it back with ``read``"""
+        self._maybe_purge()
+        state = {
+            'id': secrets.token_urlsafe(12),
+            'owner': hashlib.sha256(sid.encode('utf-8')).hexdigest()[:16],
+            'created': time.time()
+        }
+        spool_path, _ = self._paths(state)
+        os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        with open(spool_path, 'wb') as f:
+            f.write(raw)
+        return state
+
+    def read(self, state):
+        spool_path, _ = self._paths(state)
+        with open(spool_path, 'rb') as f:
+            return f.read()
+
+    def store_whole(self, sid, raw):
+        """Spool a recording that arrived in one piece; returns the finished state"""
+        if is_compressed(raw):
+            raise UploadError('Compressed audio is not supported; send WAV or 16-bit PCM', 415)
+        audio_format = 'wav' if raw[:4] == b'RIFF' else 'pcm16'
+        state = self.start(sid, audio_format, DEFAULT_SAMPLE_RATE)
+        try:
+            state = self.append(state, 0, io.BytesIO(raw))
+            return self.finish(state, zlib.crc32(raw), 1)
+        except UploadError:
+            self.discard(state)
+            raise
+
+    def discard(self, state):
+        for path in self._paths(state):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        if not os.path.isdir(self.directory):
+            return
+        for owner in os.listdir(self.directory):
+            owner_dir = os.path.join(self.directory, owner)
+            try:
+                for name in os.listdir(owner_dir):
+                    path = os.path.join(owner_dir, name)
+                    if now - os.path.getmtime(path) > self.ttl:
+                        os.remove(path)
+                if not os.listdir(owner_dir):
+                    os.rmdir(owner_dir)
+            except OSError as e:
+                print(f"Error purging audio spool: {e}")
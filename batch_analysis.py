@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis_cache import normalize_answer
+from phrase_matcher import get_answer_matcher
+
+# Analyzer instance owned by each pool process
+_worker_analyzer = None
+
+
+def _init_worker(analyzer_class):
+    global _worker_analyzer
+    _worker_analyzer = analyzer_class()
+
+
+def _score_chunk(items):
+    _prime_sentiment(_worker_analyzer, items)
+    try:
+        return [_score_item(_worker_analyzer, item) for item in items]
+    finally:
+        _prime_sentiment(_worker_analyzer, ())
+
+
+def _prime_sentiment(analyzer, items):
+    # Analyzers with a batch sentiment scorer score every answer in one pass
+    prime = getattr(analyzer, 'prime_sentiment', None)
+    if prime is not None:
+        prime([normalize_answer(item['answer']) for item in items if isinstance(item.get('answer'), str)])
+
+
+def _score_item(analyzer, item):
+    try:
+        question = item.get('question') or {}
+        if isinstance(question, str):
+            question = {'question': question, 'keywords': item.get('keywords', [])}
+        answer = (item.get('answer') or '').strip()
+        if not answer:
+            return {'error': 'Empty response'}
+        return analyzer.analyze_response(
+            question=question,
+            user_answer=answer,
+            domain=item.get('domain'),
+            response_time=item.get('response_time', 0)
+        )
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run_batch(analyzer, items, workers=0, chunk_size=64):
+    """Score a list of answers with one analyzer.
+
+    Each item is a dict with 'question' (a question dict, or its text plus
+    'keywords'), 'answer', 'domain' and 'response_time'. Results keep the
+    order of the items; an item that fails carries an 'error' instead of
+    scores. With workers > 1 the chunks are spread over a process pool
+    whose processes each build their own analyzer once.
+    """
+    items = list(items)
+    started = time.perf_counter()
+
+    # Shared setup: compile each distinct keyword matcher once up front
+    for item in items:
+        question = item.get('question')
+        keywords = question.get('keywords', []) if isinstance(question, dict) else item.get('keywords', [])
+        get_answer_matcher(tuple(keywords))
+
+    workers = min(int(workers or 0), os.cpu_count() or 1)
+    if workers > 1 and len(items) > chunk_size:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(type(analyzer),)
+        ) as pool:
+            results = []
+            for chunk_results in pool.map(_score_chunk, _chunks(items, chunk_size)):
+                results.extend(chunk_results)
+    else:
+        workers = 1
+        _prime_sentiment(analyzer, items)
+        try:
+            results = [_score_item(analyzer, item) for item in items]
+        finally:
+            _prime_sentiment(analyzer, ())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'results': results,
+        'stats': {
+            'count': len(items),
+            'errors': sum(1 for r in results if 'error' in r),
+            'workers': workers,
+            'elapsed_seconds': round(elapsed, 4),
+            'answers_per_second': round(len(items) / elapsed, 1) if elapsed > 0 else 0
+        }
+    }
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent interviews per worker with slow clients, sync vs ASGI serving.
+
+Starts one worker under gunicorn's sync worker (app:app) and one under
+uvicorn's worker (asgi:app), then runs the same number of simulated
+candidates against each at once. Every candidate records each answer as a
+chunked upload sent over a slow connection (--upload-seconds per answer),
+submits it with the answer text after a random pause to think, and
+downloads the report at the end. A sync worker sits on one upload until its
+last byte arrives, so quick requests from every other candidate (starting,
+submitting, downloading) queue behind it; the ASGI worker receives uploads
+on its event loop and keeps answering the others. Linux/macOS only.
+
+    python benchmarks/async_load.py --clients 16 --upload-seconds 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+from preload_memory import free_port, wait_until_up
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'sync': ['app:app'],
+    'asgi': ['asgi:app', '--worker-class', 'uvicorn.workers.UvicornWorker']
+}
+
+ANSWER = ('I would start by profiling the service to find the bottleneck, for example with '
+          'a flame graph, then cache the hot queries and add tests before refactoring. ') * 3
+
+
+async def http(port, method, path, cookie=None, payload=None, body=b'', upload_seconds=0.0,
+               content_type='application/json'):
+    """One request on its own connection; the body is trickled out over upload_seconds"""
+    if payload is not None:
+        body = json.dumps(payload).encode('utf-8')
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = [f"{method} {path} HTTP/1.1", f"Host: 127.0.0.1:{port}", 'Connection: close',
+                f"Content-Length: {len(body)}", f"Content-Type: {content_type}"]
+        if cookie:
+            head.append(f"Cookie: {cookie}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        pieces = 20 if upload_seconds > 0 and body else 1
+        step = -(-len(body) // pieces) if body else 0
+        for start in range(0, len(body), step or 1):
+            writer.write(body[start:start + step])
+            await writer.drain()
+            if pieces > 1:
+                await asyncio.sleep(upload_seconds / pieces)
+        raw = await reader.read()
+    finally:
+        writer.close()
+
+    header, _, content = raw.partition(b'\r\n\r\n')
+    lines = header.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    set_cookie = None
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.lower() == 'set-cookie':
+            set_cookie = value.strip().split(';', 1)[0]
+    return status, content, set_cookie
+
+
+async def interview(port, upload_bytes, upload_seconds, think_seconds, rng, latencies):
+    """One candidate from start to report; returns its answers, seconds taken and seconds it spent itself"""
+    began = time.perf_counter()
+    status, _, cookie = await http(port, 'POST', '/start_interview',
+                                   payload={'domain': 'Software Engineering', 'difficulty': 'intermediate',
+                                            'type': 'mixed'})
+    if status != 200:
+        raise RuntimeError(f"start_interview returned {status}")
+
+    recording = bytes(range(256)) * (upload_bytes // 256)
+    answers = 0
+    # Thinking and uploading: how long the interview takes on an idle server
+    floor = 0.0
+    while True:
+        pause = rng.uniform(0, think_seconds)
+        floor += pause + upload_seconds
+        await asyncio.sleep(pause)
+        _, content, _ = await http(port, 'POST', '/save_audio/start', cookie,
+                                   payload={'format': 'pcm16', 'sample_rate': 16000})
+        upload_id = json.loads(content)['upload_id']
+        status, _, _ = await http(port, 'PUT', f"/save_audio/{upload_id}/0", cookie, body=recording,
+                                  upload_seconds=upload_seconds, content_type='application/octet-stream')
+        if status != 200:
+            raise RuntimeError(f"audio chunk returned {status}")
+        await http(port, 'POST', f"/save_audio/{upload_id}/finish", cookie,
+                   payload={'crc32': zlib.crc32(recording), 'chunks': 1})
+
+        started = time.perf_counter()
+        status, content, _ = await http(port, 'POST', '/submit_answer', cookie,
+                                        payload={'answer': ANSWER, 'response_time': 60,
+                                                 'audio_upload_id': upload_id})
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            raise RuntimeError(f"submit_answer returned {status}")
+        answers += 1
+        if json.loads(content).get('interview_complete'):
+            break
+
+    status, _, _ = await http(port, 'GET', '/download_report', cookie)
+    if status != 200:
+        raise RuntimeError(f"download_report returned {status}")
+    return answers, time.perf_counter() - began, floor
+
+
+async def run_clients(port, clients, upload_bytes, upload_seconds, think_seconds):
+    latencies = []
+    # Same pauses for every server
+    rng = random.Random(7)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        interview(port, upload_bytes, upload_seconds, think_seconds, rng, latencies) for _ in range(clients)
+    ), return_exceptions=True)
+    wall = time.perf_counter() - started
+    errors = [str(result) for result in results if isinstance(result, Exception)]
+    finished = [result for result in results if not isinstance(result, Exception)]
+    return wall, finished, errors, latencies
+
+
+def measure(mode, args):
+    port = free_port()
+    tmpdir = tempfile.mkdtemp(prefix='async-load-')
+    env = dict(
+        os.environ,
+        ANALYSIS_WORKERS=str(args.analysis_workers),
+        SESSION_DB_PATH=os.path.join(tmpdir, 'sessions.sqlite3'),
+        METRICS_DIR=os.path.join(tmpdir, 'metrics'),
+        AUDIO_SPOOL_DIR=os.path.join(tmpdir, 'audio'),
+        REPORT_CACHE_DIR=os.path.join(tmpdir, 'reports')
+    )
+    env.pop('PRELOAD_SHARED_DATA', None)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn'] + SERVERS[mode]
+        + ['--workers', '1', '--timeout', '300', '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(f'http://127.0.0.1:{port}')
+        wall, finished, errors, latencies = asyncio.run(
+            run_clients(port, args.clients, args.upload_kb * 1024, args.upload_seconds, args.think_seconds)
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    completed = len(finished)
+    return {
+        'wall_seconds': round(wall, 2),
+        'interviews_completed': completed,
+        'answers': sum(answers for answers, _, _ in finished),
+        'errors': errors[:5],
+        'interviews_per_minute': round(completed / wall * 60, 1),
+        'mean_interview_seconds': round(sum(seconds for _, seconds, _ in finished) / max(completed, 1), 2),
+        # Candidates the worker kept pace with: their own thinking and
+        # uploading time, summed, over the time it took to serve them all
+        'concurrent_interviews': round(sum(floor for _, _, floor in finished) / wall, 1),
+        'submit_p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'submit_p95_ms': round(sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16, help='candidates interviewing at once')
+    parser.add_argument('--think-seconds', type=float, default=2.0, help='longest pause before each answer')
+    parser.add_argument('--upload-kb', type=int, default=1024, help='size of each recorded answer')
+    parser.add_argument('--upload-seconds', type=float, default=2.0, help='how long each recording takes to upload')
+    parser.add_argument('--analysis-workers', type=int, default=1, help='analyzer pool processes per worker')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    report = {mode: measure(mode, args) for mode in ('sync', 'asgi')}
+
+    print(f"{'mode':6} {'wall s':>8} {'done':>5} {'per min':>8} {'mean s':>8} {'concurrent':>11} "
+          f"{'submit p50':>11} {'p95 ms':>8}")
+    for mode, row in report.items():
+        print(f"{mode:6} {row['wall_seconds']:>8.2f} {row['interviews_completed']:>5} "
+              f"{row['interviews_per_minute']:>8.1f} {row['mean_interview_seconds']:>8.2f} "
+              f"{row['concurrent_interviews']:>11.1f} {row['submit_p50_ms']:>11} {row['submit_p95_ms']:>8}")
+        for error in row['errors']:
+            print(f"  {mode} error: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
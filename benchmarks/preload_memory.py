@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Resident memory per gunicorn process with and without preloading.
+
+Starts the app under gunicorn twice, once with GUNICORN_PRELOAD=0 (every
+worker imports the app itself) and once with GUNICORN_PRELOAD=1 (the master
+builds the shared data and the workers fork from it), drives a few
+interviews through each so every worker scores answers, then reads RSS,
+PSS (each process's fair share of shared pages), shared and private memory
+from /proc for the master, the workers and their analyzer pool processes.
+Total PSS is what the whole deployment actually occupies. Linux only.
+
+    python benchmarks/preload_memory.py --workers 4 --analysis-workers 1
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preload import process_memory  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def children(pid):
+    found = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # The process name is in parentheses and may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def request(opener, base, path, payload=None):
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(base + path, data=data, headers={'Content-Type': 'application/json'})
+    with opener.open(req, timeout=60) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def wait_until_up(base, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base + '/health', timeout=5):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError('gunicorn did not come up')
+
+
+def drive_traffic(base, interviews):
+    answer = ('I would start by profiling the service to find the bottleneck, for example with '
+              'a flame graph, then cache the hot queries and add tests before refactoring. ') * 4
+    for _ in range(interviews):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        request(opener, base, '/start_interview',
+                {'domain': 'Software Engineering', 'difficulty': 'intermediate', 'type': 'mixed'})
+        for _ in range(3):
+            result = request(opener, base, '/submit_answer', {'answer': answer, 'response_time': 60})
+            if result.get('interview_complete'):
+                break
+
+
+def measure(preload, workers, analysis_workers, interviews, settle):
+    port = free_port()
+    tmpdir = tempfile.mkdtemp(prefix='preload-')
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD='1' if preload else '0',
+        ANALYSIS_WORKERS=str(analysis_workers),
+        SESSION_DB_PATH=os.path.join(tmpdir, 'sessions.sqlite3'),
+        METRICS_DIR=os.path.join(tmpdir, 'metrics')
+    )
+    env.pop('PRELOAD_SHARED_DATA', None)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--workers', str(workers), '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base = f'http://127.0.0.1:{port}'
+        wait_until_up(base)
+        drive_traffic(base, interviews)
+        # Analyzer pools warm up in the background
+        time.sleep(settle)
+
+        processes = [('master', server.pid)]
+        for worker in children(server.pid):
+            processes.append(('worker', worker))
+            processes.extend(('analyzer', pool_process) for pool_process in children(worker))
+        rows = []
+        for role, pid in processes:
+            memory = process_memory(pid)
+            if memory is not None:
+                rows.append(dict(memory, role=role, pid=pid))
+        return rows
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def summarize(rows):
+    summary = {'total_pss_mb': round(sum(row['pss_kb'] for row in rows) / 1024, 1)}
+    for role in ('master', 'worker', 'analyzer'):
+        subset = [row for row in rows if row['role'] == role]
+        if not subset:
+            continue
+        summary[role] = {
+            'count': len(subset),
+            'mean_rss_mb': round(sum(row['rss_kb'] for row in subset) / len(subset) / 1024, 1),
+            'mean_pss_mb': round(sum(row['pss_kb'] for row in subset) / len(subset) / 1024, 1),
+            'mean_private_mb': round(sum(row['private_kb'] for row in subset) / len(subset) / 1024, 1)
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--analysis-workers', type=int, default=1, help='analyzer pool processes per worker')
+    parser.add_argument('--interviews', type=int, default=12, help='interviews to drive through each server')
+    parser.add_argument('--settle', type=float, default=5.0, help='seconds to let analyzer pools warm up')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    report = {}
+    for label, preload in (('without_preload', False), ('with_preload', True)):
+        rows = measure(preload, args.workers, args.analysis_workers, args.interviews, args.settle)
+        report[label] = {'processes': rows, 'summary': summarize(rows)}
+
+    print(f"{'':18} {'role':9} {'count':>5} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}")
+    for label in ('without_preload', 'with_preload'):
+        summary = report[label]['summary']
+        for role in ('master', 'worker', 'analyzer'):
+            if role in summary:
+                row = summary[role]
+                print(f"{label:18} {role:9} {row['count']:>5} {row['mean_rss_mb']:>8.1f} "
+                      f"{row['mean_pss_mb']:>8.1f} {row['mean_private_mb']:>11.1f}")
+        print(f"{label:18} {'total PSS':9} {'':>5} {'':>8} {summary['total_pss_mb']:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,736 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the analysis and request hot paths.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+
+Each component reports p50/p95/p99 latency, throughput and peak traced
+memory. The JSON output is stable so two runs can be diffed; --compare
+flags components whose p50 or p95 got slower than the threshold.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+FILLER = [
+    'the', 'team', 'project', 'we', 'built', 'a', 'system', 'that', 'handled', 'users',
+    'and', 'improved', 'performance', 'by', 'measuring', 'results', 'over', 'time', 'with',
+    'clear', 'goals', 'I', 'worked', 'on', 'design', 'review', 'delivery', 'customers'
+]
+PHRASES = [
+    'for example', 'such as', 'i believe', 'my experience', 'i successfully',
+    'situation', 'task', 'action', 'result', 'however', 'therefore', 'not sure'
+]
+
+
+def load_question_list():
+    with open('data/questions.json', 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = []
+    for domain, domain_data in data['domains'].items():
+        for question in domain_data.get('questions', []):
+            questions.append((domain, question))
+    return questions
+
+
+def build_corpus(questions, size, seed):
+    """Synthetic answers mixing each question's keywords with filler and phrases"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        domain, question = rng.choice(questions)
+        words = []
+        for _ in range(rng.randint(3, 12)):
+            sentence = [rng.choice(FILLER) for _ in range(rng.randint(6, 22))]
+            if question.get('keywords') and rng.random() < 0.6:
+                sentence.insert(rng.randrange(len(sentence)), rng.choice(question['keywords']))
+            if rng.random() < 0.4:
+                sentence.insert(rng.randrange(len(sentence)), rng.choice(PHRASES))
+            words.append(' '.join(sentence).capitalize() + rng.choice(['.', '.', '!', '?']))
+        corpus.append({
+            'domain': domain,
+            'question': question,
+            'answer': ' '.join(words),
+            'response_time': rng.randint(20, 240)
+        })
+    return corpus
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name, fn, items, warmup=20):
+    """Time fn(item) for every item, then repeat a slice under tracemalloc for peak memory"""
+    for item in items[:warmup]:
+        fn(item)
+
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for item in items[:min(len(items), 50)]:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'component': name,
+        'iterations': len(items),
+        'p50_ms': round(percentile(latencies, 50), 4),
+        'p95_ms': round(percentile(latencies, 95), 4),
+        'p99_ms': round(percentile(latencies, 99), 4),
+        'mean_ms': round(statistics.mean(latencies), 4),
+        'throughput_per_s': round(len(items) / elapsed, 1) if elapsed > 0 else 0,
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def bench_simple_analyzer(app_module, corpus):
+    analyzer = app_module.SimpleAIAnalyzer()
+    return measure('SimpleAIAnalyzer.analyze_response', lambda item: analyzer.analyze_response(
+        item['question'], item['answer'], item['domain'], item['response_time']
+    ), corpus)
+
+
+def bench_ai_analyzer(corpus):
+    try:
+        from ai_analyzer import AIAnalyzer
+        analyzer = AIAnalyzer()
+        analyzer.warm_up()
+    except Exception as e:
+        print(f"Skipping AIAnalyzer benchmark: {e}", file=sys.stderr)
+        return None
+    return measure('AIAnalyzer.analyze_response', lambda item: analyzer.analyze_response(
+        item['question'], item['answer'], item['domain'], item['response_time']
+    ), corpus)
+
+
+def bench_select_questions(app_module, questions, iterations, seed):
+    rng = random.Random(seed)
+    domains = sorted({domain for domain, _ in questions})
+    cases = [
+        (rng.choice(domains), rng.choice(['beginner', 'intermediate', 'advanced']),
+         rng.choice(['mixed', 'technical', 'behavioral']))
+        for _ in range(iterations)
+    ]
+    return measure('select_questions', lambda case: app_module.select_questions(*case), cases)
+
+
+def bench_submit_answer(app_module, corpus):
+    """Full /start_interview + /submit_answer round trips through the test client"""
+    client = app_module.app.test_client()
+    state = {'remaining': 0}
+
+    def submit(item):
+        if state['remaining'] == 0:
+            response = client.post('/start_interview', json={
+                'domain': item['domain'], 'difficulty': 'intermediate', 'type': 'mixed'
+            })
+            state['remaining'] = response.get_json()['total_questions']
+        response = client.post('/submit_answer', json={
+            'answer': item['answer'], 'response_time': item['response_time']
+        })
+        if response.status_code != 200:
+            raise RuntimeError(response.get_json())
+        state['remaining'] -= 1
+
+    return measure('POST /submit_answer', submit, corpus)
+
+
+def bench_speech_metrics(iterations, seed):
+    """Three-minute 16 kHz mono WAV answers, the size a recorded answer reaches"""
+    import io
+    import wave
+    import numpy as np
+    from speech_metrics import SpeechProcessor
+
+    rng = np.random.default_rng(seed)
+    rate = 16000
+    t = np.arange(rate * 180) / rate
+    # Two seconds of voiced tone, one of near-silence, repeated
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) * ((t % 3) < 2) + 0.002 * rng.standard_normal(len(t))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((signal * 32767).astype('<i2').tobytes())
+    recording = buffer.getvalue()
+    processor = SpeechProcessor()
+    transcript = ' '.join(FILLER * 10)
+    return measure('SpeechProcessor.analyze_speech (3 min WAV)',
+                   lambda _: processor.analyze_speech(recording, transcript), list(range(iterations)), warmup=3)
+
+
+def load_sentence_corpus():
+    with open(os.path.join(ROOT, 'benchmarks', 'sentence_corpus.txt'), 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def naive_split(text):
+    # What SimpleAIAnalyzer used before sentence_splitter, kept for comparison
+    return [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+
+
+def bench_sentence_split(texts):
+    from sentence_splitter import split_sentences
+    return measure('split_sentences', split_sentences, texts)
+
+
+def bench_punkt(texts):
+    try:
+        from nltk.tokenize import sent_tokenize
+        sent_tokenize('Warm up. Punkt loads its model on the first call.')
+    except Exception as e:
+        print(f"Skipping Punkt benchmark: {e}", file=sys.stderr)
+        return None
+    return measure('nltk sent_tokenize (Punkt)', sent_tokenize, texts)
+
+
+def sentence_parity(texts):
+    """Share of texts split exactly like Punkt by split_sentences and by the old naive split"""
+    try:
+        from nltk.tokenize import sent_tokenize
+        sent_tokenize('Warm up.')
+    except Exception as e:
+        print(f"Skipping Punkt parity check: {e}", file=sys.stderr)
+        return None
+    from sentence_splitter import split_sentences
+
+    agree = naive_agree = 0
+    differences = []
+    for text in texts:
+        expected = [s.strip() for s in sent_tokenize(text)]
+        got = split_sentences(text)
+        if got == expected:
+            agree += 1
+        elif len(differences) < 10:
+            differences.append({'text': text, 'punkt': expected, 'split_sentences': got})
+        # The naive split drops the punctuation, so compare sentence counts
+        naive_agree += len(naive_split(text)) == len(expected)
+    return {
+        'texts': len(texts),
+        'agreement': round(agree / len(texts), 4),
+        'naive_count_agreement': round(naive_agree / len(texts), 4),
+        'differences': differences
+    }
+
+
+def _vader():
+    try:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+    except Exception as e:
+        print(f"Skipping VADER comparison: {e}", file=sys.stderr)
+        return None
+
+
+def bench_sentiment(texts):
+    from ai_analyzer import load_sentiment_analyzer
+    scorer = load_sentiment_analyzer()
+    return measure('LexiconScorer.polarity_scores', scorer.polarity_scores, texts)
+
+
+def bench_sentiment_batch(texts, size=64):
+    from ai_analyzer import load_sentiment_analyzer
+    scorer = load_sentiment_analyzer()
+    batches = [texts[start:start + size] for start in range(0, len(texts), size)]
+    return measure(f'LexiconScorer.score_batch ({size} texts)', scorer.score_batch, batches, warmup=2)
+
+
+def bench_nltk_vader(texts):
+    sia = _vader()
+    if sia is None:
+        return None
+    return measure('nltk SentimentIntensityAnalyzer', sia.polarity_scores, texts)
+
+
+def sentiment_parity(texts):
+    """Share of texts the compiled scorer and its batch mode score exactly like nltk's VADER"""
+    sia = _vader()
+    if sia is None:
+        return None
+    from sentiment_lexicon import LexiconScorer
+    scorer = LexiconScorer(sia.lexicon)
+
+    expected = [sia.polarity_scores(text) for text in texts]
+    single = sum(scorer.polarity_scores(text) == scores for text, scores in zip(texts, expected))
+    batch = sum(got == scores for got, scores in zip(scorer.score_batch(texts), expected))
+    return {
+        'texts': len(texts),
+        'agreement': round(single / len(texts), 4),
+        'batch_agreement': round(batch / len(texts), 4)
+    }
+
+
+def bench_relevance(corpus):
+    from relevance_index import get_relevance_index
+    index = get_relevance_index()
+    return measure('RelevanceIndex.score', lambda item: index.score(item['question'], item['answer']), corpus)
+
+
+def relevance_check():
+    """How often hand-written answers score closest to their own question, and what keywords alone would give them"""
+    from relevance_index import get_relevance_index
+    index = get_relevance_index()
+    with open(os.path.join(ROOT, 'data', 'questions.json'), 'r', encoding='utf-8') as f:
+        domains = json.load(f)['domains']
+    with open(os.path.join(ROOT, 'benchmarks', 'relevance_corpus.jsonl'), 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+
+    top = 0
+    own, others, credits, keyword_hits = [], [], [], []
+    for entry in entries:
+        questions = domains[entry['domain']]['questions']
+        question = questions[entry['question']]
+        scores = [index.score(candidate, entry['answer']) for candidate in questions]
+        mine = scores.pop(entry['question'])
+        top += mine > max(scores)
+        own.append(mine)
+        others.extend(scores)
+        credits.append(index.credit(question, entry['answer']))
+        keyword_hits.append(sum(k.lower() in entry['answer'].lower() for k in question['keywords']))
+    return {
+        'answers': len(entries),
+        'own_question_top': round(top / len(entries), 4),
+        'mean_own_similarity': round(statistics.mean(own), 4),
+        'mean_other_similarity': round(statistics.mean(others), 4),
+        'mean_credit': round(statistics.mean(credits), 4),
+        'answers_without_keywords': sum(1 for hits in keyword_hits if not hits)
+    }
+
+
+def typing_steps(corpus, seed):
+    """Each answer as a candidate would type it: a few characters at a time, with backspaces and the odd edit further up"""
+    rng = random.Random(seed)
+    for item in corpus:
+        answer = item['answer']
+        text, typed = '', 0
+        while typed < len(answer):
+            roll = rng.random()
+            if roll < 0.1 and text:
+                text = text[:-rng.randint(1, 4)]
+            elif roll < 0.12 and len(text) > 20:
+                at = rng.randrange(len(text))
+                text = text[:at] + 'x' + text[at + 1:]
+            else:
+                step = rng.randint(1, 15)
+                text += answer[typed:typed + step]
+                typed += step
+            yield item, text
+
+
+def draft_cases(corpus):
+    """(state after all but the last word, question, draft): one /score_draft call per answer"""
+    from draft_scoring import DraftScorer
+    scorer = DraftScorer()
+    cases = []
+    for item in corpus:
+        question = dict(item['question'], id='bench')
+        cut = item['answer'].rstrip().rfind(' ')
+        state, _, _ = scorer.update(None, question, item['answer'][:cut + 1])
+        cases.append((state, question, item['answer']))
+    return scorer, cases
+
+
+def bench_draft_scoring(app_module, corpus):
+    from relevance_index import get_relevance_index
+    analyzer, index = app_module.ai_analyzer, get_relevance_index()
+    scorer, cases = draft_cases(corpus)
+
+    def score(case):
+        _, features, _ = scorer.update(*case)
+        return (analyzer._technical_score(features, index.credit_counts(case[1], features.word_counts)),
+                analyzer._communication_score(features))
+    return measure('DraftScorer.update (one more word)', score, cases)
+
+
+def bench_draft_rescore(app_module, corpus):
+    analyzer = app_module.ai_analyzer
+    _, cases = draft_cases(corpus)
+
+    def score(case):
+        _, question, text = case
+        features = analyzer.extract_features(text, question.get('keywords', []))
+        return (analyzer._calculate_technical_score(question, text, None, features),
+                analyzer._calculate_communication_score(text, features))
+    return measure('draft rescored from scratch', score, cases)
+
+
+def draft_check(app_module, corpus, seed):
+    """Draft scores after every keystroke batch against scoring the same text from scratch"""
+    from draft_scoring import DraftScorer
+    from relevance_index import get_relevance_index
+    analyzer, index, scorer = app_module.ai_analyzer, get_relevance_index(), DraftScorer()
+    states = {}
+    steps = mismatches = scanned = length = 0
+    for item, text in typing_steps(corpus, seed):
+        question = dict(item['question'], id='bench')
+        state, features, chars = scorer.update(states.get(id(item)), question, text)
+        # Through JSON, as the session stores it
+        states[id(item)] = json.loads(json.dumps(state))
+        reference = analyzer.extract_features(text, question.get('keywords', []))
+        draft = (features.word_count, features.sentence_count, features.matches.found,
+                 analyzer._technical_score(features, index.credit_counts(question, features.word_counts)),
+                 analyzer._communication_score(features))
+        full = (reference.word_count, reference.sentence_count, reference.matches.found,
+                analyzer._calculate_technical_score(question, text, None, reference),
+                analyzer._calculate_communication_score(text, reference))
+        steps += 1
+        mismatches += draft != full
+        scanned += chars
+        length += len(text)
+    return {
+        'steps': steps,
+        'mismatches': mismatches,
+        'mean_draft_chars': round(length / steps, 1),
+        'mean_scanned_chars': round(scanned / steps, 1)
+    }
+
+
+def log_records(corpus):
+    return [{
+        'interview_id': f"bench-{i // 5}",
+        'domain': item['domain'],
+        'question_id': item['question'].get('id'),
+        'word_count': len(item['answer'].split()),
+        'response_time': item['response_time'],
+        'analysis': {'scores': {'technical': 7.5, 'communication': 6.0, 'behavioral': 8.0}}
+    } for i, item in enumerate(corpus)]
+
+
+def bench_log(directory):
+    """An InterviewLog with the app's default segment size and flush interval"""
+    from interview_log import InterviewLog
+    return InterviewLog(directory, segment_bytes=16 * 1024 * 1024, flush_interval=1.0)
+
+
+def bench_interview_log(corpus):
+    """What /submit_answer pays to log an answer: queueing it for the writer thread"""
+    log = bench_log(tempfile.mkdtemp(prefix='bench-log-'))
+    result = measure('InterviewLog.append', lambda record: log.append('answer', record), log_records(corpus))
+    log.close()
+    return result
+
+
+def bench_interview_log_inline(corpus):
+    """What it would pay writing and fsyncing each answer itself"""
+    log = bench_log(tempfile.mkdtemp(prefix='bench-log-'))
+    return measure('InterviewLog write+fsync per record', lambda record: log._write([record]), log_records(corpus))
+
+
+def interview_log_check(corpus):
+    """Write records through the writer thread, tear a copy of the segment as a crash would, recover and replay"""
+    from interview_log import InterviewLog
+    directory = tempfile.mkdtemp(prefix='bench-log-')
+    log = InterviewLog(directory, segment_bytes=64 * 1024, flush_interval=0.05)
+    records = log_records(corpus)
+    for record in records:
+        log.append('answer', record)
+    log.close()
+    replayed = sum(1 for _ in log.replay())
+
+    # A writer that died mid-batch: part of a line, then blocks the filesystem never filled in
+    with open(log.segments()[-1], 'rb') as f:
+        written = f.read()
+    cut = len(written) * 2 // 3
+    crashed = os.path.join(directory, '00000000T000000000000-0.jsonl')
+    with open(crashed, 'wb') as f:
+        f.write(written[:cut] + b'\0' * 512)
+    trimmed = log.recover()
+    segments = len(log.segments()) - 1
+    after_crash = sum(1 for _ in log.replay())
+
+    # A line damaged in the middle of a segment that ends cleanly: recovery
+    # leaves the segment alone and replay skips only that line
+    lines = written.splitlines(keepends=True)
+    damaged = os.path.join(directory, '00000000T000000000001-0.jsonl')
+    damaged_bytes = b''.join(lines[:1] + [b'{"kind": "answer", \0\0\n'] + lines[2:])
+    with open(damaged, 'wb') as f:
+        f.write(damaged_bytes)
+    trimmed_damaged = log.recover()
+    return {
+        'records': len(records),
+        'replayed': replayed,
+        'segments': segments,
+        'batches': log.counters['batches'],
+        'trimmed_after_crash': trimmed,
+        'crashed_segment_ends_at_last_record': os.path.getsize(crashed) == written.rfind(b'\n', 0, cut) + 1,
+        'replayed_after_crash': after_crash - replayed,
+        'trimmed_damaged': trimmed_damaged,
+        'damaged_segment_untouched': os.path.getsize(damaged) == len(damaged_bytes),
+        'replayed_from_damaged': f"{sum(1 for _ in log.replay()) - after_crash} of {len(lines) - 1}"
+    }
+
+
+def analytics_store(questions, rows, seed):
+    """An AnalyticsStore over a log of synthetic answers spread across 20 weeks"""
+    from analytics_store import AnalyticsStore
+    from question_bank import question_id
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='bench-analytics-')
+    log = bench_log(os.path.join(directory, 'log'))
+    started = time.mktime((2026, 1, 5, 0, 0, 0, 0, 0, -1))
+    records = []
+    for i in range(rows):
+        domain, question = rng.choice(questions)
+        records.append({
+            'kind': 'answer',
+            'interview_id': f"bench-{i // 6}",
+            'entry_index': i % 6,
+            'domain': domain,
+            'difficulty': question.get('difficulty'),
+            'interview_type': 'mixed',
+            'question_id': question_id(domain, question),
+            'word_count': rng.randint(20, 300),
+            'response_time': rng.randint(10, 240),
+            'answered_at': datetime.fromtimestamp(started + rng.uniform(0, 140 * 86400)).isoformat(),
+            'analysis': {'scores': {name: round(rng.uniform(2, 10), 1)
+                                    for name in ('technical', 'communication', 'behavioral')}}
+        })
+    log._write(records)
+    log._close_segment()
+
+    path = os.path.join(directory, 'analytics.npz')
+    store = AnalyticsStore(log, path)
+    t0 = time.perf_counter()
+    store.refresh()
+    ingest = time.perf_counter() - t0
+    store.save()
+    t0 = time.perf_counter()
+    reloaded = AnalyticsStore(log, path)
+    load = time.perf_counter() - t0
+    info = {
+        'rows': len(store),
+        'ingest_seconds': round(ingest, 3),
+        'snapshot_load_ms': round(load * 1000, 2),
+        'rows_after_reload': len(reloaded),
+        'rows_reingested_after_reload': reloaded.refresh()
+    }
+    return store, info
+
+
+def percentile_histograms(questions, interviews, seed):
+    """Histograms of synthetic final scores, plus the scores themselves to check ranks against"""
+    from score_histograms import RANKED_SCORES, ScoreHistograms
+    rng = random.Random(seed)
+    domains = sorted({domain for domain, _ in questions})
+    histograms = ScoreHistograms()
+    history = {}
+    for _ in range(interviews):
+        key = (rng.choice(domains), rng.choice(['beginner', 'intermediate', 'advanced']))
+        scores = {name: round(min(10.0, max(0.0, rng.gauss(6.5, 1.5))), 1) for name in RANKED_SCORES}
+        histograms.add(key[0], key[1], scores)
+        history.setdefault(key, []).append(scores)
+    return histograms, history
+
+
+def bench_percentiles(histograms, history):
+    cases = [(key, scores) for key, entries in history.items() for scores in entries[:100]]
+    return measure('ScoreHistograms.percentiles',
+                   lambda case: histograms.percentiles(case[0][0], case[0][1], case[1]), cases)
+
+
+def percentile_check(histograms, history):
+    """Histogram ranks against ranks counted from every stored score"""
+    import numpy as np
+    from score_histograms import RANKED_SCORES
+    worst = 0.0
+    for key, entries in history.items():
+        for name in RANKED_SCORES:
+            ordered = np.sort([entry[name] for entry in entries])
+            for entry in entries[:50]:
+                below = np.searchsorted(ordered, entry[name] - 1e-9)
+                ties = np.searchsorted(ordered, entry[name] + 1e-9) - below
+                exact = 100.0 * (below + 0.5 * ties) / len(ordered)
+                ranked = histograms.percentiles(key[0], key[1], entry)[name]
+                worst = max(worst, abs(ranked - exact))
+    return {
+        'interviews': len(histograms),
+        'groups': len(history),
+        'max_error_vs_sorted': round(worst, 3)
+    }
+
+
+def bench_analytics(store, name, query):
+    return measure(f"AnalyticsStore.{name}", lambda _: query(store), list(range(100)))
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path, threshold):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['component']: r for r in json.load(f)['results']}
+    regressions = []
+    print(f"{'component':40} {'p50 before':>11} {'p50 now':>9} {'p95 before':>11} {'p95 now':>9}")
+    for result in current['results']:
+        before = baseline.get(result['component'])
+        if before is None:
+            continue
+        print(f"{result['component']:40} {before['p50_ms']:>11.3f} {result['p50_ms']:>9.3f} "
+              f"{before['p95_ms']:>11.3f} {result['p95_ms']:>9.3f}")
+        for key in ('p50_ms', 'p95_ms'):
+            if before[key] > 0 and result[key] > before[key] * (1 + threshold):
+                regressions.append(f"{result['component']} {key}: {before[key]} -> {result[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=500, help='answers in the synthetic corpus')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--analytics-rows', type=int, default=100000, help='logged answers behind the analytics queries')
+    parser.add_argument('--only', action='append', help='run only components whose name contains this text')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--compare', help='JSON file from an earlier run to diff against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown before flagging (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    # Keep the app self-contained: throwaway session store, analysis in-process
+    tmpdir = tempfile.mkdtemp(prefix='bench-')
+    os.environ.setdefault('SESSION_DB_PATH', os.path.join(tmpdir, 'sessions.sqlite3'))
+    os.environ.setdefault('INTERVIEW_LOG_DIR', os.path.join(tmpdir, 'interview_log'))
+    os.environ.setdefault('ANALYSIS_WORKERS', '0')
+    os.environ.setdefault('WARM_UP_ON_BOOT', '0')
+    # Measure real scoring work, not cache hits on the warm-up items
+    os.environ.setdefault('ANALYSIS_CACHE_SIZE', '0')
+
+    # App log lines go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        import app as app_module
+
+        questions = load_question_list()
+        corpus = build_corpus(questions, args.size, args.seed)
+        built = {}
+
+        def analytics():
+            # Built once, on first use, for every analytics component
+            if 'store' not in built:
+                built['store'] = analytics_store(questions, args.analytics_rows, args.seed)
+            return built['store']
+
+        def percentiles():
+            if 'histograms' not in built:
+                built['histograms'] = percentile_histograms(questions, args.analytics_rows, args.seed)
+            return built['histograms']
+
+        # Hand-written answers with abbreviations, decimals and quotes, plus the synthetic ones
+        sentence_texts = load_sentence_corpus() + [item['answer'] for item in corpus]
+
+        benches = [
+            ('SimpleAIAnalyzer', lambda: bench_simple_analyzer(app_module, corpus)),
+            ('AIAnalyzer', lambda: bench_ai_analyzer(corpus)),
+            ('select_questions', lambda: bench_select_questions(app_module, questions, args.size * 4, args.seed)),
+            ('submit_answer', lambda: bench_submit_answer(app_module, corpus)),
+            ('speech_metrics', lambda: bench_speech_metrics(30, args.seed)),
+            ('sentences', lambda: bench_sentence_split(sentence_texts)),
+            ('sentences_punkt', lambda: bench_punkt(sentence_texts)),
+            ('sentiment', lambda: bench_sentiment(sentence_texts)),
+            ('sentiment_batch', lambda: bench_sentiment_batch(sentence_texts)),
+            ('sentiment_nltk', lambda: bench_nltk_vader(sentence_texts)),
+            ('relevance', lambda: bench_relevance(corpus)),
+            ('interview_log', lambda: bench_interview_log(corpus)),
+            ('interview_log_inline', lambda: bench_interview_log_inline(corpus)),
+            ('analytics_summary', lambda: bench_analytics(analytics()[0], 'summary', lambda s: s.summary())),
+            ('analytics_weekly', lambda: bench_analytics(
+                analytics()[0], 'weekly', lambda s: s.weekly('overall', domain=questions[0][0]))),
+            ('analytics_questions', lambda: bench_analytics(
+                analytics()[0], 'question_calibration', lambda s: s.question_calibration())),
+            ('percentiles', lambda: bench_percentiles(*percentiles())),
+            ('draft_scoring', lambda: bench_draft_scoring(app_module, corpus)),
+            ('draft_rescore', lambda: bench_draft_rescore(app_module, corpus)),
+        ]
+        results = []
+        for name, bench in benches:
+            if args.only and not any(part.lower() in name.lower() for part in args.only):
+                continue
+            result = bench()
+            if result is not None:
+                results.append(result)
+        parity = None
+        if not args.only or any('sentence' in part.lower() for part in args.only):
+            parity = sentence_parity(sentence_texts)
+        vader_parity = None
+        if not args.only or any('sentiment' in part.lower() for part in args.only):
+            vader_parity = sentiment_parity(sentence_texts)
+        relevance = None
+        if not args.only or any('relevance' in part.lower() for part in args.only):
+            relevance = relevance_check()
+        log_check = None
+        if not args.only or any('interview_log' in part.lower() for part in args.only):
+            log_check = interview_log_check(corpus)
+        drafts = None
+        if not args.only or any('draft' in part.lower() for part in args.only):
+            drafts = draft_check(app_module, corpus, args.seed)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'corpus_size': args.size,
+        'seed': args.seed,
+        'results': results
+    }
+    if parity is not None:
+        report['sentence_parity'] = parity
+    if vader_parity is not None:
+        report['sentiment_parity'] = vader_parity
+    if relevance is not None:
+        report['relevance'] = relevance
+    if log_check is not None:
+        report['interview_log'] = log_check
+    if drafts is not None:
+        report['draft_scoring'] = drafts
+    if 'store' in built:
+        report['analytics'] = built['store'][1]
+    if 'histograms' in built:
+        report['percentiles'] = percentile_check(*built['histograms'])
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print('\nRegressions:')
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,10 +16,17 @@ import nltk
 try:
     nltk.download('punkt')
     nltk.download('stopwords')
+    nltk.download('vader_lexicon')
     print('NLTK data downloaded successfully')
 except Exception as e:
     print('NLTK download warning:', str(e))
     print('App will use fallback methods')
 "
 
+echo "Caching parsed VADER lexicon..."
+python -c "
+from ai_analyzer import load_sentiment_analyzer
+load_sentiment_analyzer()
+" || echo "Lexicon cache skipped; it will be built on first use"
+
 echo "Build completed successfully!"
\ No newline at end of file
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import time
+import zlib
+from collections import Counter
+
+from phrase_matcher import PhraseMatches, get_answer_matcher
+from relevance_index import content_words
+from sentence_splitter import split_sentences, split_settled
+
+
+class DraftFeatures:
+    """The parts of AnswerFeatures the lightweight technical and communication scorers read"""
+
+    __slots__ = ('word_count', 'sentence_count', 'matches', 'word_counts')
+
+    def __init__(self, word_count, sentence_count, matches, word_counts):
+        self.word_count = word_count
+        self.sentence_count = sentence_count
+        self.matches = matches
+        self.word_counts = word_counts
+
+
+class DraftScorer:
+    """Scores an answer while it is typed, looking only at what changed since the last call.
+
+    Draft state is a small dict the caller keeps in the session. Everything
+    up to the draft's last whitespace is settled: its token count,
+    content-word counts, phrase matches and finished sentences are stored
+    with a CRC-32 of that text. When the next draft starts with the same
+    settled text, only what was typed since and the sentence still being
+    written are scanned; any other edit scans the draft again from the start.
+    """
+
+    def __init__(self, rate=2.0, burst=4):
+        self.rate = rate
+        self.burst = burst
+
+    def throttle(self, limiter, now=None):
+        """Token bucket per session; returns the new limiter state and how long to wait (0 to go ahead)"""
+        now = time.time() if now is None else now
+        if limiter is None:
+            allowance = float(self.burst)
+        else:
+            # Wall clock, since the next request may land on another worker
+            elapsed = max(0.0, now - limiter['checked'])
+            allowance = min(float(self.burst), limiter['allowance'] + elapsed * self.rate)
+        if allowance < 1:
+            return {'allowance': allowance, 'checked': now}, (1 - allowance) / self.rate
+        return {'allowance': allowance - 1, 'checked': now}, 0
+
+    def start(self, question):
+        return {
+            'question_id': question.get('id'),
+            'word_end': 0,
+            'crc32': 0,
+            'tokens': 0,
+            'words': {},
+            'found': [],
+            'sentence_end': 0,
+            'sentences': 0
+        }
+
+    def extends(self, state, text):
+        """Whether text still begins with the settled text the state was built from"""
+        end = state['word_end']
+        return len(text) >= end and zlib.crc32(text[:end].encode('utf-8')) == state['crc32']
+
+    def update(self, state, question, text):
+        """Fold a draft into its state; returns the new state, its features and how many characters were scanned"""
+        if state is None or state['question_id'] != question.get('id') or not self.extends(state, text):
+            state = self.start(question)
+        state = dict(state)
+        matcher = get_answer_matcher(tuple(question.get('keywords', [])))
+        # A phrase can straddle the point a scan starts from by up to this much
+        overlap = max(matcher.longest - 1, 0)
+        scanned = len(text) - state['sentence_end']
+
+        start = state['word_end']
+        word_end = _settled_length(text)
+        if word_end > start:
+            settled = text[start:word_end]
+            words = Counter(state['words'])
+            words.update(content_words(settled))
+            found = set(state['found'])
+            found.update(matcher.match(text[max(0, start - overlap):word_end].lower()).found)
+            sentences, offset = split_settled(text[state['sentence_end']:word_end])
+            state.update(
+                word_end=word_end,
+                crc32=zlib.crc32(settled.encode('utf-8'), state['crc32']),
+                tokens=state['tokens'] + len(settled.split()),
+                words=dict(words),
+                found=sorted(found),
+                sentence_end=state['sentence_end'] + offset,
+                sentences=state['sentences'] + len(sentences)
+            )
+
+        # The word and sentence still being typed count now but are scanned again next time
+        tail = text[word_end:]
+        word_counts = Counter(state['words'])
+        word_counts.update(content_words(tail))
+        found = set(state['found'])
+        found.update(matcher.match(text[max(0, word_end - overlap):].lower()).found)
+        features = DraftFeatures(
+            word_count=state['tokens'] + len(tail.split()),
+            sentence_count=state['sentences'] + len(split_sentences(text[state['sentence_end']:])),
+            matches=PhraseMatches(found, matcher.groups),
+            word_counts=word_counts
+        )
+        return state, features, scanned
+
+
+def _settled_length(text):
+    """Length of text up to its last whitespace; the word after it may still change"""
+    if not text or text[-1].isspace():
+        return len(text)
+    return len(text) - len(text.rsplit(None, 1)[-1])
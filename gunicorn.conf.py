@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# gunicorn reads this file from the working directory on start
+
+import gc
+import os
+
+# Load the app once in the master and fork the workers from it, so they
+# share the question bank, keyword matchers and lexicons instead of each
+# building a private copy
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+if preload_app:
+    # Tells app.py to build the shared data now and leave per-process
+    # threads to the workers
+    os.environ['PRELOAD_SHARED_DATA'] = '1'
+    # Objects freed while the app loads would leave holes in pages the
+    # workers share; the master does no work worth collecting after that
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from preload import freeze_before_fork
+        freeze_before_fork()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        from app import start_background_tasks
+        start_background_tasks()
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows: metrics stay per process there
+    fcntl = None
+
+
+def default_metrics_dir():
+    """Shared by every process of one launch; '' where processes can't find each other"""
+    # gunicorn workers and analyzer pool processes share the launcher's
+    # process group, so they find each other while older runs stay apart
+    if not hasattr(os, 'getpgrp'):
+        return ''
+    return os.path.join(tempfile.gettempdir(), f"interview-metrics-{os.getpgrp()}")
+
+
+ARCHIVE_FILE = 'archived.json'
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def inc(self, amount=1, **labels):
+        shard = self.registry._shard()
+        key = (self.name, _label_key(labels))
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Histogram:
+    def __init__(self, registry, name, buckets):
+        self.registry = registry
+        self.name = name
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self.registry._shard()
+        key = (self.name, _label_key(labels))
+        slots = shard.get(key)
+        if slots is None:
+            # One count per bucket plus +Inf, then the running sum
+            slots = shard[key] = [0] * (len(self.buckets) + 2)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+
+class _Timer:
+    """Context manager and decorator that observes elapsed seconds"""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+    def __call__(self, fn):
+        histogram, labels = self.histogram, self.labels
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return timed
+
+
+class MetricsRegistry:
+    """Counters and latency histograms with a lock-free hot path.
+
+    Every thread writes to its own shard, so recording never waits on a
+    lock; shards are only summed when metrics are rendered. With a
+    directory set, each process (gunicorn worker or analyzer pool
+    process) periodically writes its totals to <directory>/<pid>.json and
+    ``render`` adds up every process's file into one exposition. When a
+    process exits its totals are folded into <directory>/archived.json
+    before its file is removed, so the sums never go down: a process does
+    this itself at exit, and ``collect`` does it for processes that died
+    without doing so.
+    """
+
+    def __init__(self, directory='', flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.definitions = {}
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # A forked child must not report its parent's numbers as its own
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def use_directory(self, directory):
+        """Share totals with the other processes writing to directory ('' keeps them per process)"""
+        self.directory = directory if fcntl is not None else ''
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._flusher = None
+        self._closed = False
+        self._owns_file = False
+
+    def counter(self, name, help_text):
+        self.definitions[name] = {'type': 'counter', 'help': help_text}
+        return Counter(self, name)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.definitions[name] = {'type': 'histogram', 'help': help_text, 'buckets': list(buckets)}
+        return Histogram(self, name, buckets)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            if self.directory and self._flusher is None:
+                self._start_flusher()
+        return shard
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def snapshot(self):
+        """Totals for this process as {(name, labels): value}"""
+        with self._lock:
+            # Shards of finished threads are folded in once; nothing writes them any more
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired, shard)
+            self._shards = live
+            totals = {}
+            _merge(totals, self._retired)
+            for _, shard in live:
+                _merge(totals, shard.copy())
+        return totals
+
+    def _path(self):
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def flush(self):
+        if not self.directory:
+            return
+        totals = self.snapshot()
+        if not totals:
+            return
+        with self._file_lock:
+            if self._closed:
+                return
+            try:
+                if not self._owns_file:
+                    with _locked(self.directory):
+                        self._adopt_file()
+                _write_metrics(self._path(), self.definitions, totals)
+            except Exception as e:
+                print(f"Could not write metrics file: {e}")
+
+    def close(self):
+        """Fold this process's totals into the archive and remove its file"""
+        if not self.directory:
+            return
+        totals = self.snapshot()
+        with self._file_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                with _locked(self.directory):
+                    self._adopt_file()
+                    if totals:
+                        self._archive([(self.definitions, totals)])
+                    _remove(self._path())
+            except Exception as e:
+                print(f"Could not archive metrics: {e}")
+
+    def _adopt_file(self):
+        # A file already under this pid was left by an earlier process that died; keep its totals
+        path = self._path()
+        if not self._owns_file and os.path.exists(path):
+            self._archive([_read_metrics(path)])
+            _remove(path)
+        self._owns_file = True
+
+    def _archive(self, metrics):
+        """Add (definitions, totals) pairs to the archive; the caller holds the directory lock"""
+        path = os.path.join(self.directory, ARCHIVE_FILE)
+        definitions, totals = _read_metrics(path)
+        for other_definitions, other_totals in metrics:
+            for name, definition in other_definitions.items():
+                definitions.setdefault(name, definition)
+            _merge(totals, other_totals)
+        _write_metrics(path, definitions, totals)
+
+    def collect(self):
+        """This process's live totals plus the last flush of every other process and the archive"""
+        definitions = dict(self.definitions)
+        totals = self.snapshot()
+        if not self.directory or not os.path.isdir(self.directory):
+            return definitions, totals
+        own = f"{os.getpid()}.json"
+        with self._file_lock, _locked(self.directory):
+            try:
+                if not self._closed:
+                    self._adopt_file()
+                # Killed, or an analyzer pool process, which exits without running atexit
+                dead = [os.path.join(self.directory, filename) for filename in _metrics_files(self.directory, own)
+                        if filename != ARCHIVE_FILE and not _pid_alive(filename[:-len('.json')])]
+                if dead:
+                    self._archive([_read_metrics(path) for path in dead])
+                    for path in dead:
+                        _remove(path)
+            except OSError as e:
+                # Their files are counted as they are this time
+                print(f"Could not archive metrics: {e}")
+            for filename in _metrics_files(self.directory, own):
+                other_definitions, other_totals = _read_metrics(os.path.join(self.directory, filename))
+                for name, definition in other_definitions.items():
+                    definitions.setdefault(name, definition)
+                _merge(totals, other_totals)
+        return definitions, totals
+
+    def render(self):
+        """Prometheus text exposition format"""
+        definitions, totals = self.collect()
+        by_name = {}
+        for (name, labels), value in totals.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            definition = definitions.get(name)
+            if definition is None:
+                continue
+            lines.append(f"# HELP {name} {definition['help']}")
+            lines.append(f"# TYPE {name} {definition['type']}")
+            for labels, value in sorted(by_name[name]):
+                if definition['type'] == 'counter':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                buckets = definition['buckets']
+                if len(value) != len(buckets) + 2:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ['+Inf'], value[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def _locked(directory):
+    """Hold the metrics directory's lock file, shared by every process writing there"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        yield
+
+
+def _metrics_files(directory, own):
+    return [filename for filename in os.listdir(directory) if filename.endswith('.json') and filename != own]
+
+
+def _read_metrics(path):
+    """(definitions, totals) from a metrics file; empty if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    totals = {(name, tuple(tuple(pair) for pair in labels)): value
+              for name, labels, value in payload.get('samples', [])}
+    return payload.get('definitions', {}), totals
+
+
+def _write_metrics(path, definitions, totals):
+    samples = [[name, list(labels), value] for (name, labels), value in totals.items()]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'definitions': definitions, 'samples': samples}, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Could not remove metrics file: {e}")
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _merge(totals, shard):
+    for key, value in shard.items():
+        current = totals.get(key)
+        if current is None:
+            totals[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            if len(current) == len(value):
+                totals[key] = [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = current + value
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Time to serve a request, including session load and save')
+REQUESTS = registry.counter('http_requests_total', 'Requests served by route, method and status')
+SESSION_LATENCY = registry.histogram(
+    'session_operation_duration_seconds', 'Server-side session load and serialize/save time')
+ANALYSIS_LATENCY = registry.histogram(
+    'analysis_duration_seconds', 'Answer analysis time by path (pool or in-process fallback)')
+ANALYSIS_STAGE_LATENCY = registry.histogram(
+    'analysis_stage_duration_seconds', 'Time spent in each analyzer stage')
+FINAL_RESULTS_LATENCY = registry.histogram(
+    'final_results_duration_seconds', 'Time to compute final interview results')
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no segment locks, recovery only trims this process's own segments
+    fcntl = None
+
+SEGMENT_SUFFIX = '.jsonl'
+TAIL_CHECK_BYTES = 64 * 1024
+_CLOSE = object()
+
+
+class InterviewLog:
+    """Append-only log of completed interviews and per-answer analyses.
+
+    Records are JSON lines in segment files named <created>-<pid>.jsonl.
+    Each process writes only its own segments, so gunicorn workers never
+    interleave. ``append`` just queues a record. A writer thread writes what
+    has queued up in one batch and fsyncs it at most once every
+    flush_interval seconds, then starts a new segment past segment_bytes.
+    After a crash the log loses at most the last interval and may end in a
+    torn line: ``recover`` cuts it off and ``replay`` skips it.
+    """
+
+    def __init__(self, directory, segment_bytes, flush_interval, max_queued=10000):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self._reset()
+        if directory and hasattr(os, 'register_at_fork'):
+            # A forked child must not share its parent's segment or writer
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.max_queued)
+        self._writer = None
+        self._file = None
+        self._segment = None
+        self._segment_size = 0
+        self.counters = {'appended': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'segments': 0,
+                         'recovered_segments': 0, 'errors': 0}
+
+    def append(self, kind, record):
+        """Queue one record; never touches the disk"""
+        if not self.directory:
+            return
+        record = dict(record, kind=kind, logged_at=datetime.now().isoformat())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.counters['dropped'] += 1
+            return
+        self.counters['appended'] += 1
+        if self._writer is None:
+            self._start_writer()
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_loop, name='interview-log', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        self.recover()
+        while True:
+            item = self._queue.get()
+            closing = item is _CLOSE
+            batch = [] if closing else [item]
+            # Let records pile up for one interval, then write and fsync them together
+            deadline = time.monotonic() + self.flush_interval
+            while not closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    closing = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            if closing:
+                return
+
+    def _write(self, batch):
+        lines = [
+            (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+            for record in batch
+        ]
+        try:
+            pending = []
+            for line in lines:
+                # Segments end on a record boundary; a record bigger than a segment gets one to itself
+                if self._file is None or (self._segment_size and self._segment_size + len(line) > self.segment_bytes):
+                    self._sync(pending)
+                    pending = []
+                    self._rotate()
+                pending.append(line)
+                self._segment_size += len(line)
+            self._sync(pending)
+            self.counters['written'] += len(batch)
+            self.counters['batches'] += 1
+        except Exception as e:
+            self.counters['errors'] += 1
+            print(f"Could not write interview log: {e}")
+            self._close_segment()
+
+    def _sync(self, lines):
+        if not lines:
+            return
+        self._file.write(b''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _rotate(self):
+        self._close_segment()
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._segment = os.path.join(self.directory, name)
+        self._file = open(self._segment, 'ab')
+        if fcntl is not None:
+            # Held while this process writes; recovery leaves locked segments alone
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._segment_size = 0
+        self.counters['segments'] += 1
+        _fsync_directory(self.directory)
+
+    def _close_segment(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._segment = None
+
+    def close(self, timeout=5.0):
+        """Write out whatever is queued; called at exit"""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        try:
+            self._queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            return
+        writer.join(timeout)
+        self._close_segment()
+
+    def segments(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def recover(self):
+        """Trim torn final lines that a crashed writer left; returns the segments trimmed"""
+        trimmed = 0
+        for path in self.segments():
+            if path == self._segment:
+                continue
+            try:
+                with open(path, 'r+b') as f:
+                    if fcntl is not None:
+                        try:
+                            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            # Another process is still writing it
+                            continue
+                    elif not path.endswith(f"-{os.getpid()}{SEGMENT_SUFFIX}"):
+                        continue
+                    good = _valid_length(f)
+                    if good is not None:
+                        f.truncate(good)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        trimmed += 1
+            except OSError as e:
+                print(f"Could not recover interview log segment {path}: {e}")
+        self.counters['recovered_segments'] += trimmed
+        return trimmed
+
+    def replay(self, kinds=None):
+        """Every intact record, oldest segment first"""
+        for path in self.segments():
+            try:
+                with open(path, 'rb') as f:
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            break
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if kinds is None or record.get('kind') in kinds:
+                            yield record
+            except OSError as e:
+                print(f"Could not read interview log segment {path}: {e}")
+
+    def stats(self):
+        return dict(self.counters, queued=self._queue.qsize(), segment=self._segment and os.path.basename(self._segment))
+
+
+def _valid_length(f):
+    """Length of the segment without its torn last record, or None when it ends in a whole record.
+
+    Only the tail a crashed writer left is cut. A bad line further up
+    stays for replay to skip, so the records after it are kept.
+    """
+    size = f.seek(0, os.SEEK_END)
+    if size == 0:
+        return None
+    end = _line_start(f, size)
+    if end < size:
+        # Bytes after the last newline are a write that never finished
+        return end
+    start = _line_start(f, size - 1)
+    f.seek(start)
+    try:
+        json.loads(f.read(size - start))
+        return None
+    except ValueError:
+        return start
+
+
+def _line_start(f, end):
+    """Offset just past the last newline before end, or 0; reads backwards a block at a time"""
+    while end > 0:
+        begin = max(0, end - TAIL_CHECK_BYTES)
+        f.seek(begin)
+        newline = f.read(end - begin).rfind(b'\n')
+        if newline != -1:
+            return begin + newline + 1
+        end = begin
+    return 0
+
+
+def _fsync_directory(directory):
+    # Makes a new segment's name survive a crash; not possible on Windows
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import re
+from functools import lru_cache
+
+# Phrase sets the analyzers look for in every answer
+ANSWER_PHRASE_GROUPS = {
+    'example': ('for example', 'for instance', 'such as'),
+    'confidence': ('i am confident', 'i believe', 'my experience', 'i successfully'),
+    'star': ('situation', 'task', 'action', 'result', 'challenge', 'solution'),
+    'professional': ('however', 'therefore', 'additionally', 'furthermore', 'consequently'),
+    'negative': ("i can't", "i don't know", 'not sure', 'maybe', 'perhaps'),
+    'uncertain': ("i don't know", 'not sure'),
+}
+
+
+class PhraseMatches:
+    """Result of one scan: which phrases occur in the text"""
+
+    __slots__ = ('found', 'groups')
+
+    def __init__(self, found, groups):
+        self.found = found
+        self.groups = groups
+
+    def has(self, phrase):
+        return phrase.lower() in self.found
+
+    def found_in(self, group):
+        """Phrases of a group present in the text, in the group's own order and casing"""
+        return [p for p in self.groups.get(group, ()) if p.lower() in self.found]
+
+    def count(self, group):
+        return len(self.found_in(group))
+
+    def any(self, group):
+        return any(p.lower() in self.found for p in self.groups.get(group, ()))
+
+
+class PhraseMatcher:
+    """Finds every phrase of several groups in a single pass over the text.
+
+    Matching keeps the substring semantics of ``phrase in text``. The
+    pattern is a lookahead alternation tried at each position with the
+    longest phrases first, so at every offset the longest phrase starting
+    there is reported. Any shorter phrase occurring in the text is a
+    substring of one of those, so each reported phrase also yields the
+    phrases contained in it (precomputed below).
+    """
+
+    def __init__(self, groups):
+        self.groups = {name: tuple(phrases) for name, phrases in groups.items()}
+        phrases = sorted(
+            {p.lower() for group in self.groups.values() for p in group if p},
+            key=lambda p: (-len(p), p)
+        )
+        self.implied = {p: frozenset(q for q in phrases if q in p) for p in phrases}
+        self.longest = len(phrases[0]) if phrases else 0
+        if phrases:
+            self.pattern = re.compile('(?=(' + '|'.join(re.escape(p) for p in phrases) + '))')
+        else:
+            self.pattern = None
+
+    def match(self, text_lower):
+        found = set()
+        if self.pattern is not None:
+            seen = set()
+            for m in self.pattern.finditer(text_lower):
+                phrase = m.group(1)
+                if phrase not in seen:
+                    seen.add(phrase)
+                    found.update(self.implied[phrase])
+        return PhraseMatches(found, self.groups)
+
+
+@lru_cache(maxsize=512)
+def get_answer_matcher(keywords=()):
+    """Matcher for a question's keywords plus the shared answer phrase sets"""
+    groups = dict(ANSWER_PHRASE_GROUPS)
+    groups['keywords'] = keywords
+    return PhraseMatcher(groups)
+
+
+def match_answer(answer, keywords=(), answer_lower=None):
+    if answer_lower is None:
+        answer_lower = answer.lower()
+    return get_answer_matcher(tuple(keywords)).match(answer_lower)
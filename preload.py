@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import time
+
+
+def preload_shared_data(questions):
+    """Build the read-only data every worker scores with; returns the seconds it took.
+
+    Run in a preforking server's master (gunicorn --preload), so workers
+    and their analyzer pools inherit these pages instead of building their
+    own copies: keyword matchers for every question, the relevance index,
+    the compiled VADER lexicon and TextBlob's lexicon.
+    """
+    started = time.perf_counter()
+    from phrase_matcher import get_answer_matcher
+    from relevance_index import get_relevance_index
+
+    get_answer_matcher(())
+    for question in questions:
+        get_answer_matcher(tuple(question.get('keywords', [])))
+    get_relevance_index()
+
+    try:
+        from ai_analyzer import shared_sentiment_analyzer
+        shared_sentiment_analyzer()
+        from textblob import TextBlob
+        TextBlob('Loading the sentiment lexicon.').sentiment
+    except Exception as e:
+        print(f"Skipping NLTK/TextBlob preload: {e}")
+    return round(time.perf_counter() - started, 3)
+
+
+def freeze_before_fork():
+    """Park every object allocated so far where the children's garbage collections never write to it"""
+    gc.freeze()
+
+
+def process_memory(pid='self'):
+    """Resident memory of a process in kB: rss, pss (its fair share of shared pages), shared and private"""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def question_id(domain, question):
+    """Stable ID: an explicit 'id' from the file, else a hash of domain and text"""
+    if question.get('id'):
+        return str(question['id'])
+    text = f"{domain}\n{question.get('question', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+class QuestionIndex:
+    """Immutable snapshot of the questions file with lookup indexes"""
+
+    def __init__(self, data, mtime=None):
+        self.data = data
+        self.mtime = mtime
+        self.domain_names = list(data.get('domains', {}).keys())
+        self.by_domain = {}
+        self.by_difficulty = {}
+        self.by_type = {}
+        self.by_difficulty_type = {}
+        self.by_category = {}
+        self.by_id = {}
+
+        for domain, domain_data in data.get('domains', {}).items():
+            questions = tuple(domain_data.get('questions', []))
+            self.by_domain[domain] = questions
+            for question in questions:
+                question['id'] = question_id(domain, question)
+                self.by_id[question['id']] = question
+                difficulty = question.get('difficulty')
+                question_type = question.get('type')
+                category = question.get('category')
+                self.by_difficulty.setdefault((domain, difficulty), []).append(question)
+                self.by_type.setdefault((domain, question_type), []).append(question)
+                self.by_difficulty_type.setdefault((domain, difficulty, question_type), []).append(question)
+                self.by_category.setdefault((domain, category), []).append(question)
+
+        # Freeze the buckets so callers can't mutate a shared snapshot by accident
+        for index in (self.by_difficulty, self.by_type, self.by_difficulty_type, self.by_category):
+            for key in index:
+                index[key] = tuple(index[key])
+
+
+class QuestionBank:
+    """Loads questions.json once and reloads it when the file changes on disk.
+
+    Every question ever loaded stays resolvable by ID, so sessions keep
+    working across reloads that edit or drop their questions.
+    """
+
+    def __init__(self, path='data/questions.json', fallback=None, check_interval=2.0):
+        self.path = path
+        self.fallback = fallback
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._interned = {}
+        self._index = self._load()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _intern(self, index):
+        self._interned.update(index.by_id)
+        return index
+
+    def _load(self):
+        mtime = self._file_mtime()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return self._intern(QuestionIndex(json.load(f), mtime))
+        except FileNotFoundError:
+            print("Questions file not found. Using default questions.")
+        except Exception as e:
+            print(f"Error loading questions: {e}")
+        current = getattr(self, '_index', None)
+        if current is not None and current.mtime is not None:
+            # Keep serving the last good file rather than dropping to defaults mid-edit
+            return QuestionIndex(current.data, mtime)
+        return self._intern(QuestionIndex(self.fallback() if self.fallback else {'domains': {}}, mtime))
+
+    def _maybe_reload(self):
+        now = time.time()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            if self._file_mtime() != self._index.mtime:
+                # Build the new snapshot fully, then swap the reference in one step
+                self._index = self._load()
+
+    @property
+    def index(self):
+        self._maybe_reload()
+        return self._index
+
+    def reload(self):
+        with self._lock:
+            self._last_check = time.time()
+            self._index = self._load()
+
+    def data(self):
+        return self.index.data
+
+    def domains(self):
+        return list(self.index.domain_names)
+
+    def get_domain(self, domain):
+        return self.index.data.get('domains', {}).get(domain)
+
+    def candidates(self, domain, difficulty=None, interview_type='mixed'):
+        """Questions matching the filters, falling back to the whole domain
+        when nothing has the requested difficulty"""
+        index = self.index
+        if difficulty is not None and (domain, difficulty) in index.by_difficulty:
+            if interview_type == 'mixed':
+                return index.by_difficulty[(domain, difficulty)]
+            return index.by_difficulty_type.get((domain, difficulty, interview_type), ())
+        if interview_type == 'mixed':
+            return index.by_domain.get(domain, ())
+        return index.by_type.get((domain, interview_type), ())
+
+    def get_question(self, qid):
+        return self._interned.get(qid)
+
+    def by_category(self, domain, category):
+        return self.index.by_category.get((domain, category), ())
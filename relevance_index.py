@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+import math
+import re
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from question_bank import QuestionBank
+
+QUESTIONS_PATH = 'data/questions.json'
+NGRAM_SIZES = (3, 4, 5)
+
+# Similarity at or below the floor earns nothing; at FULL_CREDIT and above an
+# answer counts as fully on topic. Calibrated on answers written for the
+# question versus answers to other questions in the same domain.
+RELEVANCE_FLOOR = 0.06
+RELEVANCE_FULL_CREDIT = 0.25
+
+_WORD = re.compile(r"[a-z0-9]+(?:[+#]+|(?:['/-][a-z0-9]+)*)")
+
+STOP_WORDS = frozenset((
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'because', 'been',
+    'before', 'being', 'between', 'both', 'but', 'by', 'can', 'could', 'did', 'do', 'does', 'each', 'explain',
+    'describe', 'for', 'from', 'had', 'has', 'have', 'how', 'i', "i'm", 'if', 'in', 'into', 'is', 'it', 'its',
+    'just', 'like', 'me', 'more', 'most', 'my', 'no', 'not', 'of', 'on', 'one', 'or', 'other', 'our', 'out',
+    'over', 'so', 'some', 'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they',
+    'this', 'those', 'through', 'to', 'up', 'us', 'very', 'was', 'way', 'we', 'were', 'what', 'when', 'where',
+    'which', 'while', 'who', 'why', 'will', 'with', 'would', 'you', 'your'
+))
+
+# Words and phrases an answer on a keyword's topic tends to use instead of
+# the keyword itself. Indexed alongside the keywords so paraphrases score.
+KEYWORD_EXPANSIONS = {
+    'a/b testing': ('split test', 'control group', 'variant', 'experiment', 'statistical significance'),
+    'abstraction': ('interface', 'hide implementation details', 'abstract class'),
+    'acid': ('atomicity', 'consistency', 'isolation', 'durability', 'transaction'),
+    'algorithms': ('algorithm', 'time complexity', 'big o', 'sorting', 'search'),
+    'attribution': ('first touch', 'last touch', 'multi-touch', 'credit conversions'),
+    'auc': ('area under the curve', 'roc curve'),
+    'base': ('basically available', 'soft state', 'eventual consistency'),
+    'bias': ('bias-variance', 'systematic error', 'too simple'),
+    'budget': ('spend', 'cost', 'allocate funds'),
+    'cache': ('caching', 'redis', 'memcached', 'in-memory', 'cache invalidation', 'ttl'),
+    'cash flow': ('free cash flow', 'operating cash', 'inflows', 'outflows'),
+    'ci/cd': ('continuous integration', 'continuous delivery', 'continuous deployment', 'pipeline',
+              'automated build'),
+    'classification': ('classifier', 'label', 'categories', 'logistic regression', 'decision tree'),
+    'clustering': ('k-means', 'clusters', 'grouping', 'hierarchical', 'dbscan'),
+    'cnn': ('convolutional neural network', 'convolution', 'image', 'filters', 'pooling'),
+    'code review': ('pull request', 'reviewer', 'feedback on code', 'peer review'),
+    'conflict resolution': ('disagreement', 'compromise', 'mediate', 'resolve conflicts'),
+    'consistency': ('consistent', 'replicas agree', 'strong consistency'),
+    'conversion rate': ('conversions', 'percentage of visitors', 'funnel'),
+    'correlation': ('correlated', 'causation', 'relationship between variables', 'pearson'),
+    'cross-validation': ('k-fold', 'validation set', 'hold-out', 'folds'),
+    'customer journey': ('journey map', 'awareness', 'consideration', 'purchase'),
+    'database': ('sql', 'table', 'query', 'schema', 'index', 'postgres', 'mysql'),
+    'dcf': ('discounted cash flow', 'intrinsic value', 'projected cash flows'),
+    'debt': ('borrowing', 'loan', 'bonds', 'repayments', 'leverage'),
+    'debugging': ('debug', 'bug', 'breakpoint', 'stack trace', 'root cause', 'logging', 'reproduce'),
+    'deep learning': ('neural network', 'layers', 'backpropagation', 'gradient descent'),
+    'deletion': ('drop rows', 'remove records', 'listwise'),
+    'deployment': ('deploy', 'release', 'rollout', 'production', 'rollback'),
+    'dilution': ('give up ownership', 'ownership stake', 'control'),
+    'dimensionality reduction': ('pca', 'principal component analysis', 't-sne', 'fewer features'),
+    'distributed systems': ('distributed', 'nodes', 'replication', 'partitioning', 'consensus', 'cap theorem'),
+    'diversification': ('diversify', 'spread risk', 'uncorrelated assets', 'asset allocation'),
+    'email marketing': ('newsletter', 'open rate', 'click-through rate', 'mailing list', 'drip campaign'),
+    'encapsulation': ('private fields', 'data hiding', 'getters', 'setters', 'access modifiers'),
+    'equity': ('shares', 'stock', 'investors', 'ownership'),
+    'experimentation': ('experiment', 'split test', 'control group', 'lift'),
+    'f1-score': ('f1', 'harmonic mean', 'precision and recall'),
+    'feature engineering': ('new features', 'transform variables', 'encoding', 'scaling'),
+    'feature selection': ('select features', 'irrelevant features', 'feature importance', 'lasso'),
+    'financing': ('raise money', 'raise capital', 'funding'),
+    'future value': ('grows to', 'compound growth', 'future worth'),
+    'hashing': ('hash function', 'hash table', 'hash map', 'collision', 'bucket'),
+    'imputation': ('impute', 'fill missing values', 'mean imputation', 'median imputation'),
+    'inheritance': ('subclass', 'parent class', 'child class', 'base class', 'extends', 'inherit'),
+    'interest': ('interest payments', 'tax deductible', 'coupon'),
+    'kpis': ('key performance indicators', 'kpi', 'north star metric', 'success metrics'),
+    'load balancing': ('load balancer', 'round robin', 'distribute traffic', 'nginx', 'horizontal scaling'),
+    'market fit': ('product-market fit', 'demand', 'customers want'),
+    'market research': ('competitor research', 'customer research', 'focus groups'),
+    'mean': ('average',),
+    'median': ('middle value', 'typical value'),
+    'metrics': ('measure', 'dashboard', 'numbers', 'guardrail'),
+    'microservices': ('microservice', 'services communicate', 'independently deployable', 'service boundaries'),
+    'missing data': ('missing values', 'null values', 'nan', 'incomplete records'),
+    'model-based': ('predict missing values', 'knn', 'regression imputation'),
+    'monolith': ('monolithic', 'single codebase', 'one application'),
+    'neural networks': ('neural network', 'neurons', 'activation function', 'weights'),
+    'non-relational': ('nosql', 'mongodb', 'document store', 'key-value', 'cassandra'),
+    'objects': ('object', 'instance', 'instantiate'),
+    'overfitting': ('overfit', 'memorizes', 'training data', 'high variance', 'regularization', 'dropout'),
+    'polymorphism': ('override', 'overload', 'same interface', 'many forms', 'method overriding'),
+    'precision': ('false positives', 'positive predictive value'),
+    'present value': ('discount back', "today's dollars", 'worth today'),
+    'prioritization': ('prioritize', 'rice', 'moscow', 'impact versus effort', 'backlog'),
+    'recall': ('false negatives', 'sensitivity', 'true positive rate'),
+    'refactoring': ('refactor', 'clean up code', 'restructure', 'without changing behavior'),
+    'regression': ('linear regression', 'predict a continuous', 'coefficients', 'least squares'),
+    'relational': ('sql', 'tables', 'joins', 'foreign key', 'normalization'),
+    'risk': ('downside', 'exposure', 'default', 'uncertain'),
+    'risk management': ('hedging', 'mitigate risk', 'exposure', 'stop loss'),
+    'rnn': ('recurrent neural network', 'lstm', 'sequence', 'time series'),
+    'roadmap': ('product roadmap', 'milestones', 'timeline', 'quarterly plan'),
+    'roc': ('receiver operating characteristic', 'true positive rate', 'false positive rate', 'threshold'),
+    'roi': ('return on investment', 'payback', 'cost versus benefit'),
+    'scalability': ('scale', 'scaling', 'horizontal scaling', 'vertical scaling', 'sharding', 'throughput'),
+    'seo': ('search engine optimization', 'search rankings', 'organic traffic', 'google'),
+    'stakeholder management': ('stakeholders', 'buy-in', 'align expectations', 'communicate with leadership'),
+    'success criteria': ('definition of success', 'goal', 'target'),
+    'supervised': ('labeled examples', 'training labels', 'supervised learning'),
+    'system design': ('architecture', 'components', 'high level design', 'bottleneck'),
+    'target audience': ('audience', 'persona', 'demographics', 'ideal customer'),
+    'technical debt': ('tech debt', 'shortcuts', 'legacy code', 'code rot'),
+    'testing': ('unit tests', 'integration tests', 'test coverage', 'tdd', 'pytest', 'qa'),
+    'time value': ('time value of money', 'a dollar today', 'opportunity cost'),
+    'tracking': ('instrument', 'events', 'analytics'),
+    'trade-offs': ('tradeoff', 'trade off', 'pros and cons', 'downside'),
+    'underfitting': ('underfit', 'too simple', 'high bias'),
+    'unsupervised': ('unlabeled data', 'without labels', 'unsupervised learning'),
+    'usability testing': ('user testing', 'think aloud', 'prototype testing'),
+    'user feedback': ('customer feedback', 'surveys', 'interviews', 'nps'),
+    'valuation': ('value a company', 'multiples', 'comparable companies', 'enterprise value'),
+    'variance': ('spread', 'high variance', 'standard deviation'),
+    'volatility': ('volatile', 'price swings', 'standard deviation of returns', 'beta'),
+    'wacc': ('weighted average cost of capital', 'cost of equity', 'cost of debt')
+}
+
+
+def content_words(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def word_terms(word):
+    """A word's own term plus its padded character n-grams"""
+    padded = f" {word} "
+    found = [f"w:{word}"]
+    for size in NGRAM_SIZES:
+        found.extend(padded[start:start + size] for start in range(len(padded) - size + 1))
+    return found
+
+
+def question_document(question):
+    """Text the index holds for one question: its wording, keywords and their expansions"""
+    keywords = question.get('keywords', [])
+    parts = [question.get('question', '')]
+    for keyword in keywords:
+        # Keywords carry the topic, so they count twice as much as the wording
+        parts += [keyword, keyword]
+        parts.extend(KEYWORD_EXPANSIONS.get(keyword.lower(), ()))
+    return ' '.join(parts)
+
+
+class RelevanceIndex:
+    """TF-IDF index of every question's topic, for scoring how on-topic an answer is.
+
+    Terms are content words plus character 3-5 grams, so inflections,
+    compounds and paraphrases that share roots with the keywords or their
+    expansions still overlap. Question vectors are L2-normalized sparse
+    rows (sorted term IDs and weights) computed once when the index is
+    built; scoring an answer is one sparse dot product against its
+    question's row.
+    """
+
+    # Terms no question uses only count toward an answer's norm, so they are
+    # hashed into this many extra IDs instead of growing the vocabulary
+    unseen_buckets = 1 << 20
+    max_cached_words = 100000
+
+    def __init__(self, questions):
+        documents = [Counter(term for word in content_words(question_document(question)) for term in word_terms(word))
+                     for question in questions]
+        document_frequency = Counter(term for counts in documents for term in counts)
+        self.vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        count = len(documents)
+        # Smoothed IDF; a term no question uses gets the rarest possible weight
+        self.idf = np.array([
+            math.log((1 + count) / (1 + document_frequency[term])) + 1 for term in self.vocabulary
+        ])
+        self.unseen_idf = math.log(1 + count) + 1
+        self._word_ids = {}
+        self._rows = {}
+        self._lock = threading.Lock()
+        for question in questions:
+            self.question_vector(question)
+
+    def _term_ids(self, word):
+        ids = self._word_ids.get(word)
+        if ids is None:
+            size = len(self.vocabulary)
+            ids = np.array([
+                self.vocabulary.get(term, size + zlib.crc32(term.encode('utf-8')) % self.unseen_buckets)
+                for term in word_terms(word)
+            ], dtype=np.int64)
+            if len(self._word_ids) >= self.max_cached_words:
+                self._word_ids = {}
+            self._word_ids[word] = ids
+        return ids
+
+    def vector(self, text):
+        """(sorted term IDs, weights) of the text's L2-normalized TF-IDF vector, with sublinear term frequency"""
+        return self.count_vector(Counter(content_words(text)))
+
+    def count_vector(self, counts):
+        """The same vector from a text's content-word counts"""
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        id_lists = [self._term_ids(word) for word in counts]
+        ids = np.concatenate(id_lists)
+        repeats = np.repeat(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)),
+                            [len(word_ids) for word_ids in id_lists])
+        ids, inverse = np.unique(ids, return_inverse=True)
+        tf = np.bincount(inverse.ravel(), weights=repeats)
+        known = ids < len(self.vocabulary)
+        idf = np.full(len(ids), self.unseen_idf)
+        idf[known] = self.idf[ids[known]]
+        weights = (1 + np.log(tf)) * idf
+        return ids, weights / math.sqrt(float(weights @ weights))
+
+    def question_vector(self, question):
+        """Precomputed row for a question, built on first sight for questions outside the file"""
+        key = (question.get('question', ''), tuple(question.get('keywords', [])))
+        row = self._rows.get(key)
+        if row is None:
+            row = self.vector(question_document(question))
+            with self._lock:
+                self._rows[key] = row
+        return row
+
+    def score(self, question, answer):
+        """Cosine similarity between an answer and its question's topic, 0 to 1"""
+        return self.score_counts(question, Counter(content_words(answer)))
+
+    def score_counts(self, question, counts):
+        """score for an answer given as its content-word counts, as kept for a draft being typed"""
+        question_ids, question_weights = self.question_vector(question)
+        answer_ids, answer_weights = self.count_vector(counts)
+        _, in_question, in_answer = np.intersect1d(question_ids, answer_ids, assume_unique=True, return_indices=True)
+        return float(question_weights[in_question] @ answer_weights[in_answer])
+
+    def credit(self, question, answer):
+        """Share of full topical credit an answer earns, 0 to 1"""
+        return self.credit_counts(question, Counter(content_words(answer)))
+
+    def credit_counts(self, question, counts):
+        similarity = self.score_counts(question, counts)
+        return min(1.0, max(0.0, (similarity - RELEVANCE_FLOOR) / (RELEVANCE_FULL_CREDIT - RELEVANCE_FLOOR)))
+
+
+_bank = None
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def use_question_bank(bank):
+    """Index the questions this bank serves; a process that never calls this loads its own bank"""
+    global _bank
+    _bank = bank
+
+
+def get_relevance_index():
+    """Index over the question bank's current snapshot, rebuilt when the bank reloads"""
+    global _bank, _index, _index_source
+    if _bank is None:
+        with _index_lock:
+            if _bank is None:
+                _bank = QuestionBank(QUESTIONS_PATH)
+    # Each reload swaps in a new QuestionIndex, so identity tells whether this one is current
+    source = _bank.index
+    if _index is not None and _index_source is source:
+        return _index
+    with _index_lock:
+        if _index_source is not source:
+            _index = RelevanceIndex([question for questions in source.by_domain.values() for question in questions])
+            _index_source = source
+    return _index
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import io
+import json
+import os
+import threading
+from xml.sax.saxutils import escape
+
+SCORE_COLORS = {
+    'technical': '#6366f1',
+    'communication': '#10b981',
+    'behavioral': '#f59e0b'
+}
+
+
+def _source_digest():
+    # Reports rendered by an older version of this module are never served
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+RENDERER_VERSION = _source_digest()
+
+
+def results_digest(results):
+    """Stable hash of a completed interview's results, the report cache key"""
+    payload = json.dumps([RENDERER_VERSION, results], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _png(figure):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(figure)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    buffer.seek(0)
+    return buffer
+
+
+def radar_chart(scores):
+    """PNG of the three category scores on a 0-10 radar"""
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    labels = ['Technical', 'Communication', 'Behavioral']
+    values = [scores.get(label.lower(), 0) for label in labels]
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+
+    # Figure objects instead of pyplot: no global state shared between request threads
+    figure = Figure(figsize=(4, 4))
+    ax = figure.add_subplot(111, polar=True)
+    ax.plot(angles + angles[:1], values + values[:1], color=SCORE_COLORS['technical'], linewidth=2)
+    ax.fill(angles + angles[:1], values + values[:1], color=SCORE_COLORS['technical'], alpha=0.2)
+    ax.set_xticks(angles)
+    ax.set_xticklabels(labels)
+    ax.set_ylim(0, 10)
+    ax.set_yticks([2, 4, 6, 8, 10])
+    return _png(figure)
+
+
+def question_chart(metrics):
+    """PNG of grouped per-question score bars"""
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    count = len(metrics.get('technical_scores', []))
+    positions = np.arange(count)
+    width = 0.27
+
+    figure = Figure(figsize=(7, 3.2))
+    ax = figure.add_subplot(111)
+    for offset, name in zip((-width, 0, width), ('technical', 'communication', 'behavioral')):
+        ax.bar(positions + offset, metrics.get(f'{name}_scores', []), width,
+               label=name.capitalize(), color=SCORE_COLORS[name])
+    ax.set_xticks(positions)
+    ax.set_xticklabels([f'Q{i + 1}' for i in range(count)])
+    ax.set_ylim(0, 10)
+    ax.set_ylabel('Score')
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.12), ncol=3, frameon=False)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    return _png(figure)
+
+
+def render_pdf(results, output):
+    """Write the PDF report for one interview's results to a file object"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph('AI Interview Performance Report', styles['Title']),
+        Paragraph(
+            f"{escape(str(results.get('domain', '')))} &middot; {escape(str(results.get('difficulty', '')))} "
+            f"&middot; {escape(str(results.get('interview_type', '')))} &middot; "
+            f"{escape(str(results.get('completion_time', ''))[:10])}",
+            styles['Normal']
+        ),
+        Spacer(1, 0.5 * cm)
+    ]
+
+    scores = results.get('scores', {})
+    score_table = Table(
+        [['Overall', 'Technical', 'Communication', 'Behavioral'],
+         [f"{scores.get(name, 0)}/10" for name in ('overall', 'technical', 'communication', 'behavioral')]],
+        colWidths=[4 * cm] * 4
+    )
+    score_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#eef2ff')),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, 1), 14),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#c7d2fe'))
+    ]))
+    story += [score_table, Spacer(1, 0.5 * cm), Image(radar_chart(scores), width=8 * cm, height=8 * cm, kind='proportional')]
+
+    metrics = results.get('metrics', {})
+    if metrics.get('technical_scores'):
+        story += [
+            Paragraph('Scores by Question', styles['Heading2']),
+            Image(question_chart(metrics), width=16 * cm, height=8 * cm, kind='proportional')
+        ]
+
+    for title, key in (('Key Insights', 'insights'), ('Recommendations', 'recommendations')):
+        if results.get(key):
+            story.append(Paragraph(title, styles['Heading2']))
+            story += [Paragraph(f"&bull; {escape(str(line))}", styles['Normal']) for line in results[key]]
+
+    questions = [entry for entry in results.get('conversation', []) if entry.get('type') == 'question']
+    if questions:
+        story.append(Paragraph('Questions', styles['Heading2']))
+        story += [
+            Paragraph(f"Q{i + 1}. {escape(str(entry.get('content', '')))}", styles['Normal'])
+            for i, entry in enumerate(questions)
+        ]
+
+    SimpleDocTemplate(output, pagesize=A4, title='AI Interview Performance Report',
+                      leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm).build(story)
+
+
+class ReportCache:
+    """Rendered PDF reports on disk, keyed by a hash of the interview results.
+
+    A completed interview's results never change, so its report is rendered
+    once and every later download is a plain file read. Files are written
+    to a temporary name and renamed, so other workers never see a partial
+    PDF; the oldest reports are pruned beyond max_files.
+    """
+
+    def __init__(self, directory, max_files):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'renders': 0}
+
+    def path_for(self, digest):
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def get(self, results):
+        """(path, digest) of the report for these results, rendering it on a miss"""
+        digest = results_digest(results)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            self.counters['hits'] += 1
+            self._touch(path)
+            return path, digest
+        with self._lock:
+            # Another thread may have rendered it while this one waited
+            if not os.path.exists(path):
+                self._render(results, path)
+                self.counters['renders'] += 1
+            else:
+                self.counters['hits'] += 1
+        return path, digest
+
+    def _touch(self, path):
+        # Pruning goes by mtime, so a downloaded report counts as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _render(self, results, path):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                render_pdf(results, f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._prune()
+
+    def _prune(self):
+        try:
+            reports = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pdf')]
+            if len(reports) <= self.max_files:
+                return
+            reports.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in reports[:len(reports) - self.max_files]:
+                os.remove(entry.path)
+        except OSError as e:
+            print(f"Error pruning report cache: {e}")
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+# Per-answer metrics tracked for an interview session
+METRIC_NAMES = ('technical', 'communication', 'behavioral', 'word_count', 'response_time')
+
+
+def new_stat():
+    """Empty accumulator; a plain dict so it can live in the session"""
+    return {'count': 0, 'sum': 0.0, 'min': None, 'max': None, 'mean': 0.0, 'm2': 0.0}
+
+
+def new_metrics():
+    return {name: new_stat() for name in METRIC_NAMES}
+
+
+def update_stat(stat, value):
+    """Add one value in O(1): count, sum, min, max and Welford's running variance"""
+    stat['count'] += 1
+    stat['sum'] += value
+    stat['min'] = value if stat['min'] is None else min(stat['min'], value)
+    stat['max'] = value if stat['max'] is None else max(stat['max'], value)
+    delta = value - stat['mean']
+    stat['mean'] += delta / stat['count']
+    stat['m2'] += delta * (value - stat['mean'])
+    return stat
+
+
+def stat_avg(stat):
+    # sum / count matches the old list average exactly
+    return stat['sum'] / stat['count'] if stat['count'] else 0
+
+
+def stat_range(stat):
+    return stat['max'] - stat['min'] if stat['count'] else 0
+
+
+def stat_stddev(stat):
+    """Sample standard deviation"""
+    if stat['count'] < 2:
+        return 0.0
+    return math.sqrt(stat['m2'] / (stat['count'] - 1))
+
+
+def summarize(stat):
+    return {
+        'count': stat['count'],
+        'avg': round(stat_avg(stat), 2),
+        'min': stat['min'],
+        'max': stat['max'],
+        'stddev': round(stat_stddev(stat), 2)
+    }
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+RANKED_SCORES = ('overall', 'technical', 'communication', 'behavioral')
+BIN_WIDTH = 0.1  # Final scores are rounded to one decimal, so every bin holds one exact score
+BINS = int(round(10 / BIN_WIDTH)) + 1
+
+
+class ScoreHistograms:
+    """Fixed-bin histograms of completed interviews' final scores, one set per domain and difficulty.
+
+    Adding an interview increments one bin per score; ranking a score
+    sums the bins below it, so neither ever looks at past interviews.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.counts = np.zeros((0, len(RANKED_SCORES), BINS), dtype=np.int64)
+
+    def __len__(self):
+        return int(self.counts[:, 0, :].sum())
+
+    def _group(self, domain, difficulty, create=False):
+        key = f"{domain}|{difficulty}"
+        index = self.groups.get(key)
+        if index is None and create:
+            index = self.groups[key] = len(self.groups)
+            self.counts = np.concatenate([self.counts, np.zeros((1, len(RANKED_SCORES), BINS), dtype=np.int64)])
+        return index
+
+    def add(self, domain, difficulty, scores):
+        index = self._group(domain, difficulty, create=True)
+        for i, name in enumerate(RANKED_SCORES):
+            self.counts[index, i, _bin(scores[name])] += 1
+
+    def percentiles(self, domain, difficulty, scores, min_population=1):
+        """Share of interviews in the same domain and difficulty scoring below each score, ties counted half.
+
+        None when fewer than min_population interviews are on record.
+        """
+        index = self._group(domain, difficulty)
+        if index is None:
+            return None
+        counts = self.counts[index]
+        population = int(counts[0].sum())
+        if population < max(min_population, 1):
+            return None
+        ranks = {'population': population}
+        for i, name in enumerate(RANKED_SCORES):
+            position = _bin(scores[name])
+            below = int(counts[i, :position].sum())
+            ranks[name] = round(100.0 * (below + 0.5 * int(counts[i, position])) / population, 1)
+        return ranks
+
+    def to_arrays(self):
+        return list(self.groups), self.counts
+
+    def load_arrays(self, keys, counts):
+        if counts.shape[1:] != (len(RANKED_SCORES), BINS) or len(keys) != counts.shape[0]:
+            return False
+        self.groups = {key: index for index, key in enumerate(keys)}
+        self.counts = counts.astype(np.int64)
+        return True
+
+
+def _bin(score):
+    return min(max(int(round(float(score) / BIN_WIDTH)), 0), BINS - 1)
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+
+import math
+import re
+import string
+from array import array
+
+import numpy as np
+
+# VADER's rule constants and word lists (Hutto & Gilbert, 2014), as in nltk.sentiment.vader
+B_INCR = 0.293
+B_DECR = -0.293
+C_INCR = 0.733
+N_SCALAR = -0.74
+
+NEGATE = frozenset((
+    "aint", "arent", "cannot", "cant", "couldnt", "darent", "didnt", "doesnt", "ain't", "aren't", "can't",
+    "couldn't", "daren't", "didn't", "doesn't", "dont", "hadnt", "hasnt", "havent", "isnt", "mightnt", "mustnt",
+    "neither", "don't", "hadn't", "hasn't", "haven't", "isn't", "mightn't", "mustn't", "neednt", "needn't",
+    "never", "none", "nope", "nor", "not", "nothing", "nowhere", "oughtnt", "shant", "shouldnt", "uhuh", "wasnt",
+    "werent", "oughtn't", "shan't", "shouldn't", "uh-uh", "wasn't", "weren't", "without", "wont", "wouldnt",
+    "won't", "wouldn't", "rarely", "seldom", "despite"
+))
+
+BOOSTERS = dict.fromkeys((
+    "absolutely", "amazingly", "awfully", "completely", "considerably", "decidedly", "deeply", "effing",
+    "enormously", "entirely", "especially", "exceptionally", "extremely", "fabulously", "flipping", "flippin",
+    "fricking", "frickin", "frigging", "friggin", "fully", "fucking", "greatly", "hella", "highly", "hugely",
+    "incredibly", "intensely", "majorly", "more", "most", "particularly", "purely", "quite", "really",
+    "remarkably", "so", "substantially", "thoroughly", "totally", "tremendously", "uber", "unbelievably",
+    "unusually", "utterly", "very"
+), B_INCR)
+BOOSTERS.update(dict.fromkeys((
+    "almost", "barely", "hardly", "just enough", "kind of", "kinda", "kindof", "kind-of", "less", "little",
+    "marginally", "occasionally", "partly", "scarcely", "slightly", "somewhat", "sort of", "sorta", "sortof",
+    "sort-of"
+), B_DECR))
+
+SPECIAL_CASE_IDIOMS = {
+    "the shit": 3, "the bomb": 3, "bad ass": 1.5, "yeah right": -2,
+    "cut the mustard": 2, "kiss of death": -1.5, "hand to mouth": -2
+}
+
+PUNC_LIST = frozenset((
+    ".", "!", "?", ",", ";", ":", "-", "'", '"', "!!", "!!!", "??", "???", "?!?", "!?!", "?!?!", "!?!?"
+))
+
+_REMOVE_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+_PUNCTUATION = frozenset(string.punctuation)
+
+# Adjacent token pairs that start an idiom or a two-word booster ("kind of");
+# texts containing one take the scalar path, which applies those rules word by word
+_SPECIAL_PAIRS = frozenset(
+    tuple(words[i:i + 2])
+    for words in (phrase.split() for phrase in list(SPECIAL_CASE_IDIOMS) + [b for b in BOOSTERS if ' ' in b])
+    for i in range(len(words) - 1)
+)
+
+
+def vader_tokens(text):
+    """VADER's words_and_emoticons: whitespace tokens with one edge punctuation mark trimmed off"""
+    words_only = {word for word in _REMOVE_PUNCTUATION.sub('', text).split() if len(word) > 1}
+    tokens = []
+    for token in text.split():
+        if len(token) < 2:
+            continue
+        if token[-1] in _PUNCTUATION:
+            core = token.rstrip(string.punctuation)
+            if core in words_only and token[len(core):] in PUNC_LIST:
+                tokens.append(core)
+                continue
+        if token[0] in _PUNCTUATION:
+            core = token.lstrip(string.punctuation)
+            if core in words_only and token[:len(token) - len(core)] in PUNC_LIST:
+                token = core
+        tokens.append(token)
+    return tokens
+
+
+def _negated(word_lower):
+    return word_lower in NEGATE or "n't" in word_lower
+
+
+def punctuation_emphasis(text):
+    """Intensity added to a non-neutral text by its exclamation and question marks"""
+    ep_amplifier = min(text.count('!'), 4) * 0.292
+    qm_count = text.count('?')
+    qm_amplifier = 0
+    if qm_count > 1:
+        qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+    return ep_amplifier + qm_amplifier
+
+
+def vader_summary(sum_s, pos_sum, neg_sum, neu_count, text):
+    """compound/pos/neg/neu from summed token valences, exactly as VADER's score_valence"""
+    if not (pos_sum or neg_sum or neu_count):
+        return {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+    punct = punctuation_emphasis(text)
+    if sum_s > 0:
+        sum_s += punct
+    elif sum_s < 0:
+        sum_s -= punct
+    compound = sum_s / math.sqrt(sum_s * sum_s + 15)
+
+    if pos_sum > math.fabs(neg_sum):
+        pos_sum += punct
+    elif pos_sum < math.fabs(neg_sum):
+        neg_sum -= punct
+    total = pos_sum + math.fabs(neg_sum) + neu_count
+    return {
+        'neg': round(math.fabs(neg_sum / total), 3),
+        'neu': round(math.fabs(neu_count / total), 3),
+        'pos': round(math.fabs(pos_sum / total), 3),
+        'compound': round(compound, 4)
+    }
+
+
+class LexiconScorer:
+    """VADER-style sentiment over a compiled lexicon.
+
+    Words map to integer IDs and valences live in one float64 array. A
+    text is scored in a single pass that applies ALL-CAPS emphasis,
+    boosters and dampeners, negation, "least" and "but" as VADER does, so
+    a scorer built from the VADER lexicon returns the same scores as
+    nltk's SentimentIntensityAnalyzer. ``score_batch`` scores many texts
+    at once, running the rules as NumPy array operations over every
+    lexicon hit in the batch.
+    """
+
+    def __init__(self, lexicon):
+        self.ids = {word: index for index, word in enumerate(lexicon)}
+        self.valences = np.fromiter(lexicon.values(), dtype=np.float64, count=len(lexicon))
+        # Flat doubles for the scalar path: indexing them is as fast as a list's
+        # floats, without a heap object per word for forked workers to copy
+        self._valence_list = array('d', self.valences.tobytes())
+
+    def token_sentiments(self, tokens):
+        """Valence of every token after VADER's context rules, 0 for neutral words"""
+        ids = self.ids
+        count = len(tokens)
+        lower = [token.lower() for token in tokens]
+        caps = sum(1 for token in tokens if token.isupper())
+        is_cap_diff = 0 < count - caps < count
+
+        first = {}
+        sentiments = []
+        for position, item in enumerate(tokens):
+            # VADER reads each word's context at the word's first occurrence
+            i = first.setdefault(item, position)
+            item_lower = lower[i]
+            word_id = ids.get(item_lower)
+            if (word_id is None or item_lower in BOOSTERS
+                    or (item_lower == 'kind' and i < count - 1 and lower[i + 1] == 'of')):
+                sentiments.append(0)
+                continue
+            valence = self._valence_list[word_id]
+            if is_cap_diff and item.isupper():
+                valence += C_INCR if valence > 0 else -C_INCR
+
+            for start_i in range(3):
+                j = i - start_i - 1
+                if j < 0 or lower[j] in ids:
+                    continue
+                scalar = BOOSTERS.get(lower[j], 0.0)
+                if scalar:
+                    if valence < 0:
+                        scalar = -scalar
+                    if is_cap_diff and tokens[j].isupper():
+                        scalar += C_INCR if valence > 0 else -C_INCR
+                    if start_i == 1:
+                        scalar *= 0.95
+                    elif start_i == 2:
+                        scalar *= 0.9
+                valence += scalar
+
+                if start_i == 0:
+                    if _negated(lower[j]):
+                        valence *= N_SCALAR
+                elif start_i == 1:
+                    if tokens[i - 2] == 'never' and tokens[i - 1] in ('so', 'this'):
+                        valence *= 1.5
+                    elif _negated(lower[j]):
+                        valence *= N_SCALAR
+                else:
+                    if (tokens[i - 3] == 'never' and tokens[i - 2] in ('so', 'this')) or tokens[i - 1] in ('so', 'this'):
+                        valence *= 1.25
+                    elif _negated(lower[j]):
+                        valence *= N_SCALAR
+                    valence = self._idioms(valence, tokens, i)
+
+            if i > 0 and lower[i - 1] == 'least' and lower[i - 1] not in ids:
+                if i == 1 or lower[i - 2] not in ('at', 'very'):
+                    valence *= N_SCALAR
+            sentiments.append(valence)
+
+        if 'but' in lower:
+            but_index = lower.index('but')
+            sentiments = [
+                s * 0.5 if index < but_index else s * 1.5 if index > but_index else s
+                for index, s in enumerate(sentiments)
+            ]
+        return sentiments
+
+    @staticmethod
+    def _idioms(valence, tokens, i):
+        sequences = (
+            f"{tokens[i - 1]} {tokens[i]}",
+            f"{tokens[i - 2]} {tokens[i - 1]} {tokens[i]}",
+            f"{tokens[i - 2]} {tokens[i - 1]}",
+            f"{tokens[i - 3]} {tokens[i - 2]} {tokens[i - 1]}",
+            f"{tokens[i - 3]} {tokens[i - 2]}"
+        )
+        for sequence in sequences:
+            if sequence in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[sequence]
+                break
+        if len(tokens) - 1 > i:
+            sequence = f"{tokens[i]} {tokens[i + 1]}"
+            if sequence in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[sequence]
+        if len(tokens) - 1 > i + 1:
+            sequence = f"{tokens[i]} {tokens[i + 1]} {tokens[i + 2]}"
+            if sequence in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[sequence]
+        if sequences[4] in BOOSTERS or sequences[2] in BOOSTERS:
+            valence += B_DECR
+        return valence
+
+    def polarity_scores(self, text):
+        """Same keys and values as nltk's SentimentIntensityAnalyzer.polarity_scores"""
+        sentiments = self.token_sentiments(vader_tokens(text))
+        pos_sum = neg_sum = 0.0
+        neu_count = 0
+        for s in sentiments:
+            if s > 0:
+                pos_sum += s + 1
+            elif s < 0:
+                neg_sum += s - 1
+            else:
+                neu_count += 1
+        return vader_summary(float(sum(sentiments)), pos_sum, neg_sum, neu_count, text)
+
+    def batch_sentiments(self, texts):
+        """Token sentiments for many texts as (sentiments, text index per token, token counts)"""
+        token_lists = [vader_tokens(text) for text in texts]
+        counts = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(texts))
+        flat = [token for tokens in token_lists for token in tokens]
+        if not flat:
+            return np.zeros(0), np.zeros(0, dtype=np.int64), counts
+
+        # Every rule depends only on the token's text, so rules are evaluated
+        # once per distinct token and gathered back for every occurrence
+        vocab = {}
+        raw_ids = np.fromiter((vocab.setdefault(token, len(vocab)) for token in flat), dtype=np.int64, count=len(flat))
+        words = list(vocab)
+        lowers = [word.lower() for word in words]
+        word_ids = np.array([self.ids.get(word, -1) for word in lowers], dtype=np.int64)
+        in_lex = word_ids >= 0
+        base = np.where(in_lex, self.valences[np.maximum(word_ids, 0)], 0.0)
+        booster = np.array([BOOSTERS.get(word, 0.0) for word in lowers])
+        negated = np.array([_negated(word) for word in lowers])
+        upper = np.array([word.isupper() for word in words])
+        never = np.array([word == 'never' for word in words])
+        so_this = np.array([word in ('so', 'this') for word in words])
+        least = np.array([word == 'least' for word in lowers])
+        at_very = np.array([word in ('at', 'very') for word in lowers])
+        kind = np.array([word == 'kind' for word in lowers])
+        of = np.array([word == 'of' for word in lowers])
+        but = np.array([word == 'but' for word in lowers])
+
+        total = len(flat)
+        text_of = np.repeat(np.arange(len(texts)), counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        local = np.arange(total) - starts[text_of]
+        caps = np.bincount(text_of, weights=upper[raw_ids], minlength=len(texts))
+        cap_diff = ((counts - caps) > 0) & ((counts - caps) < counts)
+
+        # VADER reads each word's context at its first occurrence in the text
+        keys = text_of * len(words) + raw_ids
+        _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        ctx = first_index[inverse.ravel()]
+        ctx_local = local[ctx]
+
+        ids_at = raw_ids[ctx]
+        next_kind_of = kind[ids_at] & (ctx_local < counts[text_of] - 1)
+        next_kind_of &= of[raw_ids[np.minimum(ctx + 1, total - 1)]]
+        scored = in_lex[ids_at] & (booster[ids_at] == 0) & ~next_kind_of
+
+        sentiments = np.zeros(total)
+        positions = np.flatnonzero(scored)
+        i = ctx[positions]
+        i_local = ctx_local[positions]
+        valence = base[raw_ids[i]]
+        emphasis = cap_diff[text_of[positions]]
+        valence = np.where(emphasis & upper[raw_ids[i]], valence + np.where(valence > 0, C_INCR, -C_INCR), valence)
+
+        def at(offset):
+            return raw_ids[np.maximum(i - offset, 0)]
+
+        for start_i, damp in ((0, 1.0), (1, 0.95), (2, 0.9)):
+            prev = at(start_i + 1)
+            valid = (i_local > start_i) & ~in_lex[prev]
+            scalar = np.where(valence < 0, -booster[prev], booster[prev])
+            boosted = booster[prev] != 0
+            scalar = np.where(boosted & emphasis & upper[prev], scalar + np.where(valence > 0, C_INCR, -C_INCR), scalar)
+            if damp != 1.0:
+                scalar = np.where(boosted, scalar * damp, scalar)
+            valence = np.where(valid, valence + scalar, valence)
+
+            if start_i == 0:
+                valence = np.where(valid & negated[prev], valence * N_SCALAR, valence)
+            elif start_i == 1:
+                emphatic = valid & never[at(2)] & so_this[at(1)]
+                valence = np.where(emphatic, valence * 1.5,
+                                   np.where(valid & negated[prev], valence * N_SCALAR, valence))
+            else:
+                emphatic = valid & ((never[at(3)] & so_this[at(2)]) | so_this[at(1)])
+                valence = np.where(emphatic, valence * 1.25,
+                                   np.where(valid & negated[prev], valence * N_SCALAR, valence))
+
+        prev_least = (i_local > 0) & least[at(1)] & ~in_lex[at(1)]
+        valence = np.where(prev_least & ((i_local == 1) | ~at_very[at(2)]), valence * N_SCALAR, valence)
+        sentiments[positions] = valence
+
+        # Words before a text's first "but" count half, words after it half again
+        is_but = but[raw_ids]
+        if is_but.any():
+            but_local = np.full(len(texts), np.iinfo(np.int64).max)
+            np.minimum.at(but_local, text_of[is_but], local[is_but])
+            but_at = but_local[text_of]
+            has_but = but_at != np.iinfo(np.int64).max
+            sentiments = np.where(has_but & (local < but_at), sentiments * 0.5,
+                                  np.where(has_but & (local > but_at), sentiments * 1.5, sentiments))
+
+        # Idioms and two-word boosters are rare; those texts take the scalar path
+        for index, tokens in enumerate(token_lists):
+            if _SPECIAL_PAIRS.intersection(zip(tokens, tokens[1:])):
+                start = starts[index]
+                sentiments[start:start + len(tokens)] = self.token_sentiments(tokens)
+        return sentiments, text_of, counts
+
+    def score_batch(self, texts):
+        """polarity_scores for every text, with the context rules run as array operations"""
+        texts = list(texts)
+        sentiments, text_of, counts = self.batch_sentiments(texts)
+        size = len(texts)
+        sums = np.bincount(text_of, weights=sentiments, minlength=size).tolist()
+        pos_sums = np.bincount(text_of, weights=np.where(sentiments > 0, sentiments + 1, 0.0), minlength=size).tolist()
+        neg_sums = np.bincount(text_of, weights=np.where(sentiments < 0, sentiments - 1, 0.0), minlength=size).tolist()
+        neu_counts = np.bincount(text_of, weights=sentiments == 0, minlength=size).astype(np.int64).tolist()
+        return [
+            vader_summary(sums[k], pos_sums[k], neg_sums[k], neu_counts[k], text)
+            for k, text in enumerate(texts)
+        ]
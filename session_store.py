@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+
+from instrumentation import SESSION_LATENCY
+
+# Values are serialized per key so a request only writes what it changed
+serializer = TaggedJSONSerializer()
+
+
+class ServerSideSession(dict, SessionMixin):
+    """Session dict that remembers which keys were read, written or removed"""
+
+    def __init__(self, sid=None, stored=None, new=False):
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self._stored = dict(stored or {})
+        self._touched = set()
+        self._deleted = set()
+        initial = {}
+        for key, raw in self._stored.items():
+            try:
+                initial[key] = serializer.loads(raw)
+            except Exception as e:
+                print(f"Dropping unreadable session value {key}: {e}")
+        super().__init__(initial)
+
+    def _touch(self, key):
+        self._touched.add(key)
+        self._deleted.discard(key)
+
+    def __getitem__(self, key):
+        # Lists and dicts may be mutated in place, so reads are candidates for saving
+        self.accessed = True
+        self._touched.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        if key in self:
+            self._touched.add(key)
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        self._touch(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        self._deleted.add(key)
+        self._touched.discard(key)
+        super().__delitem__(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        if key in self:
+            self.modified = True
+            self._deleted.add(key)
+            self._touched.discard(key)
+        return super().pop(key, *args)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self.modified = True
+        self._deleted.update(self.keys())
+        self._touched.clear()
+        super().clear()
+
+    def collect_changes(self):
+        """Return (changed, deleted) where changed maps key -> serialized value"""
+        changed = {}
+        for key in self._touched:
+            if not super().__contains__(key):
+                continue
+            raw = serializer.dumps(super().__getitem__(key))
+            if self._stored.get(key) != raw:
+                changed[key] = raw
+        deleted = {key for key in self._deleted if key in self._stored}
+        return changed, deleted
+
+    def mark_saved(self, changed, deleted):
+        self._stored.update(changed)
+        for key in deleted:
+            self._stored.pop(key, None)
+        self._touched.clear()
+        self._deleted.clear()
+        self.new = False
+
+
+class MemorySessionBackend:
+    """In-process LRU tier holding serialized session values"""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._claims = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry['expires'] < time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return dict(entry['data'])
+
+    def save(self, sid, changed, deleted, expires):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                entry = {'data': {}, 'expires': expires, 'version': 0}
+                self._entries[sid] = entry
+            entry['data'].update(changed)
+            for key in deleted:
+                entry['data'].pop(key, None)
+            entry['expires'] = expires
+            entry['version'] += 1
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry['version']
+
+    def put(self, sid, data, expires, version):
+        """Cache a full copy of a session loaded from a slower tier"""
+        with self._lock:
+            self._entries[sid] = {'data': dict(data), 'expires': expires, 'version': version}
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            return entry['version'] if entry else None
+
+    def claim(self, sid, key):
+        with self._lock:
+            claims = self._claims.setdefault(sid, set())
+            if key in claims:
+                return False
+            claims.add(key)
+            return True
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+            self._claims.pop(sid, None)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for sid in [s for s, e in self._entries.items() if e['expires'] < now]:
+                del self._entries[sid]
+            self._claims = {sid: claims for sid, claims in self._claims.items() if sid in self._entries}
+
+
+class SQLiteSessionBackend:
+    """Local disk tier storing one row per session key"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        if hasattr(os, 'register_at_fork'):
+            # SQLite connections must not cross a fork; workers forked from a
+            # preloading master open their own
+            os.register_at_fork(after_in_child=self._drop_connections)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, expires REAL NOT NULL, version INTEGER NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS session_values ('
+                'sid TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (sid, key))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS session_claims ('
+                'sid TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (sid, key))'
+            )
+
+    def _drop_connections(self):
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def version(self, sid):
+        row = self._connection().execute(
+            'SELECT version, expires FROM sessions WHERE sid = ?', (sid,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def load_versioned(self, sid):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT version, expires FROM sessions WHERE sid = ?', (sid,)
+        ).fetchone()
+        if row is None:
+            return None, None, None
+        if row[1] < time.time():
+            self.delete(sid)
+            return None, None, None
+        data = dict(conn.execute(
+            'SELECT key, value FROM session_values WHERE sid = ?', (sid,)
+        ).fetchall())
+        return data, row[1], row[0]
+
+    def load(self, sid):
+        return self.load_versioned(sid)[0]
+
+    def save(self, sid, changed, deleted, expires):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT INTO sessions (sid, expires, version) VALUES (?, ?, 1) '
+                'ON CONFLICT(sid) DO UPDATE SET expires = excluded.expires, '
+                'version = sessions.version + 1',
+                (sid, expires)
+            )
+            if changed:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO session_values (sid, key, value) VALUES (?, ?, ?)',
+                    [(sid, key, value) for key, value in changed.items()]
+                )
+            if deleted:
+                conn.executemany(
+                    'DELETE FROM session_values WHERE sid = ? AND key = ?',
+                    [(sid, key) for key in deleted]
+                )
+            row = conn.execute('SELECT version FROM sessions WHERE sid = ?', (sid,)).fetchone()
+        return row[0]
+
+    def claim(self, sid, key):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute('INSERT OR IGNORE INTO session_claims (sid, key) VALUES (?, ?)', (sid, key))
+        return cursor.rowcount == 1
+
+    def delete(self, sid):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM session_values WHERE sid = ?', (sid,))
+            conn.execute('DELETE FROM session_claims WHERE sid = ?', (sid,))
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def purge_expired(self):
+        conn = self._connection()
+        with conn:
+            for table in ('session_values', 'session_claims'):
+                conn.execute(
+                    f'DELETE FROM {table} WHERE sid IN '
+                    '(SELECT sid FROM sessions WHERE expires < ?)', (time.time(),)
+                )
+            conn.execute('DELETE FROM sessions WHERE expires < ?', (time.time(),))
+
+
+class TieredSessionBackend:
+    """LRU memory tier in front of the SQLite tier.
+
+    The disk tier is authoritative; a cached entry is only used while its
+    version matches the one on disk, so several workers can share the file.
+    """
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def load(self, sid):
+        disk_version = self.disk.version(sid)
+        if disk_version is None:
+            self.memory.delete(sid)
+            return None
+        if self.memory.version(sid) == disk_version:
+            cached = self.memory.load(sid)
+            if cached is not None:
+                return cached
+        data, expires, version = self.disk.load_versioned(sid)
+        if data is not None:
+            self.memory.put(sid, data, expires, version)
+        return data
+
+    def save(self, sid, changed, deleted, expires):
+        cached_version = self.memory.version(sid)
+        cached = self.memory.load(sid)
+        version = self.disk.save(sid, changed, deleted, expires)
+        if cached is not None and cached_version == version - 1:
+            cached.update(changed)
+            for key in deleted:
+                cached.pop(key, None)
+            self.memory.put(sid, cached, expires, version)
+        else:
+            self.memory.delete(sid)
+        return version
+
+    def claim(self, sid, key):
+        # Workers only share the disk tier
+        return self.disk.claim(sid, key)
+
+    def delete(self, sid):
+        self.memory.delete(sid)
+        self.disk.delete(sid)
+
+    def purge_expired(self):
+        self.memory.purge_expired()
+        self.disk.purge_expired()
+
+
+def create_session_backend(kind='tiered', path='data/sessions.sqlite3', max_entries=1000):
+    """Build a session backend by name: 'memory', 'sqlite' or 'tiered'"""
+    if kind == 'memory':
+        return MemorySessionBackend(max_entries)
+    if kind == 'sqlite':
+        return SQLiteSessionBackend(path)
+    if kind == 'tiered':
+        return TieredSessionBackend(MemorySessionBackend(max_entries), SQLiteSessionBackend(path))
+    raise ValueError(f"Unknown session backend: {kind}")
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data on the server; the cookie only carries an opaque ID"""
+
+    session_class = ServerSideSession
+    purge_interval = 300
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._last_purge = time.time()
+
+    def claim(self, session, key):
+        """True for the first request to claim key in this session; concurrent requests see False"""
+        return self.backend.claim(session.sid, key)
+
+    def _expires_at(self, app, session):
+        if session.permanent:
+            return time.time() + app.permanent_session_lifetime.total_seconds()
+        # Browser-session cookies still need a server-side cut-off
+        return time.time() + 86400
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            with SESSION_LATENCY.time(operation='load'):
+                stored = self.backend.load(sid)
+            if stored is not None:
+                return self.session_class(sid, stored)
+        return self.session_class(secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        with SESSION_LATENCY.time(operation='save'):
+            changed, deleted = session.collect_changes()
+            if changed or deleted or session.new or self.should_set_cookie(app, session):
+                self.backend.save(session.sid, changed, deleted, self._expires_at(app, session))
+                session.mark_saved(changed, deleted)
+
+        if self.should_set_cookie(app, session) or session.modified:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+        if time.time() - self._last_purge > self.purge_interval:
+            self._last_purge = time.time()
+            self.backend.purge_expired()
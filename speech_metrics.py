@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import binascii
+import math
+import struct
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 16000  # Assumed for headerless PCM
+FRAME_SECONDS = 0.03
+MIN_PAUSE_SECONDS = 0.25  # Shorter gaps are treated as part of the same utterance
+MIN_SEGMENT_SECONDS = 0.1
+MIN_SPEECH_RMS = 1e-3  # About -60 dBFS; anything quieter is silence
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Sample widths pcm_to_mono reads for each WAV encoding
+SAMPLE_WIDTHS = {_WAVE_FORMAT_PCM: (8, 16, 24, 32), _WAVE_FORMAT_FLOAT: (32, 64)}
+
+
+def decode_audio_payload(audio_data):
+    """Raw bytes from bytes, base64 text or a data: URL"""
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        return bytes(audio_data)
+    if not isinstance(audio_data, str):
+        raise ValueError('Audio must be bytes or a base64 string')
+    if audio_data.startswith('data:'):
+        audio_data = audio_data.split(',', 1)[-1]
+    try:
+        return base64.b64decode(audio_data, validate=False)
+    except (binascii.Error, ValueError):
+        raise ValueError('Audio is not valid base64')
+
+
+def parse_wav_header(raw):
+    """Format fields and where the samples start, or None until enough of the header has arrived"""
+    if len(raw) < 12:
+        return None
+    if raw[:4] != b'RIFF' or raw[8:12] != b'WAVE':
+        raise ValueError('Not a WAV file')
+    header = None
+    offset = 12
+    while offset + 8 <= len(raw):
+        chunk_id = raw[offset:offset + 4]
+        size = struct.unpack_from('<I', raw, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            if len(raw) < body + min(size, 40):
+                return None
+            audio_format, channels, sample_rate = struct.unpack_from('<HHI', raw, body)
+            bits = struct.unpack_from('<H', raw, body + 14)[0]
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                audio_format = struct.unpack_from('<H', raw, body + 24)[0]
+            header = {'audio_format': audio_format, 'channels': channels, 'sample_rate': sample_rate, 'bits': bits}
+        elif chunk_id == b'data':
+            if header is None:
+                raise ValueError('WAV data chunk comes before its fmt chunk')
+            # Recorders that stream WAV often leave the size at 0 or 0xFFFFFFFF
+            header['data_offset'] = body
+            header['data_size'] = None if size in (0, 0xFFFFFFFF) else size
+            return header
+        offset = body + size + (size & 1)
+    return None
+
+
+def is_compressed(raw):
+    return raw[:4] in (b'OggS', b'\x1aE\xdf\xa3', b'fLaC', b'ID3\x03') or raw[4:8] == b'ftyp'
+
+
+def _pcm_array(buffer, audio_format, bits):
+    """Interleaved samples without copying where possible, plus (scale, offset) to reach [-1, 1]"""
+    width = bits // 8
+    buffer = buffer[:len(buffer) - len(buffer) % width]
+    if audio_format == _WAVE_FORMAT_FLOAT and bits in (32, 64):
+        return np.frombuffer(buffer, dtype='<f%d' % width), 1.0, 0.0
+    if audio_format != _WAVE_FORMAT_PCM:
+        raise ValueError(f"Unsupported WAV encoding {audio_format}")
+    if bits == 8:
+        return np.frombuffer(buffer, dtype=np.uint8), 1 / 128.0, 128.0
+    if bits == 16:
+        return np.frombuffer(buffer, dtype='<i2'), 1 / 32768.0, 0.0
+    if bits == 24:
+        # Read each 3-byte sample as the top of an int32 that starts one byte
+        # early; the borrowed low byte is below 24-bit resolution anyway
+        padded = np.empty(len(buffer) + 1, dtype=np.uint8)
+        padded[0] = 0
+        padded[1:] = np.frombuffer(buffer, dtype=np.uint8)
+        samples = np.ndarray(shape=(len(buffer) // 3,), dtype='<i4', buffer=padded, strides=(3,))
+        return samples, 1 / 2147483648.0, 0.0
+    if bits == 32:
+        return np.frombuffer(buffer, dtype='<i4'), 1 / 2147483648.0, 0.0
+    raise ValueError(f"Unsupported PCM sample width {bits}")
+
+
+def _mono_float(samples, channels, scale, offset):
+    """Average the channels and scale to float32 in one pass over the data"""
+    if channels > 1:
+        # Summing strided channel views is far faster than mean(axis=1) on a narrow axis
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+        mono = samples[:, 0].astype(np.float32)
+        for channel in range(1, channels):
+            mono += samples[:, channel]
+    else:
+        mono = samples.astype(np.float32)
+    if offset:
+        mono -= offset * channels
+    mono *= scale / channels
+    return mono
+
+
+def pcm_to_mono(data, audio_format, channels, bits):
+    """Mono float32 samples in [-1, 1] from a buffer of interleaved PCM or float samples"""
+    samples, scale, offset = _pcm_array(data, audio_format, bits)
+    return _mono_float(samples, channels, scale, offset)
+
+
+def load_audio(raw, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Decode WAV (or headerless 16-bit mono PCM) bytes into (mono float32 samples, sample_rate, channels)"""
+    if raw[:4] == b'RIFF':
+        try:
+            header = parse_wav_header(raw)
+        except struct.error:
+            raise ValueError('WAV header is truncated')
+        if header is None:
+            raise ValueError('WAV file has no fmt or data chunk')
+        audio_format, channels, sample_rate, bits = (
+            header['audio_format'], header['channels'], header['sample_rate'], header['bits'])
+        end = len(raw) if header['data_size'] is None else header['data_offset'] + header['data_size']
+        data = memoryview(raw)[header['data_offset']:end]
+    elif is_compressed(raw):
+        raise ValueError('Compressed audio is not supported; send WAV or 16-bit PCM')
+    else:
+        audio_format, channels, bits, data = _WAVE_FORMAT_PCM, 1, 16, memoryview(raw)
+    if not channels or not sample_rate:
+        raise ValueError('WAV header has no channels or sample rate')
+    return pcm_to_mono(data, audio_format, channels, bits), sample_rate, channels
+
+
+def voice_segments(frame_rms, threshold, frame_seconds):
+    """(start, end) frame indexes of voiced runs, bridging short pauses and dropping blips"""
+    voiced = np.concatenate(([False], frame_rms > threshold, [False]))
+    edges = np.flatnonzero(voiced[1:] != voiced[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    if len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) * frame_seconds >= MIN_PAUSE_SECONDS
+        starts = starts[np.concatenate(([True], keep))]
+        ends = ends[np.concatenate((keep, [True]))]
+    long_enough = (ends - starts) * frame_seconds >= MIN_SEGMENT_SECONDS
+    return starts[long_enough], ends[long_enough]
+
+
+def frame_length_for(sample_rate):
+    return max(1, int(sample_rate * FRAME_SECONDS))
+
+
+def frame_energies(samples, frame_length):
+    """Sum of squares of every complete frame; a trailing partial frame is left out"""
+    count = len(samples) // frame_length
+    frames = samples[:count * frame_length].reshape(count, frame_length)
+    return np.einsum('ij,ij->i', frames, frames).astype(np.float64)
+
+
+def speaking_rate(word_count, duration_seconds):
+    """Words per minute over the whole recording"""
+    return round(word_count / (duration_seconds / 60.0), 1) if duration_seconds else 0.0
+
+
+def metrics_from_frames(frame_energy, sample_rate, total_samples, word_count=0):
+    """Duration, loudness, voice activity and pace from per-frame energies.
+
+    Whole recordings and chunked uploads (which add up frame energies as
+    chunks arrive) both end here, so they report identical numbers.
+    """
+    duration = total_samples / float(sample_rate)
+    frame_length = frame_length_for(sample_rate)
+    frame_seconds = frame_length / float(sample_rate)
+    frame_count = len(frame_energy)
+
+    metrics = {
+        'duration_seconds': round(duration, 2),
+        'sample_rate': sample_rate,
+        'frames': total_samples,
+        'rms_energy': 0.0,
+        'rms_dbfs': None,
+        'speech_seconds': 0.0,
+        'pause_seconds': round(duration, 2),
+        'pause_ratio': 1.0 if total_samples else 0.0,
+        'pause_count': 0,
+        'longest_pause_seconds': 0.0,
+        'voice_segments': [],
+        'speaking_rate': 0.0
+    }
+    if not frame_count:
+        return metrics
+
+    frame_rms = np.sqrt(frame_energy / frame_length)
+    rms = float(np.sqrt(frame_energy.sum() / (frame_count * frame_length)))
+
+    # Threshold adapts to the room: well above the quietest frames (but under
+    # half the peak, for recordings with no silence at all), never below -60 dBFS
+    noise_floor = float(np.percentile(frame_rms, 10))
+    peak = float(frame_rms.max())
+    threshold = max(min(noise_floor * 3.0, peak * 0.5), peak * 0.02, MIN_SPEECH_RMS)
+    starts, ends = voice_segments(frame_rms, threshold, frame_seconds)
+
+    speech_seconds = float((ends - starts).sum()) * frame_seconds
+    gaps = (starts[1:] - ends[:-1]) * frame_seconds
+    metrics.update({
+        'rms_energy': round(rms, 4),
+        'rms_dbfs': round(20 * math.log10(rms), 1) if rms > 0 else None,
+        'speech_seconds': round(speech_seconds, 2),
+        'pause_seconds': round(max(0.0, duration - speech_seconds), 2),
+        'pause_ratio': round(max(0.0, 1 - speech_seconds / duration), 3) if duration else 0.0,
+        'pause_count': int(len(gaps)),
+        'longest_pause_seconds': round(float(gaps.max()), 2) if len(gaps) else 0.0,
+        'voice_segments': [
+            [round(start * frame_seconds, 2), round(end * frame_seconds, 2)]
+            for start, end in zip(starts.tolist(), ends.tolist())
+        ],
+        'speaking_rate': speaking_rate(word_count, duration)
+    })
+    return metrics
+
+
+def speech_metrics(samples, sample_rate, word_count=0):
+    """Duration, loudness, voice activity and pace for one recording"""
+    energies = frame_energies(samples, frame_length_for(sample_rate))
+    return metrics_from_frames(energies, sample_rate, len(samples), word_count)
+
+
+class SpeechProcessor:
+    """Offline speech metrics from WAV/PCM recordings of an answer"""
+
+    def analyze_speech(self, audio_data, transcript=''):
+        try:
+            samples, sample_rate, _ = load_audio(decode_audio_payload(audio_data))
+        except ValueError as e:
+            return {'audio_metrics': {'error': str(e)}}
+        return {'audio_metrics': speech_metrics(samples, sample_rate, len(transcript.split()))}
@@ -185,7 +185,8 @@ class InterviewApp {
                 body: JSON.stringify({
                     answer: answerText,
                     response_time: 180 - this.timeLeft, // Calculate actual response time
-                    audio_data: this.audioChunks.length > 0 ? await this.getAudioBlob() : null
+                    audio_data: this.audioChunks.length > 0 ? await this.getAudioBlob() : null,
+                    async: true // Analysis arrives later via /analysis/<job_id>
                 })
             });
 
@@ -195,20 +196,20 @@ class InterviewApp {
                 throw new Error(data.error);
             }
 
-            // Display feedback
-            this.displayFeedback(data.analysis);
-
             if (data.interview_complete) {
-                // Show final results after delay
+                // Final results are ready once the last analysis has landed
+                const result = await this.waitForAnalysis(data.job_id, { needsResults: true });
+                this.displayFeedback(result.analysis);
                 setTimeout(() => {
-                    this.showFinalResults(data.final_results);
+                    this.showFinalResults(result.final_results);
                 }, 2000);
             } else {
-                // Show next question after delay
-                setTimeout(() => {
-                    this.showNextQuestion(data.next_question, data.metadata);
-                    this.updateProgress(data.current_progress);
-                }, 2000);
+                // Move on right away; feedback fills in when the analysis is done
+                this.showNextQuestion(data.next_question, data.metadata);
+                this.updateProgress(data.current_progress);
+                this.waitForAnalysis(data.job_id)
+                    .then(result => this.displayFeedback(result.analysis))
+                    .catch(error => console.error('Analysis error:', error));
             }
 
         } catch (error) {
@@ -218,6 +219,52 @@ class InterviewApp {
         }
     }
 
+    waitForAnalysis(jobId, options = {}) {
+        // Final results are only computed by the polling endpoint
+        if (options.needsResults || typeof EventSource === 'undefined') {
+            return this.pollAnalysis(jobId, options);
+        }
+        return this.streamAnalysis(jobId).catch(() => this.pollAnalysis(jobId));
+    }
+
+    streamAnalysis(jobId) {
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`/analysis/${jobId}/stream`);
+
+            source.addEventListener('analysis', (event) => {
+                source.close();
+                const data = JSON.parse(event.data);
+                if (data.status === 'done') {
+                    resolve(data);
+                } else {
+                    reject(new Error(data.error || 'Analysis still pending'));
+                }
+            });
+
+            source.onerror = () => {
+                source.close();
+                reject(new Error('Analysis stream interrupted'));
+            };
+        });
+    }
+
+    async pollAnalysis(jobId, options = {}, interval = 500, maxAttempts = 120) {
+        for (let attempt = 0; attempt < maxAttempts; attempt++) {
+            const response = await fetch(`/analysis/${jobId}`);
+            const data = await response.json();
+
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            // The last answer's poll carries final results once every earlier analysis has landed too
+            if (data.status !== 'pending' && !(options.needsResults && !data.final_results)) {
+                return data;
+            }
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+        throw new Error('Timed out waiting for analysis');
+    }
+
     skipQuestion() {
         if (confirm('Are you sure you want to skip this question? This will affect your overall score.')) {
             this.submitAnswer({ preventDefault: () => {} });
@@ -693,6 +740,221 @@ class SpeechRecorder {
     }
 }
 
+// Streams microphone audio to /save_audio as 16-bit PCM chunks while recording
+const CRC32_TABLE = (() => {
+    const table = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) {
+            c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        }
+        table[n] = c >>> 0;
+    }
+    return table;
+})();
+
+function crc32(bytes, crc = 0) {
+    crc = ~crc >>> 0;
+    for (let i = 0; i < bytes.length; i++) {
+        crc = CRC32_TABLE[(crc ^ bytes[i]) & 0xFF] ^ (crc >>> 8);
+    }
+    return ~crc >>> 0;
+}
+
+class AudioChunkUploader {
+    constructor(chunkSeconds = 1) {
+        this.chunkSeconds = chunkSeconds;
+        this.uploadId = null;
+        this.seq = 0;
+        this.crc = 0;
+        this.pending = [];
+        this.pendingSamples = 0;
+        this.queue = Promise.resolve();
+        this.failed = null;
+        this.audioContext = null;
+        this.processor = null;
+        this.source = null;
+    }
+
+    async start(stream) {
+        this.audioContext = new (window.AudioContext || window.webkitAudioContext)();
+        const response = await fetch('/save_audio/start', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ format: 'pcm16', sample_rate: this.audioContext.sampleRate })
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || 'Could not start audio upload');
+        }
+        this.uploadId = data.upload_id;
+
+        this.source = this.audioContext.createMediaStreamSource(stream);
+        this.processor = this.audioContext.createScriptProcessor(4096, 1, 1);
+        this.processor.onaudioprocess = (event) => this.capture(event.inputBuffer.getChannelData(0));
+        this.source.connect(this.processor);
+        this.processor.connect(this.audioContext.destination);
+    }
+
+    capture(floats) {
+        const samples = new Int16Array(floats.length);
+        for (let i = 0; i < floats.length; i++) {
+            const s = Math.max(-1, Math.min(1, floats[i]));
+            samples[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
+        }
+        this.pending.push(samples);
+        this.pendingSamples += samples.length;
+        if (this.pendingSamples >= this.audioContext.sampleRate * this.chunkSeconds) {
+            this.flush();
+        }
+    }
+
+    flush() {
+        if (!this.pendingSamples) return;
+        const chunk = new Int16Array(this.pendingSamples);
+        let offset = 0;
+        this.pending.forEach(part => {
+            chunk.set(part, offset);
+            offset += part.length;
+        });
+        this.pending = [];
+        this.pendingSamples = 0;
+
+        // Little-endian on every browser platform, which is what the server reads
+        const bytes = new Uint8Array(chunk.buffer);
+        this.crc = crc32(bytes, this.crc);
+        const seq = this.seq++;
+        // Chunks go out one at a time so they arrive in order
+        this.queue = this.queue.then(() => this.send(seq, bytes, 2));
+    }
+
+    async send(seq, bytes, retries) {
+        if (this.failed) return;
+        try {
+            const response = await fetch(`/save_audio/${this.uploadId}/${seq}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: bytes
+            });
+            if (!response.ok) {
+                const data = await response.json();
+                // Sequence and size errors won't go away by retrying
+                retries = response.status >= 500 ? retries : 0;
+                throw new Error(data.error || `Chunk ${seq} was rejected`);
+            }
+        } catch (error) {
+            if (retries > 0) {
+                return this.send(seq, bytes, retries - 1);
+            }
+            this.failed = error;
+        }
+    }
+
+    stopCapture() {
+        if (this.processor) {
+            this.processor.disconnect();
+            this.source.disconnect();
+            this.processor = null;
+        }
+        if (this.audioContext) {
+            this.audioContext.close();
+            this.audioContext = null;
+        }
+    }
+
+    // Resolves to the upload ID to send with the answer, or null if the upload failed
+    async finish() {
+        if (this.audioContext) this.flush();
+        this.stopCapture();
+        await this.queue;
+        if (this.failed || !this.uploadId) {
+            console.error('Audio upload failed:', this.failed);
+            return null;
+        }
+        const response = await fetch(`/save_audio/${this.uploadId}/finish`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ crc32: this.crc, chunks: this.seq })
+        });
+        if (!response.ok) {
+            console.error('Audio upload failed:', (await response.json()).error);
+            return null;
+        }
+        return this.uploadId;
+    }
+}
+
+// Scores the answer being typed through /score_draft once typing pauses, one request at a time
+class DraftScoreClient {
+    constructor(onScores, delay = 600, maxWait = 3000) {
+        this.onScores = onScores;
+        this.delay = delay;
+        this.maxWait = maxWait;
+        this.timer = null;
+        this.pending = null;
+        this.firstChange = null;
+        this.lastSent = null;
+        this.inFlight = false;
+        this.blockedUntil = 0;
+        this.generation = 0;
+    }
+
+    update(text) {
+        const now = Date.now();
+        this.pending = text;
+        if (this.firstChange === null) this.firstChange = now;
+        clearTimeout(this.timer);
+        // Waits for a pause, but someone typing without one still gets a score every maxWait
+        const wait = Math.max(Math.min(this.delay, this.firstChange + this.maxWait - now), this.blockedUntil - now, 0);
+        this.timer = setTimeout(() => this.send(), wait);
+    }
+
+    // Called when the answer is submitted; replies about the old draft are dropped
+    cancel() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        this.pending = null;
+        this.firstChange = null;
+        this.lastSent = null;
+        this.generation++;
+    }
+
+    async send() {
+        this.timer = null;
+        // Sent when the request in flight returns
+        if (this.inFlight || this.pending === null) return;
+        const text = this.pending;
+        const generation = this.generation;
+        this.pending = null;
+        this.firstChange = null;
+        if (text === this.lastSent || !text.trim()) return;
+
+        this.inFlight = true;
+        try {
+            const response = await fetch('/score_draft', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ answer: text })
+            });
+            const data = await response.json();
+            if (response.status === 429) {
+                this.blockedUntil = Date.now() + (data.retry_after || 1) * 1000;
+                if (this.pending === null) this.pending = text;
+            } else if (response.ok && generation === this.generation) {
+                this.lastSent = text;
+                this.onScores(data);
+            }
+        } catch (error) {
+            console.error('Draft scoring failed:', error);
+        } finally {
+            this.inFlight = false;
+        }
+        if (this.pending !== null && generation === this.generation) {
+            this.update(this.pending);
+        }
+    }
+}
+
 // Initialize application when DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
     window.app = new InterviewApp();
@@ -701,5 +963,5 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Export for use in other modules
 if (typeof module !== 'undefined' && module.exports) {
-    module.exports = { InterviewApp, SpeechRecorder };
+    module.exports = { InterviewApp, SpeechRecorder, AudioChunkUploader, DraftScoreClient, crc32 };
 }
\ No newline at end of file